@@ -0,0 +1,98 @@
+"""
+micro-benchmark of the annotation server receive path
+
+serve a large document from a local socket server, and compare the time to
+receive it with ASClient.socket_output against the previous implementation,
+which grew a bytes object 2 KB at a time. Both receive the raw bytes, the
+decoding of the previous implementation is left out to compare the same
+work
+
+usage:
+    python benchmarks/bench_asclient.py --size_mb 4 --repeat 5
+"""
+from argparse import ArgumentParser
+import json
+import socket
+import socketserver
+import threading
+import time
+from xml_miner.data_utils.asclient import ASClient
+
+
+class PayloadHandler(socketserver.BaseRequestHandler):
+    """send the payload and close the connection"""
+    def handle(self):
+        self.request.sendall(self.server.payload)
+
+
+class PayloadServer(socketserver.ThreadingTCPServer):
+    """serve the same payload to every connection"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, payload):
+        super().__init__(('127.0.0.1', 0), PayloadHandler)
+        self.payload = payload
+
+
+class LegacyASClient(ASClient):
+    """the receive path before the bytearray/recv_into buffering"""
+    def socket_output(self) -> bytes:
+        output = b''
+        while 1:
+            data = self.tk_socket.recv(self.BUFFER_SIZE)
+            if not data:
+                break
+            output += data
+        return output
+
+
+def receive_time(client, address, repeat):
+    '''best time over repeat runs to receive the whole payload'''
+    best = None
+    for _ in range(repeat):
+        client.tk_socket = socket.create_connection(address)
+        start = time.perf_counter()
+        output = client.socket_output()
+        elapsed = time.perf_counter() - start
+        client.close_socket()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(output)
+
+
+def main():
+    '''run the benchmark and print the results as json'''
+    parser = ArgumentParser(description='benchmark the AS receive path')
+    parser.add_argument('--size_mb', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--buffer_size', type=int,
+                        default=ASClient.RECEIVE_BUFFER_SIZE)
+    args = parser.parse_args()
+
+    line = '<name>Zoë Ünïcödé {}</name>\n'
+    payload = ''.join(line.format(index) for index in range(
+        args.size_mb * 1024 * 1024 // len(line.format(0).encode())))
+    payload = payload.encode('utf-8')
+
+    server = PayloadServer(payload)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        results = {'payload_bytes': len(payload)}
+        for name, client in [
+                ('legacy', LegacyASClient('127.0.0.1', 0)),
+                ('buffered', ASClient('127.0.0.1', 0,
+                                      buffer_size=args.buffer_size))]:
+            seconds, num_bytes = receive_time(
+                client, server.server_address, args.repeat)
+            results[name] = {'seconds': round(seconds, 4),
+                             'mb_per_sec': round(
+                                 len(payload) / seconds / 2 ** 20, 1),
+                             'bytes': num_bytes}
+        print(json.dumps(results, indent=2))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+throughput benchmark of XMLMiner and TRXMLMiner
+
+generate a synthetic corpus (see corpus.py) for each loader, then time each
+stage of the mining separately, on all documents:
+
+- load: read the documents with the DataLoader
+- parse: parse the documents into trees (tree engine only)
+- select: apply the selectors on the trees, or on the documents with the
+  iterparse engine
+- normalize: build the normalized output rows
+- write: store the rows with the DataSaver
+- total: the whole mine_and_save run
+
+load, parse and select run in one process, over all documents kept in
+memory. The mine_and_save run gets its own process, to report the peak RSS
+of the mining only, and its stats give the normalize and write stages.
+The results are printed as json, with docs/sec and MB/sec of each stage.
+
+usage:
+    python benchmarks/bench_miner.py --num_docs 2000 --doc_size 8192 \
+        --output results.json
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import platform
+import resource
+import shutil
+import tempfile
+import time
+from xml_miner import __version__
+from xml_miner.miner import MINING_ENGINE, XMLMiner, TRXMLMiner
+from xml_miner.data_utils import DataLoader, MXMLIndex
+from xml_miner.stats import STAGE
+from xml_miner.xml import TKXML, TKTRXML
+from xml_miner.xml.backend import XML_BACKEND
+from corpus import CORPUS_KIND, CORPUS_LAYOUT, corpus_selectors, write_corpus
+
+LOADER = {'MXML': 'mxml', 'INDEX': 'index', 'GZIP': 'gzip', 'DIR': 'dir'}
+LOADER_LAYOUT = {'mxml': CORPUS_LAYOUT['MXML'],
+                 'index': CORPUS_LAYOUT['MXML'],
+                 'gzip': CORPUS_LAYOUT['GZIP'],
+                 'dir': CORPUS_LAYOUT['DIR']}
+
+
+def _peak_rss_mb() -> float:
+    '''peak resident set size of this process, ru_maxrss is in KB on linux'''
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == 'Darwin':
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def _stage(seconds: float, num_docs: int, num_bytes: int) -> dict:
+    if not seconds:
+        return {'seconds': 0, 'docs_per_sec': None, 'mb_per_sec': None}
+    return {'seconds': round(seconds, 4),
+            'docs_per_sec': round(num_docs / seconds, 1),
+            'mb_per_sec': round(num_bytes / seconds / 2 ** 20, 2)}
+
+
+def _make_miner(kind: str, selectors: str, options: dict):
+    if kind == CORPUS_KIND['XML']:
+        return XMLMiner(selectors, with_field_name=True, **options)
+    return TRXMLMiner(selectors, **options)
+
+
+def run_stages(kind: str, source: str, selectors: str,
+               options: dict) -> dict:
+    """
+    time the load, parse and select stages over all documents at once, in a
+    fresh process: the documents and the trees are all kept in memory
+
+    output:
+        dict of the stage timings, the number of documents and bytes
+    """
+    miner = _make_miner(kind, selectors, options)
+    timer = time.perf_counter
+
+    start = timer()
+    docs = list(miner.load_data(source).data_generator)
+    stages = {'load': timer() - start}
+
+    if miner.engine == MINING_ENGINE['ITERPARSE']:
+        select = (miner.selectors.iterselect_xml_values
+                  if kind == CORPUS_KIND['XML']
+                  else miner.selectors.iterselect_trxml_values)
+        start = timer()
+        for doc in docs:
+            select(doc)
+        stages['select'] = timer() - start
+    else:
+        tree_class = TKXML if kind == CORPUS_KIND['XML'] else TKTRXML
+        select = (miner.selectors.select_xml_values
+                  if kind == CORPUS_KIND['XML']
+                  else miner.selectors.select_trxml_values)
+        start = timer()
+        trees = [tree_class.from_string(doc, miner.backend, miner.recover)
+                 for doc in docs]
+        stages['parse'] = timer() - start
+        start = timer()
+        for tree in trees:
+            select(tree)
+        stages['select'] = timer() - start
+
+    return {'num_docs': len(docs),
+            'num_bytes': sum(len(doc) for doc in docs),
+            'stages': stages}
+
+
+def run_total(kind: str, source: str, selectors: str, options: dict,
+              output_file: str) -> dict:
+    """
+    time the whole mine_and_save run in a fresh process, so the peak RSS is
+    the one of the mining only. The normalize and write stages come from
+    the stats of the run, see MiningStats.
+
+    output:
+        dict of the stage timings, the number of rows, and the peak RSS
+    """
+    miner = _make_miner(kind, selectors, dict(options, collect_stats=True,
+                                              progress_interval=0))
+    start = time.perf_counter()
+    miner.mine_and_save(source, output_file)
+    total = time.perf_counter() - start
+    stats = miner.stats.as_dict()
+    return {'num_rows': stats['rows_written'],
+            'stages': {stage: stats['stages'][stage]['wall_time']
+                       for stage in (STAGE['NORMALIZE'], STAGE['WRITE'])},
+            'total': total,
+            'peak_rss_mb': _peak_rss_mb()}
+
+
+def _in_process(function, *args):
+    '''run the function in its own process, to measure its own peak RSS'''
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_case(kind: str, loader: str, source: str, selectors: str,
+             options: dict, output_dir: str) -> dict:
+    """
+    time the stages of one miner over one loader
+
+    output:
+        dict of the stage timings, the number of documents, bytes and rows,
+        and the peak RSS of the mine_and_save run
+    """
+    stages = _in_process(run_stages, kind, source, selectors, options)
+    output_file = os.path.join(output_dir, f'{kind}_{loader}.tsv')
+    total = _in_process(run_total, kind, source, selectors, options,
+                        output_file)
+    timings = dict(stages['stages'], **total['stages'],
+                   total=total['total'])
+    num_docs, num_bytes = stages['num_docs'], stages['num_bytes']
+    return {'num_docs': num_docs,
+            'input_mb': round(num_bytes / 2 ** 20, 2),
+            'num_rows': total['num_rows'],
+            'stages': {name: _stage(seconds, num_docs, num_bytes)
+                       for name, seconds in timings.items()},
+            'peak_rss_mb': total['peak_rss_mb']}
+
+
+def main():
+    '''generate the corpora, run the benchmark and print the results'''
+    parser = ArgumentParser(description='benchmark the mining stages')
+    parser.add_argument('--kinds', default='xml,trxml',
+                        help='comma separated corpus kinds: xml, trxml')
+    parser.add_argument('--loaders', default=','.join(LOADER.values()),
+                        help='comma separated loaders: mxml, index, gzip, '
+                        'dir')
+    parser.add_argument('--num_docs', type=int, default=2000)
+    parser.add_argument('--doc_size', type=int, default=8192,
+                        help='approximate document size in bytes')
+    parser.add_argument('--itemgroups', type=int, default=4,
+                        help='xml tags or trxml itemgroups per document')
+    parser.add_argument('--items', type=int, default=4,
+                        help='values per xml tag or items per itemgroup')
+    parser.add_argument('--fields', type=int, default=4,
+                        help='fields per trxml item')
+    parser.add_argument('--selectors', type=int, default=4,
+                        help='number of selectors')
+    parser.add_argument('--trxml_items', action='store_true',
+                        help='select the fields of all items of group0 '
+                        'instead of the first item of the itemgroups')
+    parser.add_argument('--engine', choices=MINING_ENGINE.values(),
+                        default=MINING_ENGINE['TREE'])
+    parser.add_argument('--backend', choices=XML_BACKEND.values(),
+                        default=XML_BACKEND['AUTO'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus_dir',
+                        help='keep the corpora and outputs in this dir, '
+                        'instead of a temporary dir')
+    parser.add_argument('--output', help='write the json results to a file')
+    args = parser.parse_args()
+
+    work_dir = args.corpus_dir or tempfile.mkdtemp(prefix='xml_miner_bench')
+    options = {'engine': args.engine, 'backend': args.backend,
+               'checkpoint_interval': 0}
+    results = {'version': __version__,
+               'python': platform.python_version(),
+               'config': vars(args),
+               'cases': []}
+    try:
+        for kind in args.kinds.split(','):
+            selectors = corpus_selectors(kind, args.selectors,
+                                         args.itemgroups, args.fields,
+                                         args.trxml_items)
+            header = DataLoader.XML_HEADER if kind == CORPUS_KIND['XML'] \
+                else DataLoader.TRXML_HEADER
+            corpora = {}
+            for loader in args.loaders.split(','):
+                layout = LOADER_LAYOUT[loader]
+                if layout not in corpora:
+                    corpora[layout] = write_corpus(
+                        os.path.join(work_dir, kind), kind, layout,
+                        args.num_docs, args.doc_size, args.itemgroups,
+                        args.items, args.fields, args.seed)
+                source = corpora[layout]
+                case_options = dict(options)
+                if loader == LOADER['INDEX']:
+                    MXMLIndex.load_or_build(source, header)
+                    case_options['use_index'] = True
+                case = run_case(kind, loader, source, selectors,
+                                case_options, os.path.join(work_dir, kind))
+                case.update({'miner': kind, 'loader': loader,
+                             'selectors': selectors})
+                results['cases'].append(case)
+    finally:
+        if args.corpus_dir is None:
+            shutil.rmtree(work_dir)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'wt', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
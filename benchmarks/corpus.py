@@ -0,0 +1,190 @@
+"""
+synthetic xml and trxml corpora for the benchmarks
+
+the documents look like the test resources: xml documents with a <begin>
+top level tag and the selected tags spread in filler text, trxml documents
+with a Document part and a DocumentStructure of ItemGroup/Item/Field
+
+usage:
+    python benchmarks/corpus.py --kind trxml --num_docs 1000 \
+        --doc_size 8192 --output_dir /tmp/corpus
+"""
+from argparse import ArgumentParser
+from xml.sax.saxutils import escape
+import gzip
+import json
+import os
+import random
+
+CORPUS_KIND = {'XML': 'xml', 'TRXML': 'trxml'}
+CORPUS_LAYOUT = {'MXML': 'mxml', 'GZIP': 'gzip', 'DIR': 'dir'}
+
+WORDS = ['street', 'company', 'consultant', 'manager', 'logistics', 'school',
+         'Zoë', 'Ünïcödé', 'Calgary', 'Stockholm', 'June', '2007', 'ABC',
+         'supervisor', 'human', 'resources', 'mississauga', 'details']
+DECLARATION = '<?xml version="1.0" encoding="UTF-8" ?>\n'
+
+
+def _text(rng: random.Random, num_words: int) -> str:
+    return escape(' '.join(rng.choice(WORDS) for _ in range(num_words)))
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    '''lines of random words, about size bytes'''
+    lines = []
+    while size > 0:
+        line = _text(rng, 8)
+        lines.append(line)
+        size -= len(line.encode('utf-8')) + 1
+    return '\n'.join(lines)
+
+
+def xml_document(index: int, rng: random.Random, doc_size: int,
+                 num_tags: int, num_items: int) -> str:
+    '''
+    one xml document of about doc_size bytes, with num_items values of each
+    of the tags tag0..tag<num_tags - 1>
+    '''
+    values = [f'<tag{tag}>{_text(rng, 3)}</tag{tag}>'
+              for _ in range(num_items) for tag in range(num_tags)]
+    rng.shuffle(values)
+    size = (doc_size - sum(len(value) for value in values)) \
+        // (len(values) + 1)
+    body = '\n'.join(_filler(rng, size) + '\n' + value for value in values)
+    return f'<begin filename="doc{index}.txt" id="{index}">\n' \
+        f'{body}\n{_filler(rng, size)}\n</begin>\n'
+
+
+def trxml_document(index: int, rng: random.Random, doc_size: int,
+                   num_itemgroups: int, num_items: int,
+                   num_fields: int) -> str:
+    '''
+    one trxml document of about doc_size bytes, with the itemgroups
+    group0..group<num_itemgroups - 1>, each of num_items items with the
+    fields field0..field<num_fields - 1>
+    '''
+    itemgroups = []
+    for group in range(num_itemgroups):
+        items = []
+        for item in range(num_items):
+            fields = ''.join(
+                f'\t\t\t<Field key="field{field}"><Value>{_text(rng, 3)}'
+                '</Value></Field>\n' for field in range(num_fields))
+            items.append(f'\t\t<Item index="{item}">\n{fields}\t\t</Item>\n')
+        itemgroups.append(f'\t<ItemGroup count="{num_items}" '
+                          f'key="group{group}">\n{"".join(items)}'
+                          '\t</ItemGroup>\n')
+    structure = ''.join(itemgroups)
+    text = _filler(rng, doc_size - len(structure))
+    return f'{DECLARATION}<TextractorResult user="1" lang="english">' \
+        f'<Document filename="doc{index}.doc" id="{index}">\n{text}\n' \
+        f'</Document>\n<DocumentStructure>\n{structure}' \
+        '</DocumentStructure>\n</TextractorResult>\n'
+
+
+def corpus_selectors(kind: str, num_selectors: int, num_itemgroups: int = 1,
+                     num_fields: int = 1, items: bool = False) -> str:
+    """
+    the selector string of num_selectors selectors over a generated corpus
+
+    params:
+        items: trxml selectors over all items of group0, instead of the first
+        item of the itemgroups
+    """
+    if kind == CORPUS_KIND['XML']:
+        return ','.join(f'tag{tag}' for tag in range(num_selectors))
+    if items:
+        return ','.join(f'group0.*.field{field % num_fields}'
+                        for field in range(num_selectors))
+    return ','.join(
+        f'group{selector % num_itemgroups}.0.field'
+        f'{selector // num_itemgroups % num_fields}'
+        for selector in range(num_selectors))
+
+
+def write_corpus(output_dir: str, kind: str, layout: str, num_docs: int,
+                 doc_size: int, num_itemgroups: int = 4, num_items: int = 4,
+                 num_fields: int = 4, seed: int = 0) -> str:
+    """
+    write a corpus of num_docs documents
+
+    params:
+        kind: 'xml' or 'trxml', see CORPUS_KIND
+        layout: one multi document file, its gzip file, or a dir of one file
+        per document, see CORPUS_LAYOUT
+        num_itemgroups: number of xml tags, or trxml itemgroups
+        num_items: values per xml tag, or items per trxml itemgroup
+        num_fields: fields per trxml item
+
+    output:
+        the path of the corpus file or dir
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    def documents():
+        for index in range(num_docs):
+            if kind == CORPUS_KIND['XML']:
+                yield xml_document(index, rng, doc_size, num_itemgroups,
+                                   num_items)
+            else:
+                yield trxml_document(index, rng, doc_size, num_itemgroups,
+                                     num_items, num_fields)
+
+    suffix = '.mxml' if kind == CORPUS_KIND['XML'] else '.mtrxml'
+    if layout == CORPUS_LAYOUT['DIR']:
+        path = os.path.join(output_dir, kind + 's')
+        os.makedirs(path, exist_ok=True)
+        for index, doc in enumerate(documents()):
+            with open(os.path.join(path, f'doc{index:08d}.{kind}'), 'wt',
+                      encoding='utf-8') as file:
+                file.write(doc)
+        return path
+
+    path = os.path.join(output_dir, 'corpus' + suffix)
+    if layout == CORPUS_LAYOUT['GZIP']:
+        path += '.gz'
+        file = gzip.open(path, 'wt', encoding='utf-8')
+    else:
+        file = open(path, 'wt', encoding='utf-8')
+    with file:
+        for doc in documents():
+            file.write(doc)
+    return path
+
+
+def main():
+    '''write a corpus and print its path and selectors as json'''
+    parser = ArgumentParser(description='write a synthetic xml/trxml corpus')
+    parser.add_argument('--kind', choices=CORPUS_KIND.values(),
+                        default=CORPUS_KIND['XML'])
+    parser.add_argument('--layout', choices=CORPUS_LAYOUT.values(),
+                        default=CORPUS_LAYOUT['MXML'])
+    parser.add_argument('--num_docs', type=int, default=1000)
+    parser.add_argument('--doc_size', type=int, default=8192,
+                        help='approximate document size in bytes')
+    parser.add_argument('--itemgroups', type=int, default=4,
+                        help='xml tags or trxml itemgroups per document')
+    parser.add_argument('--items', type=int, default=4,
+                        help='values per xml tag or items per itemgroup')
+    parser.add_argument('--fields', type=int, default=4,
+                        help='fields per trxml item')
+    parser.add_argument('--selectors', type=int, default=4,
+                        help='number of selectors to print')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output_dir', required=True)
+    args = parser.parse_args()
+
+    path = write_corpus(args.output_dir, args.kind, args.layout,
+                        args.num_docs, args.doc_size, args.itemgroups,
+                        args.items, args.fields, args.seed)
+    print(json.dumps({'path': path,
+                      'selectors': corpus_selectors(args.kind,
+                                                    args.selectors,
+                                                    args.itemgroups,
+                                                    args.fields)},
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,12 @@ setup_requirements = ['pytest-runner', ]
 
 test_requirements = ['pytest', ]
 
+extras_requirements = {
+    'lxml': ['lxml'],
+    'zstd': ['zstandard'],
+    'parquet': ['pyarrow'],
+}
+
 setup(
     name=NAME,
     version=VERSION,
@@ -34,6 +40,7 @@ setup(
     test_suite="tests",
     setup_requires=setup_requirements,
     tests_require=test_requirements,
+    extras_require=extras_requirements,
     packages=find_packages(),
     entry_points={
         "console_scripts": [
@@ -0,0 +1,74 @@
+"""a local fake annotation server, to test the annotation server clients"""
+import socketserver
+import threading
+import time
+
+
+class FakeASHandler(socketserver.StreamRequestHandler):
+    """one connection: login, one query, the response, then close"""
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            self.wfile.write(b'user\n')
+            user = self.rfile.readline().strip().decode()
+            self.wfile.write(b'password\n')
+            password = self.rfile.readline().strip().decode()
+            if (user, password) != (server.as_user, server.as_pass):
+                self.wfile.write(b'ERROR wrong user or password\n')
+                return
+            self.wfile.write(b'OK\n')
+            query = self.rfile.readline().strip().decode()
+            if server.delay:
+                time.sleep(server.delay)
+            response = server.respond(query)
+            if isinstance(response, str):
+                response = response.encode('utf-8')
+            self.wfile.write(response)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client closed the connection, e.g. a cancelled fetch
+            return
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+class FakeASServer(socketserver.ThreadingTCPServer):
+    """serve the given documents by id, on a free local port"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, docs, as_user='', as_pass='', delay=0):
+        super().__init__(('127.0.0.1', 0), FakeASHandler)
+        self.docs = docs
+        self.as_user = as_user
+        self.as_pass = as_pass
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def address(self):
+        '''host:port of the server'''
+        return '{}:{}'.format(*self.server_address)
+
+    def respond(self, query):
+        '''the response to a query'''
+        if query.startswith('GIVE ids'):
+            return "\n".join(str(doc_id) for doc_id in range(len(self.docs)))
+        if query.startswith('GIVE xml id '):
+            return self.docs[int(query[len('GIVE xml id '):])]
+        return 'ERROR unknown query'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
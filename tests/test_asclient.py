@@ -0,0 +1,85 @@
+"""unit tests to fetch documents from a local fake annotation server"""
+import os
+import shutil
+import tempfile
+import filecmp
+from unittest import TestCase
+from xml_miner.miner import XMLMiner
+from xml_miner.data_utils import DataLoader, DocFilter
+from xml_miner.data_utils.asclient import ASClient, ASClientPool
+from fake_as_server import FakeASServer
+
+
+class ASClientTestCases(TestCase):
+    """unit tests for the serial and the pooled annotation server clients"""
+    def setUp(self):
+        data = DataLoader.load_from_mxml('tests/resource/simple.mxml')
+        self.docs = list(data.data_generator)
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_get_docs(self):
+        with FakeASServer(self.docs, 'foo', 'bar') as server:
+            host, port = server.address.split(':')
+            client = ASClient(host, port, 'foo', 'bar')
+            self.assertEqual(client.get_ids(), ['0', '1', '2'])
+            self.assertEqual(list(client.get_docs()), self.docs)
+
+    def test_wrong_password(self):
+        with FakeASServer(self.docs, 'foo', 'bar') as server:
+            host, port = server.address.split(':')
+            with self.assertRaises(IOError):
+                ASClient(host, port, 'foo', 'wrong').get_ids()
+
+    def test_pool_get_docs(self):
+        docs = self.docs * 10
+        with FakeASServer(docs, delay=0.02) as server:
+            host, port = server.address.split(':')
+            pool = ASClientPool(host, port, workers=4)
+            self.assertEqual(list(pool.get_docs()), docs)
+            self.assertEqual(server.connections, len(docs) + 1)
+            self.assertGreater(server.max_active, 1)
+            self.assertLessEqual(server.max_active, 4)
+
+    def test_filter_ids(self):
+        docs = self.docs * 10
+        for workers in [1, 4]:
+            with FakeASServer(docs) as server:
+                host, port = server.address.split(':')
+                data = DataLoader.load_from_as(
+                    host, port, '', workers=workers,
+                    doc_filter=DocFilter(sample_rate=0.5, seed=1, limit=4))
+                self.assertEqual(len(list(data.positioned_generator)), 4)
+                # only the kept documents are fetched, after the ids
+                self.assertEqual(server.connections, 1 + 4)
+
+            with FakeASServer(docs) as server:
+                host, port = server.address.split(':')
+                data = DataLoader.load_from_as(
+                    host, port, '', workers=workers,
+                    doc_filter=DocFilter('test01', limit=2))
+                self.assertEqual([position for position, _ in
+                                  data.positioned_generator], ['0', '3'])
+
+    def test_mine_from_as(self):
+        eval_filename = os.path.join(self.test_dir, 'from_as.csv')
+        with FakeASServer(self.docs) as server:
+            xml_miner = XMLMiner("name,address", with_field_name=True,
+                                 as_workers=2)
+            xml_miner.mine_and_save(server.address, eval_filename,
+                                    query='', as_user='', as_pass='')
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/xml_name_address.tsv',
+            shallow=False))
+
+    def test_small_receive_buffer(self):
+        docs = ['<begin filename="ü.txt"><name>Zoë Ünïcödé</name></begin>']
+        with FakeASServer(docs) as server:
+            host, port = server.address.split(':')
+            client = ASClient(host, port, buffer_size=3)
+            self.assertEqual(list(client.get_docs()),
+                             [doc.encode('utf-8') for doc in docs])
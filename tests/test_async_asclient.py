@@ -0,0 +1,97 @@
+"""unit tests for the asyncio annotation server client and async mining"""
+import asyncio
+import os
+from unittest import TestCase
+from xml_miner.miner import XMLMiner
+from xml_miner.data_utils import DataLoader
+from xml_miner.data_utils.async_asclient import AsyncASClient
+from fake_as_server import FakeASServer
+
+
+class AsyncASClientTestCases(TestCase):
+    """unit tests for AsyncASClient and XMLMiner.amine"""
+    def setUp(self):
+        data = DataLoader.load_from_mxml('tests/resource/simple.mxml')
+        self.docs = list(data.data_generator)
+
+    @staticmethod
+    def _run(coroutine):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def _collect(self, async_iterator):
+        async def collect():
+            return [item async for item in async_iterator]
+        return self._run(collect())
+
+    def test_get_docs(self):
+        docs = self.docs * 5
+        with FakeASServer(docs, 'foo', 'bar', delay=0.02) as server:
+            host, port = server.address.split(':')
+            client = AsyncASClient(host, port, 'foo', 'bar', concurrency=3)
+            self.assertEqual(self._collect(client.get_docs()), docs)
+            self.assertGreater(server.max_active, 1)
+            self.assertLessEqual(server.max_active, 3)
+
+    def test_cancel(self):
+        with FakeASServer(self.docs * 5, delay=0.05) as server:
+            host, port = server.address.split(':')
+            client = AsyncASClient(host, port, concurrency=2)
+
+            async def first_doc():
+                docs = client.get_docs()
+                try:
+                    return await docs.__anext__()
+                finally:
+                    await docs.aclose()
+
+            self.assertEqual(self._run(first_doc()), self.docs[0])
+
+    def test_amine(self):
+        expected = list(XMLMiner("name").mine('tests/resource/simple.mxml'))
+        xml_miner = XMLMiner("name")
+        with FakeASServer(self.docs) as server:
+            mined = self._collect(xml_miner.amine(server.address))
+        self.assertEqual(mined, expected)
+        self.assertEqual(xml_miner.num_docs, 3)
+
+        mined = self._collect(
+            XMLMiner("name").amine('tests/resource/simple.mxml'))
+        self.assertEqual(mined, expected)
+
+    def test_amine_filtered(self):
+        with FakeASServer(self.docs * 4) as server:
+            xml_miner = XMLMiner("name", sample=0.8, seed=1, limit=2)
+            mined = self._collect(xml_miner.amine(server.address))
+            self.assertEqual(len(mined), 2)
+            # only the kept documents are fetched, after the ids
+            self.assertEqual(server.connections, 1 + 2)
+
+            xml_miner = XMLMiner("name", filter_filename='test01')
+            with self.assertRaises(ValueError):
+                self._collect(xml_miner.amine(server.address))
+
+    def test_amine_latin(self):
+        docs = ['<?xml version="1.0" encoding="ISO-8859-1"?>\n'
+                '<begin filename="latin.txt"><name>caf\xe9</name></begin>'
+                .encode('iso-8859-1')]
+        with FakeASServer(docs) as server:
+            mined = self._collect(XMLMiner("name").amine(server.address))
+        self.assertEqual([selected.values for selected in mined],
+                         [[['caf\xe9']]])
+
+    def test_amine_manifest(self):
+        xml_miner = XMLMiner("name", manifest='unused.sqlite')
+        with self.assertRaises(ValueError):
+            self._collect(xml_miner.amine('tests/resource/xmls'))
+        self.assertFalse(os.path.exists('unused.sqlite'))
+
+        xml_miner = XMLMiner("name", cache='unused.sqlite')
+        with self.assertRaises(ValueError):
+            self._collect(xml_miner.amine('tests/resource/xmls'))
+        self.assertFalse(os.path.exists('unused.sqlite'))
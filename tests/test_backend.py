@@ -0,0 +1,111 @@
+"""unit tests to select values with the etree and lxml parser backends"""
+import os
+import glob
+import shutil
+import tempfile
+import filecmp
+from unittest import TestCase, skipIf
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.selectors import XMLSelectors, TRXMLSelectors
+from xml_miner.xml import TKXML, TKTRXML
+from xml_miner.xml.backend import LXML_ETREE, PARSE_ERRORS, resolve_backend
+
+
+class BackendTestCases(TestCase):
+    """unit tests for the choice of the backend"""
+    def test_resolve_backend(self):
+        self.assertEqual(resolve_backend('etree'), 'etree')
+        self.assertEqual(resolve_backend('auto'), 'etree')
+        if LXML_ETREE is None:
+            with self.assertRaises(ImportError):
+                resolve_backend('auto', recover=True)
+        else:
+            self.assertEqual(resolve_backend('auto', recover=True), 'lxml')
+        with self.assertRaises(ValueError):
+            resolve_backend('etree', recover=True)
+        with self.assertRaises(ValueError):
+            resolve_backend('unknown')
+        with self.assertRaises(ValueError):
+            XMLMiner("name", engine='iterparse', backend='lxml',
+                     recover=True)
+
+    def test_etree_gold(self):
+        test_dir = tempfile.mkdtemp()
+        eval_filename = os.path.join(test_dir, 'from_mxml.csv')
+        try:
+            xml_miner = XMLMiner("name,address", with_field_name=True,
+                                 backend='etree')
+            xml_miner.mine_and_save('tests/resource/simple.mxml',
+                                    eval_filename)
+            self.assertTrue(filecmp.cmp(
+                eval_filename,
+                'tests/resource/gold/xml_name_address.tsv',
+                shallow=False))
+        finally:
+            shutil.rmtree(test_dir)
+
+
+@skipIf(LXML_ETREE is None, "lxml is not installed")
+class LxmlTestCases(TestCase):
+    """unit tests to compare the lxml backend with the etree backend"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_same_xml_values(self):
+        selectors = XMLSelectors.from_selector_string(
+            'name,address,item,experienceorgplace')
+        xml_string = ('<?xml version="1.0" encoding="ISO-8859-1"?>'
+                      '<!DOCTYPE begin [<!ENTITY e "ENT">]>'
+                      '<begin filename="f">a<!-- c -->b<?pi x?>'
+                      '<name>c<![CDATA[<d>]]>&e;&amp;</name></begin>')
+        for xml_file in glob.glob('tests/resource/xmls/test_0*.xml'):
+            for xml_obj, lxml_obj in [
+                    (TKXML.from_file(xml_file),
+                     TKXML.from_file(xml_file, 'lxml')),
+                    (TKXML.from_string(xml_string),
+                     TKXML.from_string(xml_string, 'lxml'))]:
+                self.assertEqual(lxml_obj.filename, xml_obj.filename)
+                self.assertEqual(selectors.select_xml_fields(lxml_obj),
+                                 selectors.select_xml_fields(xml_obj))
+
+    def test_same_trxml_values(self):
+        for trxml_file in glob.glob('tests/resource/trxmls/*.trxml'):
+            trxml_obj = TKTRXML.from_file(trxml_file)
+            lxml_obj = TKTRXML.from_file(trxml_file, 'lxml')
+            self.assertEqual(lxml_obj.filename, trxml_obj.filename)
+            for selector_string in ['name.0.name,address.0.address',
+                                    'experienceitem.*.experience']:
+                selectors = TRXMLSelectors.from_selector_string(
+                    selector_string)
+                self.assertEqual(selectors.select_trxml_fields(lxml_obj),
+                                 selectors.select_trxml_fields(trxml_obj))
+                for selector in selectors:
+                    self.assertEqual(
+                        selector.select_value_with_xpath(lxml_obj),
+                        selector.select_value_with_xpath(trxml_obj))
+
+    def test_recover(self):
+        broken = '<begin filename="f"><name>a</name><name>b</begin>'
+        with self.assertRaises(PARSE_ERRORS):
+            TKXML.from_string(broken, 'lxml')
+        xml_obj = TKXML.from_string(broken, 'lxml', recover=True)
+        selectors = XMLSelectors.from_selector_string('name')
+        self.assertEqual(selectors.select_xml_fields(xml_obj)['name'][0], 'a')
+        with self.assertRaises(PARSE_ERRORS):
+            TKXML.from_string(' ', 'lxml', recover=True)
+
+    def test_lxml_gold(self):
+        eval_filename = os.path.join(self.test_dir, 'from_mxml.csv')
+        trxml_miner = TRXMLMiner(
+            "experienceitem.*.experience,experienceitem.*.experienceorgplace",
+            backend='lxml')
+        trxml_miner.mine_and_save('tests/resource/simple.mtrxml',
+                                  eval_filename)
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/trxml_exp.tsv',
+            shallow=False))
@@ -0,0 +1,143 @@
+"""unit tests to resume an interrupted mining run from its checkpoint"""
+import gc
+import gzip
+import os
+import shutil
+import tempfile
+import filecmp
+from unittest import TestCase
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.checkpoint import Checkpoint
+from xml_miner.data_utils import DataLoader, MXMLIndex
+from xml_miner.data_utils.data_loader import \
+    load_positioned_from_multi_doc_file
+from fake_as_server import FakeASServer
+
+
+class CrashingXMLMiner(XMLMiner):
+    """a XMLMiner failing on the n-th document"""
+    def __init__(self, *args, crash_at=3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_at = crash_at
+        self.num_selected = 0
+
+    def select_doc(self, doc):
+        self.num_selected += 1
+        if self.num_selected == self.crash_at:
+            raise RuntimeError("crash")
+        return super().select_doc(doc)
+
+
+class CrashingTRXMLMiner(TRXMLMiner):
+    """a TRXMLMiner failing on the n-th document"""
+    def __init__(self, *args, crash_at=3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_at = crash_at
+        self.num_selected = 0
+
+    def select_doc(self, doc):
+        self.num_selected += 1
+        if self.num_selected == self.crash_at:
+            raise RuntimeError("crash")
+        return super().select_doc(doc)
+
+
+class CheckpointTestCases(TestCase):
+    """unit tests to checkpoint and resume mine_and_save"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.test_dir, 'mined.tsv')
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _crash_and_resume(self, crashing_miner, miner, source, query=None):
+        args = (source, self.output_file) if query is None \
+            else (source, self.output_file, query, '', '')
+        with self.assertRaises(RuntimeError):
+            crashing_miner.mine_and_save(*args)
+        gc.collect()
+        checkpoint_file = Checkpoint.checkpoint_filename(self.output_file)
+        self.assertTrue(os.path.isfile(checkpoint_file))
+        # rows written after the checkpoint are dropped when resuming
+        with open(self.output_file, 'at', encoding='utf-8') as file:
+            file.write('partial\trow')
+        miner.mine_and_save(*args)
+        self.assertFalse(os.path.isfile(checkpoint_file))
+
+    def _assert_output(self, gold_file):
+        self.assertTrue(filecmp.cmp(self.output_file, gold_file,
+                                    shallow=False))
+
+    def test_resume_mxml(self):
+        mxml_file = os.path.join(self.test_dir, 'simple.mxml')
+        shutil.copy('tests/resource/simple.mxml', mxml_file)
+        for use_index in [False, True]:
+            self._crash_and_resume(
+                CrashingXMLMiner("name,address", with_field_name=True,
+                                 use_index=use_index,
+                                 checkpoint_interval=1e-9),
+                XMLMiner("name,address", with_field_name=True,
+                         use_index=use_index, resume=True),
+                mxml_file)
+            self._assert_output('tests/resource/gold/xml_name_address.tsv')
+
+    def test_resume_dir(self):
+        gold_file = os.path.join(self.test_dir, 'gold.tsv')
+        TRXMLMiner("name.0.name,address.0.address").mine_and_save(
+            'tests/resource/trxmls', gold_file)
+        self._crash_and_resume(
+            CrashingTRXMLMiner("name.0.name,address.0.address",
+                               checkpoint_interval=1e-9, crash_at=2),
+            TRXMLMiner("name.0.name,address.0.address", resume=True),
+            'tests/resource/trxmls')
+        self._assert_output(gold_file)
+
+    def test_resume_compressed(self):
+        mxml_file = os.path.join(self.test_dir, 'simple.mxml.gz')
+        with open('tests/resource/simple.mxml', 'rb') as file, \
+                gzip.open(mxml_file, 'wb') as out:
+            out.write(file.read())
+        self._crash_and_resume(
+            CrashingXMLMiner("name,address", with_field_name=True,
+                             checkpoint_interval=1e-9),
+            XMLMiner("name,address", with_field_name=True, resume=True),
+            mxml_file)
+        self._assert_output('tests/resource/gold/xml_name_address.tsv')
+
+    def test_resume_as(self):
+        data = DataLoader.load_from_mxml('tests/resource/simple.mxml')
+        docs = [doc.decode() for doc in data.data_generator]
+        with FakeASServer(docs) as server:
+            self._crash_and_resume(
+                CrashingXMLMiner("name,address", with_field_name=True,
+                                 checkpoint_interval=1e-9),
+                XMLMiner("name,address", with_field_name=True, resume=True),
+                server.address, query='')
+        self._assert_output('tests/resource/gold/xml_name_address.tsv')
+
+    def test_wrong_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            CrashingXMLMiner("name", checkpoint_interval=1e-9).mine_and_save(
+                'tests/resource/simple.mxml', self.output_file)
+        with self.assertRaises(ValueError):
+            XMLMiner("address", resume=True).mine_and_save(
+                'tests/resource/simple.mxml', self.output_file)
+
+    def test_same_positions_with_index(self):
+        for input_file, header in [
+                ('tests/resource/simple.mxml', DataLoader.XML_HEADER),
+                ('tests/resource/simple.mtrxml', DataLoader.TRXML_HEADER)]:
+            positioned = list(load_positioned_from_multi_doc_file(input_file,
+                                                                  header))
+            index = MXMLIndex.build(input_file, header)
+            self.assertEqual(list(index.iter_positioned_documents()),
+                             positioned)
+            self.assertEqual(
+                list(index.iter_positioned_documents(positioned[0][0])),
+                positioned[1:])
+            self.assertEqual(
+                list(load_positioned_from_multi_doc_file(
+                    input_file, header, positioned[0][0])),
+                positioned[1:])
@@ -0,0 +1,89 @@
+"""unit tests to mine compressed files and archives"""
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import filecmp
+from unittest import TestCase, skipIf
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.data_utils.compression import ZSTD, detect_compression, \
+    detect_archive
+
+
+class CompressionTestCases(TestCase):
+    """unit tests to stream documents from compressed input"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.eval_filename = os.path.join(self.test_dir, 'mined.tsv')
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _compress(self, input_file, suffix, open_func):
+        output_file = os.path.join(self.test_dir,
+                                   os.path.basename(input_file) + suffix)
+        with open(input_file, 'rb') as file, open_func(output_file) as out:
+            out.write(file.read())
+        return output_file
+
+    def _assert_mined(self, miner, source, gold_file):
+        miner.mine_and_save(source, self.eval_filename)
+        self.assertTrue(filecmp.cmp(self.eval_filename, gold_file,
+                                    shallow=False))
+
+    def test_compressed_mxml(self):
+        for suffix, open_func, compression in [
+                ('.gz', lambda name: gzip.open(name, 'wb'), 'gzip'),
+                ('.bz2', lambda name: bz2.open(name, 'wb'), 'bzip2'),
+                ('.xz', lambda name: lzma.open(name, 'wb'), 'xz')]:
+            mxml_file = self._compress('tests/resource/simple.mxml', suffix,
+                                       open_func)
+            self.assertEqual(detect_compression(mxml_file), compression)
+            self.assertIsNone(detect_archive(mxml_file, compression))
+            self._assert_mined(
+                XMLMiner("name,address", with_field_name=True,
+                         use_index=True),
+                mxml_file, 'tests/resource/gold/xml_name_address.tsv')
+
+            mtrxml_file = self._compress('tests/resource/simple.mtrxml',
+                                         suffix, open_func)
+            self._assert_mined(
+                TRXMLMiner("name.0.name,address.0.address"),
+                mtrxml_file, 'tests/resource/gold/trxml_name_address.tsv')
+
+    @skipIf(ZSTD is None, "zstandard is not installed")
+    def test_zstd_mxml(self):
+        def open_func(name):
+            return ZSTD.ZstdCompressor().stream_writer(open(name, 'wb'))
+        mxml_file = self._compress('tests/resource/simple.mxml', '.zst',
+                                   open_func)
+        self.assertEqual(detect_compression(mxml_file), 'zstd')
+        self._assert_mined(
+            XMLMiner("name,address", with_field_name=True),
+            mxml_file, 'tests/resource/gold/xml_name_address.tsv')
+
+    def test_archives(self):
+        dir_file = os.path.join(self.test_dir, 'from_dir.tsv')
+        TRXMLMiner("name.0.name,address.0.address").mine_and_save(
+            'tests/resource/trxmls', dir_file)
+        trxml_files = sorted(os.listdir('tests/resource/trxmls'))
+
+        tar_file = os.path.join(self.test_dir, 'trxmls.tar.gz')
+        with tarfile.open(tar_file, 'w:gz') as archive:
+            archive.add('tests/resource/trxmls', arcname='trxmls')
+        zip_file = os.path.join(self.test_dir, 'trxmls.zip')
+        with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name in trxml_files:
+                archive.write(os.path.join('tests/resource/trxmls', name),
+                              'trxmls/' + name)
+
+        self.assertEqual(detect_archive(tar_file, 'gzip'), 'tar')
+        self.assertEqual(detect_archive(zip_file), 'zip')
+        for archive_file in [tar_file, zip_file]:
+            self._assert_mined(TRXMLMiner("name.0.name,address.0.address"),
+                               archive_file, dir_file)
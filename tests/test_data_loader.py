@@ -0,0 +1,120 @@
+"""unit tests to load documents from dir, mxml and mtrxml"""
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from xml_miner.miner import XMLMiner
+from xml_miner.data_utils import DataLoader
+from xml_miner.data_utils.data_loader import load_from_string, \
+    load_from_stream, iter_dir_files
+
+LATIN_1_DOC = '<?xml version="1.0" encoding="ISO-8859-1"?>\n' \
+    '<begin filename="caf\xe9.txt"><name>Caf\xe9</name></begin>\n'
+
+
+class DataLoaderTestCases(TestCase):
+    """unit tests to split multi-document files into documents"""
+    def setUp(self):
+        self.mxml_file = 'tests/resource/simple.mxml'
+        self.mtrxml_file = 'tests/resource/simple.mtrxml'
+
+    def test_stream_same_as_string(self):
+        for input_file, header in [
+                (self.mxml_file, DataLoader.XML_HEADER),
+                (self.mtrxml_file, DataLoader.TRXML_HEADER)]:
+            with open(input_file, 'rt', encoding='utf-8') as file:
+                xml_string = file.read()
+            with open(input_file, 'rt', encoding='utf-8') as file:
+                streamed = list(load_from_stream(file, header))
+            self.assertEqual(streamed,
+                             list(load_from_string(xml_string, header)))
+            self.assertEqual(len(streamed), 3)
+            with open(input_file, 'rb') as file:
+                raw = list(load_from_stream(file, header.encode()))
+            self.assertEqual([doc.decode() for doc in raw], streamed)
+
+    def test_stream_drops_declaration(self):
+        stream = io.StringIO('<?xml version="1.0"?>\n<begin id="1">\na\n'
+                             '<?xml version="1.0"?>\n</begin>\n'
+                             '<?xml version="1.0"?>\n'
+                             '<begin id="2">b</begin>\n')
+        self.assertEqual(
+            list(load_from_stream(stream, DataLoader.XML_HEADER)),
+            ['<?xml version="1.0"?>\n<begin id="1">\na\n</begin>',
+             '<?xml version="1.0"?>\n<begin id="2">b</begin>'])
+
+    def test_declared_encoding(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            input_file = os.path.join(test_dir, 'latin.mxml')
+            with open(input_file, 'wb') as file:
+                file.write(LATIN_1_DOC.encode('iso-8859-1') * 2)
+            for use_index in [False, True]:
+                xml_miner = XMLMiner('name', use_index=use_index)
+                self.assertEqual(
+                    [selected['values']
+                     for selected in xml_miner.mine(input_file)],
+                    [{'name': ['Caf\xe9']}] * 2)
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_load_from_mxml(self):
+        data = DataLoader.load_from_mxml(self.mxml_file)
+        docs = list(data.data_generator)
+        self.assertEqual(len(docs), 3)
+        self.assertTrue(all(doc.startswith(b'<begin ') for doc in docs))
+
+
+class DirLoaderTestCases(TestCase):
+    """unit tests to load documents from a directory"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        shutil.copytree('tests/resource/trxmls',
+                        os.path.join(self.test_dir, 'trxmls'))
+        shutil.copytree('tests/resource/xmls',
+                        os.path.join(self.test_dir, 'trxmls', 'sub'))
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_iter_dir_files(self):
+        input_dir = os.path.join(self.test_dir, 'trxmls')
+        files = list(iter_dir_files(input_dir))
+        self.assertEqual([os.path.basename(path) for path in files],
+                         ['foo1.doc.trxml', 'foo2.doc.trxml',
+                          'foo3.pdf.trxml'])
+
+        all_files = list(iter_dir_files(input_dir, recursive=True))
+        self.assertEqual(len(all_files), 7)
+        self.assertEqual(all_files[:3], files)
+        self.assertEqual(
+            sorted(iter_dir_files(input_dir, recursive=True, sort=False)),
+            sorted(all_files))
+
+    def test_prefetch(self):
+        input_dir = os.path.join(self.test_dir, 'trxmls')
+        expected = list(DataLoader.load_from_dir(
+            input_dir, recursive=True).data_generator)
+        self.assertEqual(len(expected), 7)
+        for prefetch in [1, 4]:
+            data = DataLoader.load_from_dir(input_dir, recursive=True,
+                                            prefetch=prefetch)
+            self.assertEqual(list(data.data_generator), expected)
+
+    def test_declared_encoding(self):
+        input_dir = os.path.join(self.test_dir, 'latin')
+        os.mkdir(input_dir)
+        with open(os.path.join(input_dir, 'cafe.xml'), 'wb') as file:
+            file.write(LATIN_1_DOC.encode('iso-8859-1'))
+        xml_miner = XMLMiner('name')
+        self.assertEqual(
+            [selected['values'] for selected in xml_miner.mine(input_dir)],
+            [{'name': ['Caf\xe9']}])
+
+    def test_empty_dir(self):
+        empty_dir = os.path.join(self.test_dir, 'empty')
+        os.mkdir(empty_dir)
+        with self.assertRaises(RuntimeError):
+            DataLoader.load_from_dir(empty_dir)
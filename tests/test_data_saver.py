@@ -0,0 +1,86 @@
+"""unit tests to save the selected values"""
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.data_utils import DataSaver
+from xml_miner.data_utils.data_saver import PA, PQ
+
+
+class DataSaverTestCases(TestCase):
+    """unit tests to write plain and compressed output files"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.rows = [['filename', 'value'], ['a.txt', 'b\tc'],
+                     ['caf\xe9.txt', '"d"']]
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _save(self, filename, buffer_size=DataSaver.WRITE_BUFFER_SIZE):
+        output_file = os.path.join(self.test_dir, filename)
+        writer = DataSaver(output_file, buffer_size)
+        writer.store(self.rows[0])
+        writer.store_many(self.rows[1:])
+        writer.close_stream()
+        return output_file
+
+    def test_store_many_same_as_store(self):
+        for extension in ['.tsv', '.jsonl', '.txt']:
+            output_file = os.path.join(self.test_dir, 'rows' + extension)
+            writer = DataSaver(output_file)
+            for row in self.rows:
+                writer.store(row)
+            writer.close_stream()
+            with open(output_file, 'rb') as file:
+                expected = file.read()
+            with open(self._save('many' + extension, 16), 'rb') as file:
+                self.assertEqual(file.read(), expected)
+
+    def test_compressed_output(self):
+        with open(self._save('rows.tsv'), 'rb') as file:
+            expected = file.read()
+        writer = DataSaver(os.path.join(self.test_dir, 'rows.tsv.gz'))
+        self.assertEqual(writer.format, '.tsv')
+        self.assertEqual(writer.compression, 'gzip')
+        writer.close_stream()
+        with gzip.open(self._save('rows.tsv.gz'), 'rb') as file:
+            self.assertEqual(file.read(), expected)
+        with lzma.open(self._save('rows.tsv.xz'), 'rb') as file:
+            self.assertEqual(file.read(), expected)
+
+    def test_mine_to_compressed_output(self):
+        output_file = os.path.join(self.test_dir, 'name_address.tsv.gz')
+        xml_miner = XMLMiner("name,address", with_field_name=True)
+        xml_miner.mine_and_save('tests/resource/simple.mxml', output_file)
+        with gzip.open(output_file, 'rb') as file, \
+                open('tests/resource/gold/xml_name_address.tsv', 'rb') as gold:
+            self.assertEqual(file.read(), gold.read())
+
+    @skipIf(PA is None, "pyarrow is not installed")
+    def test_columnar_output(self):
+        parquet_file = os.path.join(self.test_dir, 'name_address.parquet')
+        trxml_miner = TRXMLMiner("name.0.name,address.0.address",
+                                 row_group_size=2)
+        trxml_miner.mine_and_save('tests/resource/simple.mtrxml',
+                                  parquet_file)
+        with open('tests/resource/gold/trxml_name_address.tsv', 'rt',
+                  encoding='utf-8') as gold:
+            gold_rows = [line.rstrip('\n').split('\t') for line in gold]
+        parquet = PQ.ParquetFile(parquet_file)
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        self.assertEqual(parquet.schema_arrow.names, gold_rows[0])
+        self.assertEqual(
+            [list(row.values()) for row in parquet.read().to_pylist()],
+            gold_rows[1:])
+
+        arrow_file = self._save('rows.arrow')
+        with PA.OSFile(arrow_file, 'rb') as source:
+            table = PA.ipc.open_file(source).read_all()
+        self.assertEqual(table.column_names, self.rows[0])
+        self.assertEqual([list(row.values()) for row in table.to_pylist()],
+                         self.rows[1:])
@@ -0,0 +1,131 @@
+"""unit tests to filter and sample the documents before parsing"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.data_utils import DataLoader, DocFilter, IncrementalManifest, \
+    MXMLIndex
+from xml_miner.data_utils.doc_filter import doc_filename
+
+
+class DocFilterTestCases(TestCase):
+    """unit tests of the DocFilter object"""
+    def test_doc_filename(self):
+        self.assertEqual(doc_filename(b'<begin id="1" filename="a.txt">'),
+                         'a.txt')
+        self.assertEqual(doc_filename(
+            '<?xml version="1.0"?>\n<TextractorResult lang="en"><Document '
+            "filename='t/a &amp; b.doc'>"), 't/a & b.doc')
+        self.assertEqual(doc_filename(
+            '<?xml version="1.0" encoding="ISO-8859-1"?>\n'
+            '<begin filename="caf\xe9.txt">'.encode('iso-8859-1')),
+            'caf\xe9.txt')
+        self.assertEqual(doc_filename(b'<begin id="1">'), '__UNKNOWN__')
+
+    def test_filter_and_limit(self):
+        docs = [(position, f'<begin filename="{name}"/>')
+                for position, name in enumerate(['a.pdf', 'b.doc', 'c.pdf',
+                                                 'd.pdf'], 1)]
+        doc_filter = DocFilter(filename_pattern=r'\.pdf$', limit=2)
+        self.assertEqual([position for position, _ in
+                          doc_filter.positioned_docs(iter(docs))], [1, 3])
+        self.assertTrue(DocFilter().selects_all)
+        self.assertEqual(DocFilter(limit=2).num_documents(4), 2)
+        self.assertIsNone(doc_filter.num_documents(4))
+
+    def test_samples(self):
+        positioned = list(enumerate(map(str, range(1000))))
+        for doc_filter in [DocFilter(sample_rate=0.1, seed=1),
+                           DocFilter(sample_size=100, seed=1)]:
+            sample = list(doc_filter.positioned_paths(iter(positioned)))
+            self.assertEqual(sample, sorted(sample))
+            self.assertLess(abs(len(sample) - 100), 40)
+            self.assertEqual(
+                list(doc_filter.positioned_paths(iter(positioned))), sample)
+        self.assertEqual(len(list(DocFilter(sample_size=100).positioned_paths(
+            iter(positioned[:10])))), 10)
+
+    def test_resumed_sample(self):
+        doc_filter = DocFilter(sample_rate=0.3, seed=1)
+        positioned = list(enumerate(map(str, range(100))))
+        sample = list(doc_filter.positioned_paths(iter(positioned)))
+        self.assertEqual(
+            list(doc_filter.positioned_paths(iter(positioned[50:]))),
+            [pair for pair in sample if pair[0] >= 50])
+
+    def test_split_ids(self):
+        ids = [str(doc_id) for doc_id in range(100)]
+        doc_filter = DocFilter(sample_rate=0.3, seed=1, limit=5)
+        ids_filter, docs_filter = doc_filter.split_ids()
+        self.assertTrue(docs_filter.selects_all)
+        self.assertEqual(len(ids_filter.kept_ids(ids)), 5)
+
+        doc_filter = DocFilter(r'\.pdf$', sample_rate=0.3, seed=1, limit=5)
+        ids_filter, docs_filter = doc_filter.split_ids()
+        self.assertEqual(ids_filter.kept_ids(ids),
+                         [doc_id for doc_id, _ in DocFilter(
+                             sample_rate=0.3, seed=1).positioned_paths(
+                                 (doc_id, doc_id) for doc_id in ids)])
+        self.assertEqual(docs_filter.limit, 5)
+        with self.assertRaises(ValueError):
+            doc_filter.kept_ids(ids)
+
+    def test_invalid(self):
+        for options in [{'sample_rate': 0}, {'sample_rate': 1.5},
+                        {'sample_rate': 0.1, 'sample_size': 10},
+                        {'limit': -1}]:
+            with self.assertRaises(ValueError):
+                DocFilter(**options)
+        with self.assertRaises(ValueError):
+            XMLMiner('name', limit=10, resume=True)
+        with self.assertRaises(ValueError):
+            XMLMiner('name', sample=0.1, resume=True)
+        XMLMiner('name', sample=0.1, seed=1, resume=True)
+
+
+class FilteredMiningTestCases(TestCase):
+    """unit tests to mine the filtered documents"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_mine_filtered(self):
+        for use_index in [False, True]:
+            mxml_file = os.path.join(self.test_dir, 'simple.mxml')
+            shutil.copy('tests/resource/simple.mxml', mxml_file)
+            mined = XMLMiner('name', use_index=use_index,
+                             filter_filename='test0[13]').mine(mxml_file)
+            self.assertEqual([selected.file for selected in mined],
+                             ['test01.pdf.txtorin', 'test03.pdf.txtorin'])
+        mined = TRXMLMiner('name.0.name', limit=2).mine(
+            'tests/resource/simple.mtrxml')
+        self.assertEqual(len(list(mined)), 2)
+
+    def test_same_filename_as_index(self):
+        mxml_file = os.path.join(self.test_dir, 'latin.mxml')
+        with open(mxml_file, 'wb') as file:
+            file.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n'
+                       '<begin sourcefilename="a.doc" filename="caf\xe9.txt">'
+                       'x</begin>\n'.encode('iso-8859-1'))
+        with MXMLIndex.build(mxml_file, DataLoader.XML_HEADER) as index:
+            self.assertEqual(list(index.positions), ['caf\xe9.txt'])
+            self.assertEqual(doc_filename(index.get(0)), 'caf\xe9.txt')
+
+    def test_filtered_dir(self):
+        data = DataLoader.load_from_dir(
+            'tests/resource/xmls', doc_filter=DocFilter(r'test_0[23]'))
+        self.assertEqual([position for position, _ in
+                          data.positioned_generator], [2, 3])
+
+        manifest_file = os.path.join(self.test_dir, 'manifest.sqlite')
+        manifest = IncrementalManifest(manifest_file, 'fingerprint')
+        data = DataLoader.load_from_dir('tests/resource/xmls',
+                                        manifest=manifest,
+                                        doc_filter=DocFilter(limit=1))
+        self.assertEqual(len(list(data.positioned_generator)), 1)
+        self.assertFalse(manifest.complete_run)
+        manifest.close()
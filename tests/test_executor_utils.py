@@ -0,0 +1,41 @@
+"""unit tests of the bounded submission of tasks to an executor"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from xml_miner.executor_utils import bounded_submit
+
+
+class BoundedSubmitTestCases(TestCase):
+    """unit tests to run tasks with a bounded number in flight"""
+    def test_ordered(self):
+        def slow_square(item):
+            time.sleep(0.01 * (5 - item))
+            return item * item
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(
+                [(item, future.result()) for item, future in
+                 bounded_submit(executor, slow_square, range(5), 4)],
+                [(item, item * item) for item in range(5)])
+            unordered = [item for item, _ in bounded_submit(
+                executor, slow_square, range(5), 4, ordered=False)]
+        self.assertEqual(sorted(unordered), list(range(5)))
+        self.assertNotEqual(unordered, list(range(5)))
+
+    def test_max_in_flight(self):
+        lock = threading.Lock()
+        read = []
+
+        def items():
+            for item in range(20):
+                with lock:
+                    read.append(item)
+                yield item
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            tasks = bounded_submit(executor, str, items(), 3)
+            next(tasks)
+            # the consumed task, and at most 3 tasks in flight
+            self.assertLessEqual(len(read), 4)
+            tasks.close()
@@ -0,0 +1,98 @@
+"""unit tests of the incremental mode over a dir"""
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase
+from xml_miner.miner import TRXMLMiner
+
+
+class CountingTRXMLMiner(TRXMLMiner):
+    """a TRXMLMiner counting the parsed documents"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.num_parsed = 0
+
+    def select_doc(self, doc):
+        self.num_parsed += 1
+        return super().select_doc(doc)
+
+
+class IncrementalTestCases(TestCase):
+    """unit tests to only parse the new and changed files of a dir"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.test_dir, 'trxmls')
+        shutil.copytree('tests/resource/trxmls', self.input_dir)
+        self.manifest = os.path.join(self.test_dir, 'manifest.sqlite')
+        self.selectors = "name.0.name,address.0.address"
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _mine(self, **kwargs):
+        miner = CountingTRXMLMiner(self.selectors, manifest=self.manifest,
+                                   **kwargs)
+        output_file = os.path.join(self.test_dir, 'mined.tsv')
+        miner.mine_and_save(self.input_dir, output_file)
+        with open(output_file, 'rt', encoding='utf-8') as file:
+            return miner.num_parsed, file.read()
+
+    def test_incremental_runs(self):
+        num_parsed, expected = self._mine()
+        self.assertEqual(num_parsed, 3)
+        self.assertEqual(self._mine(), (0, expected))
+
+        # same content with a new modification time: read, not parsed
+        foo1 = os.path.join(self.input_dir, 'foo1.doc.trxml')
+        os.utime(foo1, ns=(0, 0))
+        self.assertEqual(self._mine(), (0, expected))
+
+        foo2 = os.path.join(self.input_dir, 'foo2.doc.trxml')
+        with open(foo2, 'rt', encoding='utf-8') as file:
+            content = file.read()
+        with open(foo2, 'wt', encoding='utf-8') as file:
+            file.write(content.replace('Foo2 Bar2', 'Foo2 Changed'))
+        num_parsed, output = self._mine()
+        self.assertEqual(num_parsed, 1)
+        self.assertEqual(output, expected.replace('Foo2 Bar2',
+                                                  'Foo2 Changed'))
+
+        # other selectors do not share the results
+        miner = CountingTRXMLMiner("name.0.name", manifest=self.manifest)
+        self.assertEqual(len(list(miner.mine(self.input_dir))), 3)
+        self.assertEqual(miner.num_parsed, 3)
+
+    def test_removed_files(self):
+        self._mine()
+        os.remove(os.path.join(self.input_dir, 'foo3.pdf.trxml'))
+        foo2 = os.path.join(self.input_dir, 'foo2.doc.trxml')
+        with open(foo2, 'at', encoding='utf-8') as file:
+            file.write('\n')
+
+        expected_file = os.path.join(self.test_dir, 'expected.tsv')
+        TRXMLMiner(self.selectors).mine_and_save(self.input_dir,
+                                                 expected_file)
+        with open(expected_file, 'rt', encoding='utf-8') as file:
+            expected = file.read()
+        _, output = self._mine(workers=2, batch_size=1)
+        self.assertEqual(output, expected)
+        self.assertEqual(len(output.splitlines()), 3)
+        with sqlite3.connect(self.manifest) as connection:
+            self.assertEqual(connection.execute(
+                'SELECT COUNT(*) FROM documents').fetchone()[0], 2)
+
+    def test_prefetch(self):
+        num_parsed, expected = self._mine()
+        foo2 = os.path.join(self.input_dir, 'foo2.doc.trxml')
+        with open(foo2, 'at', encoding='utf-8') as file:
+            file.write('\n')
+        num_parsed, output = self._mine(prefetch=2)
+        self.assertEqual((num_parsed, output), (1, expected))
+
+    def test_not_a_dir(self):
+        miner = TRXMLMiner(self.selectors, manifest=self.manifest)
+        with self.assertRaises(ValueError):
+            list(miner.mine('tests/resource/simple.mtrxml'))
+        self.assertFalse(os.path.exists(self.manifest))
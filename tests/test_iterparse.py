@@ -0,0 +1,134 @@
+"""unit tests to select values while parsing, without building the tree"""
+import os
+import glob
+import shutil
+import tempfile
+import filecmp
+import xml.etree.ElementTree as ET
+from unittest import TestCase
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.selectors import XMLSelectors, TRXMLSelectors
+from xml_miner.xml import TKXML, TKTRXML
+
+
+class IterparseTestCases(TestCase):
+    """compare the iterparse selection with the tree selection"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _assert_same_xml(self, selector_string, xml_string):
+        selectors = XMLSelectors.from_selector_string(selector_string)
+        xml_obj = TKXML.from_string(xml_string)
+        self.assertEqual(
+            selectors.iterselect_xml_fields(xml_string),
+            (xml_obj.filename, selectors.select_xml_fields(xml_obj)))
+
+    def _assert_same_trxml(self, selectors, trxml_string):
+        trxml_obj = TKTRXML.from_string(trxml_string)
+        self.assertEqual(
+            selectors.iterselect_trxml_fields(trxml_string),
+            (trxml_obj.filename, selectors.select_trxml_fields(trxml_obj)))
+
+    def test_xml_fixtures(self):
+        for xml_file in glob.glob('tests/resource/xmls/test_0*.xml'):
+            with open(xml_file, 'rt', encoding='utf-8') as file:
+                xml_string = file.read()
+            for selector_string in ['name', 'name,address', 'item',
+                                    'experienceorgplace,experienceorg',
+                                    'begin', 'unknown']:
+                self._assert_same_xml(selector_string, xml_string)
+
+    def test_xml_nested(self):
+        self._assert_same_xml(
+            'a,b',
+            '<r><a>1<b>2<a>3</a>4</b>5</a>x<b>6</b><c><a/></c>'
+            '<!-- skip --><a>7<?pi x?>8</a></r>')
+
+    def test_trxml_fixtures(self):
+        for trxml_file in glob.glob('tests/resource/trxmls/*.trxml'):
+            with open(trxml_file, 'rt', encoding='utf-8') as file:
+                trxml_string = file.read()
+            for selector_string in [
+                    'name.0.name', 'name.0.name,address.0.address',
+                    'experienceitem.1.experience,unknown.0.unknown',
+                    'experienceitem.*.experience',
+                    'experienceitem.*.experience,experienceitem.*.extra_1']:
+                self._assert_same_trxml(
+                    TRXMLSelectors.from_selector_string(selector_string),
+                    trxml_string)
+
+    def test_trxml_duplicates(self):
+        trxml_string = (
+            '<TextractorResult><Document filename="f.doc">text</Document>'
+            '<DocumentStructure>'
+            '<ItemGroup key="a"><Item index="0">'
+            '<Field key="x"/><Field key="y"><Value/></Field></Item>'
+            '<Item index="1"><Field key="x"><Value>a1</Value></Field></Item>'
+            '<Item index="1"><Field key="x"><Value>a1b</Value>'
+            '<Value>a1c</Value></Field></Item></ItemGroup>'
+            '<ItemGroup key="a"><Item index="0">'
+            '<Field key="x"><Value>b0</Value></Field></Item></ItemGroup>'
+            '<Other><Item index="0"><Field key="z"><Value>no</Value>'
+            '</Field></Item></Other>'
+            '</DocumentStructure>'
+            '<DocumentStructure><ItemGroup key="c"><Item index="0">'
+            '<Field key="z"><Value>no</Value></Field></Item></ItemGroup>'
+            '</DocumentStructure></TextractorResult>')
+        for selector_string in ['a.0.x,a.0.y,a.1.x,c.0.z', 'a.*.x,a.*.y']:
+            self._assert_same_trxml(
+                TRXMLSelectors.from_selector_string(selector_string),
+                trxml_string)
+
+    def test_trxml_early_exit(self):
+        structure = (
+            '<DocumentStructure><ItemGroup key="name"><Item index="0">'
+            '<Field key="name"><Value>Chao</Value></Field></Item></ItemGroup>'
+            '<ItemGroup key="skill"><Item index="0">')
+        selectors = TRXMLSelectors.from_selector_string('name.0.name')
+        # the parsing stops before the truncated end of the document
+        self.assertEqual(selectors.iterselect_trxml_values(
+            '<TextractorResult><Document filename="f.doc"/>' + structure),
+            ('f.doc', ['Chao']))
+        self.assertEqual(selectors.iterselect_trxml_values(
+            '<TextractorResult>' + structure + '</Item></ItemGroup>'
+            '</DocumentStructure><Document filename="f.doc"/>'),
+            ('f.doc', ['Chao']))
+        selectors = TRXMLSelectors.from_selector_string(
+            'name.0.name,skill.0.skill')
+        with self.assertRaises(ET.ParseError):
+            selectors.iterselect_trxml_values(
+                '<TextractorResult><Document filename="f.doc"/>' + structure)
+
+    def test_trxml_no_structure(self):
+        selectors = TRXMLSelectors.from_selector_string('name.0.name')
+        with self.assertRaises(AttributeError):
+            selectors.iterselect_trxml_fields(
+                '<TextractorResult><Document/></TextractorResult>')
+
+    def test_mine_with_iterparse(self):
+        eval_filename = os.path.join(self.test_dir, 'from_mxml.csv')
+        xml_miner = XMLMiner("name,address", with_field_name=True,
+                             engine='iterparse')
+        xml_miner.mine_and_save('tests/resource/simple.mxml', eval_filename)
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/xml_name_address.tsv',
+            shallow=False))
+
+        trxml_miner = TRXMLMiner(
+            "experienceitem.*.experience,experienceitem.*.experienceorgplace",
+            engine='iterparse')
+        trxml_miner.mine_and_save('tests/resource/simple.mtrxml',
+                                  eval_filename)
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/trxml_exp.tsv',
+            shallow=False))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            XMLMiner("name", engine='unknown')
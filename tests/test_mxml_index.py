@@ -0,0 +1,115 @@
+"""unit tests for the byte offset index of mxml/mtrxml files"""
+import os
+import shutil
+import tempfile
+import filecmp
+from unittest import TestCase
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.data_utils import DataLoader, MXMLIndex
+from xml_miner.data_utils.data_loader import load_from_multi_doc_file
+from xml_miner.xml import TKXML
+
+
+class MXMLIndexTestCases(TestCase):
+    """unit tests to index and serve documents of mxml/mtrxml files"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.mxml_file = os.path.join(self.test_dir, 'simple.mxml')
+        self.mtrxml_file = os.path.join(self.test_dir, 'simple.mtrxml')
+        shutil.copy('tests/resource/simple.mxml', self.mxml_file)
+        shutil.copy('tests/resource/simple.mtrxml', self.mtrxml_file)
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, content):
+        input_file = os.path.join(self.test_dir, 'edge.mxml')
+        with open(input_file, 'wt', encoding='utf-8') as file:
+            file.write(content)
+        return input_file
+
+    def _assert_same_as_split(self, input_file, header):
+        expected = list(load_from_multi_doc_file(input_file, header))
+        index = MXMLIndex.build(input_file, header)
+        self.assertEqual(list(index.iter_documents()), expected)
+
+    def test_same_documents_as_split(self):
+        self._assert_same_as_split(self.mxml_file, DataLoader.XML_HEADER)
+        self._assert_same_as_split(self.mtrxml_file, DataLoader.TRXML_HEADER)
+
+    def test_edge_cases(self):
+        header = DataLoader.XML_HEADER
+        for content in [
+                '',
+                '\n',
+                '<begin id="1">a</begin>',
+                '<begin id="1">a</begin>\n\n',
+                'junk\n<begin id="1">a</begin>\n',
+                '<?xml version="1.0"?>\n<begin id="1">a\n<?xml ?>\nb</begin>',
+                '<begin>a</begin>\n<?xml ?>\n<?xml ?>\n<begin>b</begin>\n',
+                '<begin>a\n<?xml ?>\nb\n<?xml ?>\n</begin>\n<?xml ?>\n'
+                '<begin>c</begin>\n',
+                'junk\n<?xml ?>\n<begin>a</begin>\n',
+                '<?xml ?>\nno header\n',
+                'no header at all\n<?xml ?>\n']:
+            self._assert_same_as_split(self._write(content), header)
+
+    def test_documents_without_copy(self):
+        index = MXMLIndex.build(self.mxml_file, DataLoader.XML_HEADER)
+        documents = list(index.iter_documents())
+        # the views outlive the iteration, the memory map is kept for them
+        self.assertTrue(all(isinstance(document, memoryview)
+                            for document in documents))
+        self.assertEqual(documents, list(load_from_multi_doc_file(
+            self.mxml_file, DataLoader.XML_HEADER)))
+
+    def test_persisted_index(self):
+        index = MXMLIndex.load_or_build(self.mxml_file, DataLoader.XML_HEADER)
+        self.assertTrue(os.path.isfile(MXMLIndex.index_file(self.mxml_file)))
+        loaded = MXMLIndex.load(self.mxml_file, DataLoader.XML_HEADER)
+        self.assertEqual(loaded.documents, index.documents)
+        self.assertIsNone(
+            MXMLIndex.load(self.mxml_file, DataLoader.TRXML_HEADER))
+
+        with open(self.mxml_file, 'at', encoding='utf-8') as file:
+            file.write('<begin filename="new.txt"><name>x</name></begin>\n')
+        self.assertIsNone(MXMLIndex.load(self.mxml_file,
+                                         DataLoader.XML_HEADER))
+
+    def test_random_access(self):
+        index = MXMLIndex.build(self.mtrxml_file, DataLoader.TRXML_HEADER)
+        with index:
+            self.assertEqual(len(index), 3)
+            document = index.get_by_filename('t/test-cvs/foo2.doc')
+            self.assertEqual(document, index.get(1))
+            self.assertIn(b'filename="t/test-cvs/foo2.doc"', document)
+
+        input_file = self._write('')
+        with open(input_file, 'wb') as file:
+            file.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n'
+                       '<begin filename="latin.txt">caf\xe9</begin>\n'
+                       .encode('iso-8859-1'))
+        with MXMLIndex.build(input_file, DataLoader.XML_HEADER) as index:
+            self.assertEqual(
+                TKXML.from_string(index.get_by_filename('latin.txt'))
+                .top_level_obj.text, 'caf\xe9')
+
+    def test_mine_with_index(self):
+        eval_filename = os.path.join(self.test_dir, 'from_mxml.csv')
+        for _ in range(2):
+            xml_miner = XMLMiner("name,address", with_field_name=True,
+                                 use_index=True)
+            xml_miner.mine_and_save(self.mxml_file, eval_filename)
+            self.assertTrue(filecmp.cmp(
+                eval_filename,
+                'tests/resource/gold/xml_name_address.tsv',
+                shallow=False))
+
+        trxml_miner = TRXMLMiner("name.0.name,address.0.address",
+                                 use_index=True)
+        trxml_miner.mine_and_save(self.mtrxml_file, eval_filename)
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/trxml_name_address.tsv',
+            shallow=False))
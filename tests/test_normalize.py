@@ -0,0 +1,41 @@
+"""unit tests of the normalization of batches of documents"""
+from unittest import TestCase
+from xml_miner.miner import CommonMiner, TRXMLMiner, XMLMiner
+
+
+class NormalizeTestCases(TestCase):
+    """unit tests to normalize and count the values of many documents"""
+    def test_normalize_strings(self):
+        values = ['a\nb', 'c\td', '', None, 'e', 'f\x00g\n']
+        self.assertEqual(CommonMiner.normalize_strings(values),
+                         [CommonMiner.normalize_string(value)
+                          for value in values])
+        self.assertEqual(CommonMiner.normalize_strings([]), [])
+
+    def _assert_same_batch(self, miner, source):
+        mined = list(miner.mine(source))
+        rows = miner._batch_records(mined)
+        counters = (miner.num_values, dict(miner.value_counter))
+        miner._init_counter()
+        self.assertEqual(rows, [row for selected in mined
+                                for row in miner._batch_records([selected])])
+        self.assertEqual((miner.num_values, dict(miner.value_counter)),
+                         counters)
+        return rows
+
+    def test_xml_batch(self):
+        miner = XMLMiner("name,address", with_field_name=True)
+        rows = self._assert_same_batch(miner, 'tests/resource/simple.mxml')
+        self.assertIn(['test03.pdf.txtorin', 'third__NEWLINE__          name',
+                       'name'], rows)
+        self.assertEqual(miner.num_values, len(rows))
+        self.assertEqual(miner.num_values, sum(miner.value_counter.values()))
+
+    def test_trxml_batch(self):
+        for selectors in ["name.0.name,address.0.address",
+                          "experienceitem.*.experience,"
+                          "experienceitem.*.experiencedate"]:
+            miner = TRXMLMiner(selectors)
+            self._assert_same_batch(miner, 'tests/resource/simple.mtrxml')
+            self.assertEqual(miner.num_values,
+                             sum(miner.value_counter.values()))
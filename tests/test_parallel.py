@@ -0,0 +1,47 @@
+"""unit tests to mine documents with multiple worker processes"""
+import os
+import shutil
+import tempfile
+import filecmp
+from unittest import TestCase
+from xml_miner.miner import XMLMiner, TRXMLMiner
+
+
+class ParallelMinerTestCases(TestCase):
+    """unit tests to mine with workers and compare to the gold files"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_xml_ordered(self):
+        eval_filename = os.path.join(self.test_dir, 'from_mxml.csv')
+        xml_miner = XMLMiner("name,address", with_field_name=True,
+                             workers=2, batch_size=1)
+        xml_miner.mine_and_save('tests/resource/simple.mxml', eval_filename)
+        self.assertEqual(xml_miner.num_docs, 3)
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/xml_name_address.tsv',
+            shallow=False))
+
+    def test_trxml_ordered(self):
+        eval_filename = os.path.join(self.test_dir, 'from_dir.csv')
+        trxml_miner = TRXMLMiner(
+            "experienceitem.*.experience,experienceitem.*.experienceorgplace",
+            workers=2, batch_size=2)
+        trxml_miner.mine_and_save('tests/resource/trxmls', eval_filename)
+        self.assertTrue(filecmp.cmp(
+            eval_filename,
+            'tests/resource/gold/trxml_exp.tsv',
+            shallow=False))
+
+    def test_unordered(self):
+        serial = list(XMLMiner("name").mine('tests/resource/xmls'))
+        xml_miner = XMLMiner("name", workers=2, batch_size=1, ordered=False)
+        parallel = list(xml_miner.mine('tests/resource/xmls'))
+        self.assertEqual(xml_miner.num_docs, len(serial))
+        self.assertEqual(sorted(parallel, key=lambda doc: doc['file']),
+                         sorted(serial, key=lambda doc: doc['file']))
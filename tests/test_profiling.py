@@ -0,0 +1,86 @@
+"""unit tests of the profiler and the hooks of the miners"""
+import os
+import pstats
+import shutil
+import tempfile
+import tracemalloc
+from unittest import TestCase
+from xml_miner import LOGGER
+from xml_miner.miner import HOOK, TRXMLMiner, XMLMiner
+from xml_miner.profiling import PROFILER
+
+
+def _parsed_in_worker(doc, tree):
+    '''a picklable on_doc_parsed callback, called in the worker processes'''
+
+
+class ProfilingTestCases(TestCase):
+    """unit tests to profile mine_and_save"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.test_dir, 'mined.tsv')
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_cprofile(self):
+        miner = XMLMiner("name", profile=PROFILER['CPROFILE'], profile_top=5)
+        with self.assertLogs(LOGGER) as logs:
+            miner.mine_and_save('tests/resource/simple.mxml',
+                                self.output_file)
+        stats = pstats.Stats(self.output_file + '.prof')
+        self.assertTrue(any(function[2] == 'select_doc'
+                            for function in stats.stats))
+        self.assertTrue(any('top 5 functions' in line
+                            for line in logs.output))
+
+    def test_tracemalloc(self):
+        profile_file = os.path.join(self.test_dir, 'run.tracemalloc')
+        miner = TRXMLMiner("name.0.name", profile=PROFILER['TRACEMALLOC'],
+                           profile_file=profile_file)
+        miner.mine_and_save('tests/resource/simple.mtrxml', self.output_file)
+        self.assertFalse(tracemalloc.is_tracing())
+        snapshot = tracemalloc.Snapshot.load(profile_file)
+        self.assertTrue(snapshot.statistics('lineno'))
+
+    def test_unknown_profiler(self):
+        with self.assertRaises(ValueError):
+            XMLMiner("name", profile='perf')
+
+
+class HookTestCases(TestCase):
+    """unit tests of the callbacks attached to the runs"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.test_dir, 'mined.tsv')
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_hooks(self):
+        for workers in [1, 2]:
+            miner = XMLMiner("name", workers=workers)
+            events = {hook: [] for hook in HOOK.values()}
+            for hook, calls in events.items():
+                miner.add_hook(hook, lambda *args, calls=calls:
+                               calls.append(args))
+            if workers > 1:
+                # the callbacks of the workers are pickled with the miner
+                miner.hooks[HOOK['DOC_PARSED']] = [_parsed_in_worker]
+            miner.mine_and_save('tests/resource/simple.mxml',
+                                self.output_file)
+            with open(self.output_file, 'rt', encoding='utf-8') as file:
+                num_rows = len(file.readlines()) - 1
+            self.assertEqual(len(events['on_doc_selected']), 3)
+            self.assertEqual(len(events['on_row_written']), num_rows)
+            self.assertEqual(events['on_row_written'][0],
+                             (['test01.pdf.txtorin', 'bar'],))
+            # the parsed documents are seen in the worker processes
+            self.assertEqual(len(events['on_doc_parsed']),
+                             3 if workers == 1 else 0)
+
+    def test_unknown_hook(self):
+        with self.assertRaises(ValueError):
+            XMLMiner("name").add_hook('on_doc_loaded', print)
@@ -0,0 +1,71 @@
+"""unit tests of the records of the selected values"""
+import json
+import pickle
+from unittest import TestCase
+from xml_miner.miner import XMLMiner, TRXMLMiner
+from xml_miner.record import MinedDoc, MinedItems
+from xml_miner.selectors import TRXMLSelectors
+from xml_miner.xml import TKTRXML
+
+DUPLICATED_ITEMS = '''<TextractorResult><Document filename="dup.doc"/>
+<DocumentStructure><ItemGroup key="skill">
+<Item index="0"><Field key="skill"><Value>java</Value></Field></Item>
+<Item index="1"><Field key="skill"><Value>python</Value></Field></Item>
+<Item index="0"><Field key="skill"><Value>sql</Value></Field></Item>
+</ItemGroup></DocumentStructure></TextractorResult>'''
+
+
+class MinedDocTestCases(TestCase):
+    """unit tests of the records and their dict view"""
+    def test_dict_view(self):
+        record = MinedDoc('a.xml', [['foo', 'bar'], []], ['name', 'address'])
+        expected = {'file': 'a.xml',
+                    'values': {'name': ['foo', 'bar'], 'address': []}}
+        self.assertEqual(record.as_dict(), expected)
+        self.assertEqual(record, expected)
+        self.assertEqual(record['file'], 'a.xml')
+        self.assertEqual(record['values'], expected['values'])
+        with self.assertRaises(KeyError):
+            record['id']
+
+        items = MinedItems('a.trxml', [('0', ['java', 'comp'])],
+                           ['skill.*.skill', 'skill.*.type'])
+        self.assertEqual(items['values'],
+                         {'0': {'skill.*.skill': 'java',
+                                'skill.*.type': 'comp'}})
+
+    def test_dump_and_load(self):
+        fields = ['skill.*.skill']
+        for record in [MinedDoc('a.xml', [['foo']], ['name']),
+                       MinedItems('a.trxml', [('0', ['java'])], fields)]:
+            dumped = json.loads(json.dumps(record.dump()))
+            self.assertEqual(type(record).load(dumped, record.fields),
+                             record)
+            self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+    def test_mined_records(self):
+        mined = list(XMLMiner("name,address").mine(
+            'tests/resource/simple.mxml'))
+        self.assertTrue(all(isinstance(doc, MinedDoc) for doc in mined))
+        self.assertEqual(mined[1].as_dict(),
+                         {'file': 'test02.pdf.txtorin',
+                          'values': {'name': ['foo', 'bar'],
+                                     'address': ['bbbbbb aaaaa']}})
+
+        mined = list(TRXMLMiner("experienceitem.*.experience").mine(
+            'tests/resource/simple.mtrxml'))
+        self.assertIsInstance(mined[0], MinedItems)
+        self.assertEqual(mined[0].values,
+                         [('0', ['Supervisor Human Resources']),
+                          ('1', ['Consultant Logistics'])])
+
+    def test_duplicated_item_index(self):
+        selectors = TRXMLSelectors.from_selector_string("skill.*.skill")
+        expected = [('0', ['sql']), ('1', ['python'])]
+        self.assertEqual(selectors.select_trxml_values(
+            TKTRXML.from_string(DUPLICATED_ITEMS)), expected)
+        self.assertEqual(selectors.iterselect_trxml_values(DUPLICATED_ITEMS),
+                         ('dup.doc', expected))
+        self.assertEqual(selectors.iterselect_trxml_fields(DUPLICATED_ITEMS),
+                         ('dup.doc', {'0': {'skill.*.skill': 'sql'},
+                                      '1': {'skill.*.skill': 'python'}}))
@@ -0,0 +1,97 @@
+"""unit tests of the on-disk cache of the selected values"""
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase, skipIf
+from xml_miner.miner import XMLMiner
+from xml_miner.result_cache import ResultCache
+from xml_miner.data_utils.incremental import CachedSelection
+from xml_miner.xml.backend import LXML_ETREE
+
+
+class ResultCacheTestCases(TestCase):
+    """unit tests to reuse the results of the documents already mined"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.test_dir, 'cache.sqlite')
+        self.output_file = os.path.join(self.test_dir, 'mined.tsv')
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def _mine(self, selectors, **kwargs):
+        miner = XMLMiner(selectors, with_field_name=True,
+                         cache=self.cache_file, **kwargs)
+        miner.mine_and_save('tests/resource/simple.mxml', self.output_file)
+        with open(self.output_file, 'rt', encoding='utf-8') as file:
+            return (miner.cache_hits, miner.cache_misses), file.read()
+
+    def test_cached_results(self):
+        stats, expected = self._mine("name,address")
+        self.assertEqual(stats, (0, 3))
+        with open('tests/resource/gold/xml_name_address.tsv', 'rt',
+                  encoding='utf-8') as gold:
+            self.assertEqual(expected, gold.read())
+        self.assertEqual(self._mine("name,address"), ((3, 0), expected))
+        self.assertEqual(self._mine("name,address", workers=2),
+                         ((3, 0), expected))
+        self.assertEqual(self._mine("name")[0], (0, 3))
+
+    @skipIf(LXML_ETREE is None, "lxml is not installed")
+    def test_parsing_options(self):
+        miner = XMLMiner("name", cache=self.cache_file)
+        self.assertEqual(len(list(miner.mine('tests/resource/xmls'))), 3)
+        miner = XMLMiner("name", cache=self.cache_file, recover=True)
+        mined = list(miner.mine('tests/resource/xmls'))
+        self.assertEqual(miner.cache_hits, 0)
+        self.assertIn('test.pdf.txtorin', [doc.file for doc in mined])
+
+    def test_eviction(self):
+        docs = [(position, f'<begin>{position}</begin>'.encode())
+                for position in range(10)]
+        cache = ResultCache(self.cache_file, 'fingerprint', max_size=500)
+        for position, _ in cache.positioned_docs(docs):
+            cache.store(position, {'file': None,
+                                   'values': {'name': [str(position)]}})
+        self.assertLessEqual(cache.total_size, 500)
+        cache.close()
+
+        with sqlite3.connect(self.cache_file) as connection:
+            total, count = connection.execute(
+                'SELECT SUM(size), COUNT(*) FROM results').fetchone()
+        self.assertLessEqual(total, 500)
+        self.assertLess(count, 10)
+
+        # the most recent documents are kept
+        cache = ResultCache(self.cache_file, 'fingerprint', max_size=500)
+        cached = [isinstance(doc, CachedSelection)
+                  for _, doc in cache.positioned_docs(docs)]
+        cache.close()
+        self.assertEqual(cached, sorted(cached))
+        self.assertTrue(cached[-1])
+        self.assertEqual(cache.hits, count)
+
+    def test_shared_cache(self):
+        docs = [(position, f'<begin>{position}</begin>'.encode())
+                for position in range(4)]
+        first = ResultCache(self.cache_file, 'fingerprint')
+        second = ResultCache(self.cache_file, 'fingerprint')
+        second.connection.execute('PRAGMA busy_timeout = 10')
+        for position, _ in first.positioned_docs(docs[:2]):
+            first.store(position, [str(position), []])
+        # the first run holds the write lock until its next commit
+        self.assertEqual([position for position, doc in
+                          second.positioned_docs(docs)
+                          if not isinstance(doc, CachedSelection)],
+                         [0, 1, 2, 3])
+        for position, _ in docs:
+            second.store(position, [str(position), []])
+        first.close()
+
+        second.COMMIT_INTERVAL = 0
+        for position, _ in second.positioned_docs(docs):
+            second.store(position, [str(position), []])
+        second.close()
+        self.assertEqual(second.hits, 2)
@@ -50,3 +50,37 @@ class TrxmlTestCases(TestCase):
             self.expected_jobtitle[1],
             "from file: select second value of experience"
         )
+
+
+class TrxmlIndexTestCases(TestCase):
+    """the field index gives the same values as the xpath selection"""
+    def setUp(self):
+        self.trxml_obj = TKTRXML.from_string(
+            '<TextractorResult><Document filename="f.doc">text</Document>'
+            '<DocumentStructure>'
+            '<ItemGroup key="a"><Item index="0">'
+            '<Field key="x"/><Field key="y"><Value/></Field></Item>'
+            '<Item index="1"><Field key="x"><Value>a1</Value></Field></Item>'
+            '<Item index="1"><Field key="x"><Value>a1b</Value>'
+            '<Value>a1c</Value></Field></Item></ItemGroup>'
+            '<ItemGroup key="a"><Item index="0">'
+            '<Field key="x"><Value>b0</Value></Field></Item></ItemGroup>'
+            '</DocumentStructure></TextractorResult>')
+
+    def test_singletons(self):
+        for selector_string in ['a.0.x', 'a.0.y', 'a.1.x', 'a.2.x', 'b.0.x']:
+            selector = TRXMLSelectors([selector_string]).selectors[0]
+            self.assertEqual(selector.select_value_from_index(self.trxml_obj),
+                             selector.select_value_with_xpath(self.trxml_obj))
+
+    def test_multiple_items(self):
+        selectors = TRXMLSelectors.from_selector_string('a.*.x,a.*.y')
+        items = self.trxml_obj.working_entity.find(
+            "ItemGroup[@key='a']").findall('Item')
+        expected = {}
+        for item in items:
+            expected[item.get('index')] = {
+                selector.text: selector.field_value_from_item(item)
+                for selector in selectors}
+        self.assertEqual(selectors.select_trxml_fields(self.trxml_obj),
+                         expected)
@@ -29,6 +29,16 @@ class SelectorsXMLTestCases(TestCase):
                          'address':['1021AB Amsterdam', 'The Netherlands']
                         })
 
+    def test_select_single_walk(self):
+        selectors = XMLSelectors.from_selector_string(
+            'name,address,unknown,begin,name')
+        selected = selectors.select_xml_fields(self.xml_obj)
+        self.assertEqual(list(selected), ['name', 'address', 'unknown',
+                                          'begin'])
+        self.assertEqual(selected, {
+            selector.text: selector.select_all_values(self.xml_obj)
+            for selector in selectors})
+
     def test_select_nonexist(self):
         selectors = XMLSelectors.from_selector_string('unknown')
         selected = selectors.select_xml_fields(self.xml_obj)
@@ -0,0 +1,83 @@
+"""unit tests of the stage timings and progress of the mining runs"""
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+from xml_miner import LOGGER
+from xml_miner.miner import TRXMLMiner, XMLMiner
+from xml_miner.stats import STAGE, MiningStats
+
+
+class MiningStatsTestCases(TestCase):
+    """unit tests of the MiningStats object"""
+    def test_nested_stages(self):
+        stats = MiningStats()
+        with stats.timed(STAGE['SELECT']):
+            with stats.timed(STAGE['LOAD']):
+                time.sleep(0.05)
+        self.assertGreaterEqual(stats.wall_time['load'], 0.05)
+        self.assertLess(stats.wall_time['select'], 0.05)
+
+    def test_loaded_docs(self):
+        stats = MiningStats(total_docs=4)
+        docs = list(stats.loaded_docs([(1, b'<a/>'), (2, '<b/>')]))
+        self.assertEqual(docs, [(1, b'<a/>'), (2, '<b/>')])
+        self.assertEqual((stats.docs_read, stats.bytes_read), (2, 8))
+        stats.finish()
+        self.assertAlmostEqual(stats.eta(), stats.elapsed)
+        self.assertIsNone(MiningStats().eta())
+
+    def test_progress(self):
+        stats = MiningStats(total_bytes=10, progress_interval=1e-9)
+        list(stats.loaded_docs([(1, b'<a/>')]))
+        with self.assertLogs(LOGGER) as logs:
+            stats.log_progress()
+        self.assertIn('progress: 1 docs', logs.output[0])
+        self.assertIn('ETA', logs.output[0])
+
+
+class MinerStatsTestCases(TestCase):
+    """unit tests of the stats collected by the miners"""
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.test_dir, 'mined.tsv')
+
+    def tearDown(self):
+        """remove the temp dir when test finished"""
+        shutil.rmtree(self.test_dir)
+
+    def test_mine_and_save(self):
+        miner = XMLMiner("name,address", collect_stats=True)
+        with self.assertLogs(LOGGER) as logs:
+            miner.mine_and_save('tests/resource/simple.mxml',
+                                self.output_file)
+        stats = miner.stats.as_dict()
+        self.assertEqual(stats['docs_read'], 3)
+        self.assertEqual(stats['docs_mined'], 3)
+        with open(self.output_file, 'rt', encoding='utf-8') as file:
+            self.assertEqual(stats['rows_written'],
+                             len(file.readlines()) - 1)
+        self.assertLessEqual(stats['bytes_read'],
+                             os.path.getsize('tests/resource/simple.mxml'))
+        self.assertEqual(miner.stats.total_bytes,
+                         os.path.getsize('tests/resource/simple.mxml'))
+        for stage in STAGE.values():
+            self.assertGreater(stats['stages'][stage]['wall_time'], 0)
+        self.assertTrue(any('- parse' in line for line in logs.output))
+
+    def test_mine_with_index(self):
+        mtrxml_file = os.path.join(self.test_dir, 'simple.mtrxml')
+        shutil.copy('tests/resource/simple.mtrxml', mtrxml_file)
+        for workers in [1, 2]:
+            miner = TRXMLMiner("name.0.name", use_index=True, workers=workers,
+                               collect_stats=True)
+            self.assertEqual(len(list(miner.mine(mtrxml_file))), 3)
+            self.assertEqual(miner.stats.total_docs, 3)
+            self.assertEqual(miner.stats.docs_mined, 3)
+            self.assertGreater(miner.stats.wall_time['select'], 0)
+
+    def test_no_stats(self):
+        miner = XMLMiner("name")
+        miner.mine_and_save('tests/resource/simple.mxml', self.output_file)
+        self.assertIsNone(miner.stats)
@@ -0,0 +1,104 @@
+"""save the progress of a mining run, to resume it after an interruption"""
+from typing import Optional
+import json
+import os
+import time
+from . import LOGGER
+
+
+class Checkpoint:
+    '''
+    Checkpoint:
+    - the state of a mine_and_save run, saved next to the output file
+    - the input position of the last saved document, the counters and the
+      size of the flushed output
+    - saved at most once per interval, removed when the run is finished
+    '''
+
+    VERSION = 1
+    SUFFIX = '.checkpoint'
+    INTERVAL = 60
+
+    def __init__(self, output_file: str, source: str, selector_string: str,
+                 position_type: str, interval: float = INTERVAL):
+        '''
+        params:
+            output_file (str): the output file of the run
+            source (str): the data source of the run
+            selector_string (str): the selectors of the run
+            position_type (str): the kind of input positions, see
+            data_loader.POSITION_TYPE
+            interval (float): minimum number of seconds between two saves
+        '''
+        self.checkpoint_file = self.checkpoint_filename(output_file)
+        self.source = source
+        self.selector_string = selector_string
+        self.position_type = position_type
+        self.interval = interval
+        self.saved_at = time.monotonic()
+
+    @classmethod
+    def checkpoint_filename(cls, output_file: str) -> str:
+        '''the checkpoint filename of an output file'''
+        return output_file + cls.SUFFIX
+
+    @classmethod
+    def load(cls, output_file: str, source: str,
+             selector_string: str) -> Optional[dict]:
+        """
+        load the saved state of an interrupted run
+
+        output:
+            the state dict, None if there is no checkpoint
+
+        raise:
+            ValueError if the checkpoint belongs to another source or other
+            selectors
+        """
+        try:
+            with open(cls.checkpoint_filename(output_file), 'rt',
+                      encoding='utf-8') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        if state.get('version') != cls.VERSION \
+                or state.get('source') != source \
+                or state.get('selectors') != selector_string:
+            raise ValueError(
+                f"the checkpoint of {output_file} is not from the same "
+                "source and selectors, remove it to mine from the beginning")
+        return state
+
+    def due(self) -> bool:
+        '''whether the interval since the last save is over'''
+        return time.monotonic() - self.saved_at >= self.interval
+
+    def save(self, position, output_offset: int, counters: dict):
+        """
+        save the state after a document
+
+        params:
+            position: the input position to resume after the document
+            output_offset (int): the size of the flushed output
+            counters (dict): num_docs, num_values and value_counter
+        """
+        state = {'version': self.VERSION,
+                 'source': self.source,
+                 'selectors': self.selector_string,
+                 'position_type': self.position_type,
+                 'position': position,
+                 'output_offset': output_offset}
+        state.update(counters)
+        tmp_file = self.checkpoint_file + '.tmp'
+        with open(tmp_file, 'wt', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(tmp_file, self.checkpoint_file)
+        self.saved_at = time.monotonic()
+        LOGGER.debug("checkpoint at %s %s", self.position_type, position)
+
+    def remove(self):
+        '''remove the checkpoint of a finished run'''
+        try:
+            os.remove(self.checkpoint_file)
+        except FileNotFoundError:
+            pass
@@ -2,5 +2,9 @@
 
 from .data_loader import DataLoader
 from .data_saver import DataSaver
+from .doc_filter import DocFilter
+from .mxml_index import MXMLIndex
+from .incremental import IncrementalManifest
 
-__all__ = ['DataLoader', 'DataSaver']
+__all__ = ['DataLoader', 'DataSaver', 'DocFilter', 'MXMLIndex',
+           'IncrementalManifest']
@@ -1,17 +1,40 @@
 """A module to communicate the TK annotation server"""
-from typing import List, Iterator
+from typing import List, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import re
 import socket
+import threading
+from .doc_filter import DocFilter
+from ..executor_utils import bounded_submit
 from .. import LOGGER
 
 
+def ids_after(ids: List[str], after_id: Optional[str]) -> List[str]:
+    """
+    the document ids following a document id, to resume fetching documents
+
+    params:
+        ids (list): all document ids
+        after_id (str): the id of the last fetched document, None for all
+    """
+    if after_id is None:
+        return ids
+    try:
+        return ids[ids.index(after_id) + 1:]
+    except ValueError:
+        raise ValueError(
+            "document {} not found on the annotation server".format(after_id))
+
+
 class ASClient:
     """Python version of annotation server client"""
     BUFFER_SIZE = 2 * 1024
+    RECEIVE_BUFFER_SIZE = 64 * 1024
     ENCODING = 'utf-8'
 
     def __init__(self, host: str, port: str,
-                 as_user: str = '', as_pass: str = ''):
+                 as_user: str = '', as_pass: str = '',
+                 buffer_size: int = RECEIVE_BUFFER_SIZE):
         """
         Init a new socket client to the annotation server
 
@@ -20,11 +43,13 @@ class ASClient:
             port (str/int): port of the AnnotationServer
             as_user (str): AnnotationServer username, optional
             as_pass (str): AnnotationServer password, optional
+            buffer_size (int): size of the buffer to receive the responses
         """
         self.host = host
         self.port = int(port)
         self.as_user = as_user
         self.as_pass = as_pass
+        self.buffer_size = buffer_size
 
         self.tk_socket = None
 
@@ -79,27 +104,33 @@ class ASClient:
                 {}:{}, {}".format(self.host, self.port, error))
         return
 
-    def socket_output(self) -> str:
-        """Receive response from Annotation Server and decode"""
-        output = b''
-        while 1:
-            try:
-                data = self.tk_socket.recv(self.BUFFER_SIZE)
-            except IOError as error:
-                raise IOError("wrong response from {}:{}, {}".format(
-                    self.host, self.port, error))
-            else:
-                if not data:
-                    break
-                output += data
+    def socket_output(self) -> bytearray:
+        """
+        Receive response from Annotation Server
+
+        the data is received into one reused buffer and appended to the
+        response, which is not decoded: the xml parsers decode the documents
+        with their declared encoding
+        """
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        output = bytearray()
         try:
-            output = output.decode(self.ENCODING)
-        except UnicodeDecodeError as error:
-            raise IOError("failed to decode the message.\n" + error)
+            while 1:
+                try:
+                    size = self.tk_socket.recv_into(buffer)
+                except IOError as error:
+                    raise IOError("wrong response from {}:{}, {}".format(
+                        self.host, self.port, error))
+                if not size:
+                    break
+                output += view[:size]
+        finally:
+            view.release()
         return output
 
-    def send_and_receive(self, query: str) -> str:
-        """send the query to AS and decode the received response"""
+    def send_and_receive(self, query: str) -> bytearray:
+        """send the query to AS and receive the raw response"""
         try:
             self.make_connection()
             self.tk_socket.send(self.prepare_message(query))
@@ -112,18 +143,115 @@ class ASClient:
 
     def get_ids(self, query: str = '') -> List[str]:
         """get all document ids of all the queried documents"""
-        ids_string = self.send_and_receive('GIVE ids ' + query)
+        try:
+            ids_string = self.send_and_receive('GIVE ids ' + query).decode(
+                self.ENCODING)
+        except UnicodeDecodeError as error:
+            raise IOError("failed to decode the message.\n" + str(error))
         ids = [id for id in ids_string.split("\n") if re.match("^[0-9]+$", id)]
         return ids
 
-    def get_docs(self, query='') -> Iterator[str]:
+    def get_doc(self, doc_index: str) -> bytearray:
+        """get the raw bytes of one document by its id"""
+        return self.send_and_receive('GIVE xml id ' + doc_index)
+
+    def get_docs(self, query='') -> Iterator[bytearray]:
         """get all queried documents"""
-        ids = self.get_ids(query)
+        for _, document in self.get_positioned_docs(query):
+            yield document
+
+    def get_positioned_docs(self, query='', after_id=None,
+                            ids_filter: DocFilter = None
+                            ) -> Iterator[Tuple[str, bytearray]]:
+        """
+        get all queried documents with their id, after the after_id, only
+        the documents whose id is kept by the ids_filter are fetched
+        """
+        ids = ids_after(self.get_ids(query), after_id)
+        if ids_filter is not None:
+            ids = ids_filter.kept_ids(ids)
         for doc_index in ids:
             try:
-                document = self.send_and_receive('GIVE xml id ' + doc_index)
+                document = self.get_doc(doc_index)
             except IOError:
                 LOGGER.warning("WARNING: failed to fetch document: %s",
                                doc_index)
             else:
-                yield document
+                yield doc_index, document
+
+
+class ASClientPool:
+    """
+    fetch the documents from the annotation server with several connections
+    at the same time
+
+    The annotation server ends each response by closing the connection, so a
+    connection can not be reused or pipelined: each worker thread has its
+    own ASClient, which logs in and fetches one document per connection.
+    Fetching in parallel hides the latency of the connections.
+    """
+
+    def __init__(self, host: str, port: str,
+                 as_user: str = '', as_pass: str = '', workers: int = 4,
+                 buffer_size: int = ASClient.RECEIVE_BUFFER_SIZE):
+        """
+        params:
+            host (str): hostname of the annotationserver
+            port (str/int): port of the AnnotationServer
+            as_user (str): AnnotationServer username, optional
+            as_pass (str): AnnotationServer password, optional
+            workers (int): number of documents fetched at the same time
+            buffer_size (int): size of the buffer to receive the responses
+        """
+        self.host = host
+        self.port = int(port)
+        self.as_user = as_user
+        self.as_pass = as_pass
+        self.workers = workers
+        self.buffer_size = buffer_size
+        self._local = threading.local()
+
+    def _client(self) -> ASClient:
+        """the ASClient of the current thread"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = ASClient(self.host, self.port,
+                              self.as_user, self.as_pass, self.buffer_size)
+            self._local.client = client
+        return client
+
+    def get_ids(self, query: str = '') -> List[str]:
+        """get all document ids of all the queried documents"""
+        return self._client().get_ids(query)
+
+    def get_doc(self, doc_index: str) -> bytearray:
+        """get the raw bytes of one document by its id"""
+        return self._client().get_doc(doc_index)
+
+    def get_docs(self, query='') -> Iterator[bytearray]:
+        """
+        get all queried documents, in the order of the ids
+
+        at most 2 documents per worker are fetched ahead of the consumer
+        """
+        for _, document in self.get_positioned_docs(query):
+            yield document
+
+    def get_positioned_docs(self, query='', after_id=None,
+                            ids_filter: DocFilter = None
+                            ) -> Iterator[Tuple[str, bytearray]]:
+        """
+        get all queried documents with their id, after the after_id, only
+        the documents whose id is kept by the ids_filter are fetched
+        """
+        ids = ids_after(self.get_ids(query), after_id)
+        if ids_filter is not None:
+            ids = ids_filter.kept_ids(ids)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for doc_index, future in bounded_submit(
+                    executor, self.get_doc, ids, 2 * self.workers):
+                try:
+                    yield doc_index, future.result()
+                except IOError:
+                    LOGGER.warning("WARNING: failed to fetch document: %s",
+                                   doc_index)
@@ -0,0 +1,148 @@
+"""A module to communicate the TK annotation server with asyncio streams"""
+from typing import AsyncIterator, List
+from collections import deque
+import asyncio
+import re
+from .doc_filter import DocFilter
+from .. import LOGGER
+
+
+class AsyncASClient:
+    """
+    asyncio version of the annotation server client
+
+    each request opens its own connection, as the server closes the
+    connection at the end of each response. A semaphore bounds the number of
+    connections open at the same time.
+    """
+    BUFFER_SIZE = 2 * 1024
+    ENCODING = 'utf-8'
+
+    def __init__(self, host: str, port: str,
+                 as_user: str = '', as_pass: str = '',
+                 concurrency: int = 4):
+        """
+        params:
+            host (str): hostname of the annotationserver
+            port (str/int): port of the AnnotationServer
+            as_user (str): AnnotationServer username, optional
+            as_pass (str): AnnotationServer password, optional
+            concurrency (int): maximum number of open connections
+        """
+        self.host = host
+        self.port = int(port)
+        self.as_user = as_user
+        self.as_pass = as_pass
+        self.concurrency = concurrency
+        # created in the running event loop, see _get_semaphore
+        self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def prepare_message(self, message: str) -> bytes:
+        """
+        prepare the query message:
+        - add new line
+        - encode with utf8
+        """
+        if not message.endswith('\n'):
+            message += "\n"
+        return message.encode(self.ENCODING)
+
+    async def check_user_password(self, reader, writer):
+        """send server the username and password and confirm the loggin"""
+        await reader.read(self.BUFFER_SIZE)
+        writer.write(self.prepare_message(self.as_user))
+        await writer.drain()
+        await reader.read(self.BUFFER_SIZE)
+        writer.write(self.prepare_message(self.as_pass))
+        await writer.drain()
+        response = await reader.read(self.BUFFER_SIZE)
+
+        response = response.decode(self.ENCODING)
+        if not response.startswith("OK"):
+            raise IOError("Unexpected welcome message:{}".format(response))
+
+    async def send_and_receive(self, query: str) -> bytes:
+        """
+        send the query to AS and receive the raw response, which is not
+        decoded: the xml parsers decode the documents with their declared
+        encoding
+
+        the connection is closed in all cases, also when the task is
+        cancelled
+        """
+        async with self._get_semaphore():
+            writer = None
+            try:
+                reader, writer = await asyncio.open_connection(self.host,
+                                                               self.port)
+                await self.check_user_password(reader, writer)
+                writer.write(self.prepare_message(query))
+                await writer.drain()
+                output = await reader.read()
+            except OSError as error:
+                raise IOError("not able to send or receive data from \
+                {}:{}, {}".format(self.host, self.port, error))
+            finally:
+                if writer is not None:
+                    writer.close()
+        return output
+
+    async def get_ids(self, query: str = '') -> List[str]:
+        """get all document ids of all the queried documents"""
+        try:
+            ids_string = (await self.send_and_receive('GIVE ids ' + query)) \
+                .decode(self.ENCODING)
+        except UnicodeDecodeError as error:
+            raise IOError("failed to decode the message.\n" + str(error))
+        ids = [id for id in ids_string.split("\n") if re.match("^[0-9]+$", id)]
+        return ids
+
+    async def get_doc(self, doc_index: str) -> bytes:
+        """get the raw bytes of one document by its id"""
+        return await self.send_and_receive('GIVE xml id ' + doc_index)
+
+    async def get_docs(self, query='', ids_filter: DocFilter = None
+                       ) -> AsyncIterator[bytes]:
+        """
+        get all queried documents, in the order of the ids, only the
+        documents whose id is kept by the ids_filter are fetched
+
+        at most 2 documents per connection are fetched ahead of the consumer,
+        the pending fetches are cancelled when the generator is closed
+        """
+        ids = await self.get_ids(query)
+        if ids_filter is not None:
+            ids = ids_filter.kept_ids(ids)
+        max_in_flight = 2 * self.concurrency
+        pending = deque()
+        try:
+            for doc_index in ids:
+                if len(pending) >= max_in_flight:
+                    for document in await self._fetched(*pending.popleft()):
+                        yield document
+                pending.append((doc_index, asyncio.ensure_future(
+                    self.get_doc(doc_index))))
+            while pending:
+                for document in await self._fetched(*pending.popleft()):
+                    yield document
+        finally:
+            tasks = [task for _, task in pending]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _fetched(doc_index, task) -> List[bytes]:
+        """the fetched document, or nothing if it failed"""
+        try:
+            return [await task]
+        except IOError:
+            LOGGER.warning("WARNING: failed to fetch document: %s",
+                           doc_index)
+            return []
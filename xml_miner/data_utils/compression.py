@@ -0,0 +1,161 @@
+"""A module to stream compressed files and archives without extracting them"""
+from typing import Iterator, Optional, Tuple
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+
+try:
+    import zstandard as ZSTD
+except ImportError:
+    ZSTD = None
+
+COMPRESSION = {'GZIP': 'gzip', 'BZIP2': 'bzip2', 'XZ': 'xz', 'ZSTD': 'zstd'}
+ARCHIVE = {'TAR': 'tar', 'ZIP': 'zip'}
+# the output compression is chosen from the file extension
+COMPRESSION_SUFFIXES = {
+    '.gz': COMPRESSION['GZIP'],
+    '.bz2': COMPRESSION['BZIP2'],
+    '.xz': COMPRESSION['XZ'],
+    '.zst': COMPRESSION['ZSTD'],
+}
+
+# the first bytes of each compression format
+MAGIC_NUMBERS = [
+    (b'\x1f\x8b', COMPRESSION['GZIP']),
+    (b'BZh', COMPRESSION['BZIP2']),
+    (b'\xfd7zXZ\x00', COMPRESSION['XZ']),
+    (b'\x28\xb5\x2f\xfd', COMPRESSION['ZSTD']),
+]
+TAR_BLOCK_SIZE = 512
+TAR_MAGIC = b'ustar'
+TAR_MAGIC_OFFSET = 257
+TAR_SUFFIXES = ('.tar', '.tgz', '.tbz', '.tbz2', '.txz', '.tzst')
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+def detect_compression(input_file: str) -> Optional[str]:
+    '''
+    the compression of the file, from its first bytes
+
+    output:
+        one of the COMPRESSION values, None for an uncompressed file
+    '''
+    with open(input_file, 'rb') as file:
+        head = file.read(8)
+    for magic, compression in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_compressed(input_file: str, compression: Optional[str] = None):
+    """
+    open the file as a binary stream of the decompressed content
+
+    params:
+        input_file (str): the compressed or uncompressed file
+        compression (str): one of the COMPRESSION values, detected if not
+        given
+
+    output:
+        binary file object, decompressing while reading
+    """
+    if compression is None:
+        compression = detect_compression(input_file)
+    if compression == COMPRESSION['GZIP']:
+        return gzip.open(input_file, 'rb')
+    if compression == COMPRESSION['BZIP2']:
+        return bz2.open(input_file, 'rb')
+    if compression == COMPRESSION['XZ']:
+        return lzma.open(input_file, 'rb')
+    if compression == COMPRESSION['ZSTD']:
+        if ZSTD is None:
+            raise ImportError(
+                "zstd compressed input needs the zstandard package")
+        reader = ZSTD.ZstdDecompressor().stream_reader(
+            open(input_file, 'rb'), closefd=True)
+        return io.BufferedReader(reader, READ_BUFFER_SIZE)
+    return open(input_file, 'rb', buffering=READ_BUFFER_SIZE)
+
+
+def open_compressed_writer(output_file: str, compression: str):
+    """
+    open the file as a binary stream compressing the written content
+
+    params:
+        output_file (str): the compressed file to create
+        compression (str): one of the COMPRESSION values
+
+    output:
+        binary file object
+    """
+    if compression == COMPRESSION['GZIP']:
+        return gzip.open(output_file, 'wb')
+    if compression == COMPRESSION['BZIP2']:
+        return bz2.open(output_file, 'wb')
+    if compression == COMPRESSION['XZ']:
+        return lzma.open(output_file, 'wb')
+    if compression == COMPRESSION['ZSTD']:
+        if ZSTD is None:
+            raise ImportError(
+                "zstd compressed output needs the zstandard package")
+        return ZSTD.ZstdCompressor().stream_writer(open(output_file, 'wb'),
+                                                   closefd=True)
+    raise ValueError(f"compression '{compression}' unknown")
+
+
+def detect_archive(input_file: str,
+                   compression: Optional[str] = None) -> Optional[str]:
+    '''
+    the archive format of the file: zip, or tar possibly compressed
+
+    output:
+        one of the ARCHIVE values, None if the file is not an archive
+    '''
+    if compression is None and zipfile.is_zipfile(input_file):
+        return ARCHIVE['ZIP']
+    with open_compressed(input_file, compression) as stream:
+        block = stream.read(TAR_BLOCK_SIZE)
+    if block[TAR_MAGIC_OFFSET:TAR_MAGIC_OFFSET + len(TAR_MAGIC)] == TAR_MAGIC:
+        return ARCHIVE['TAR']
+    # old tar formats have no magic, only trust the file name for them
+    name = input_file.lower()
+    if len(block) == TAR_BLOCK_SIZE and (
+            name.endswith(TAR_SUFFIXES) or '.tar.' in name):
+        return ARCHIVE['TAR']
+    return None
+
+
+def iter_archive_members(input_file: str,
+                         archive: str,
+                         compression: Optional[str] = None
+                         ) -> Iterator[Tuple[str, bytes]]:
+    """
+    read the files of a zip or tar archive one by one, in archive order
+
+    tar archives are read as a stream, so only one member is in memory at a
+    time and compressed tar archives are decompressed on the fly
+
+    params:
+        input_file (str): the archive file
+        archive (str): one of the ARCHIVE values
+        compression (str): the compression of a tar archive
+
+    output:
+        (member name, member bytes) per file of the archive
+    """
+    if archive == ARCHIVE['ZIP']:
+        with zipfile.ZipFile(input_file) as zip_file:
+            for member in zip_file.infolist():
+                if not member.is_dir():
+                    yield member.filename, zip_file.read(member)
+        return
+
+    with open_compressed(input_file, compression) as stream, \
+            tarfile.open(fileobj=stream, mode='r|') as tar_file:
+        for member in tar_file:
+            if member.isfile():
+                yield member.name, tar_file.extractfile(member).read()
@@ -1,59 +1,279 @@
 """A module to load input xml/trxml from different source"""
-from os import listdir
-from os.path import join, isfile
-from .asclient import ASClient
+from typing import Iterator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, islice, repeat
+from os import fstat, scandir
+from os.path import getsize
+from .asclient import ASClient, ASClientPool
+from .compression import detect_compression, detect_archive, \
+    open_compressed, iter_archive_members
+from .doc_filter import DocFilter
+from .mxml_index import MXMLIndex
+from ..executor_utils import bounded_submit
 from .. import LOGGER
 
+# the position of a document to resume the loading after it
+POSITION_TYPE = {
+    'FILE_INDEX': 'file_index',
+    'BYTE_OFFSET': 'byte_offset',
+    'DOC_ID': 'doc_id',
+    'DOC_COUNT': 'doc_count',
+}
 
-def load_from_file(input_dir, files):
+
+def read_file(filepath):
+    """
+    read the raw content of a xml file, the parser decodes it with the
+    encoding of its xml declaration
+
+    output:
+        the xml bytes
+    """
+    with open(filepath, 'rb') as file:
+        return file.read()
+
+
+def iter_dir_files(input_dir, recursive=False, sort=True) -> Iterator[str]:
     """
-    load document from a list files read from a directory
+    list the files of a directory, the file type comes from the directory
+    entries, without an extra stat per file
 
     params:
         input_dir (string): directory contains all files
-        files (list): a list files
+        recursive (bool): also list the files of the sub directories
+        sort (bool): list the entries of each directory sorted by name,
+        otherwise in the order of the file system, without keeping the
+        names in memory
+
+    output:
+        file path: a iterator object to generate the file paths
+    """
+    with scandir(input_dir) as dir_entries:
+        entries = sorted(dir_entries, key=lambda entry: entry.name) \
+            if sort else dir_entries
+        for entry in entries:
+            if entry.is_file():
+                yield entry.path
+            elif recursive and entry.is_dir():
+                yield from iter_dir_files(entry.path, recursive, sort)
+            else:
+                LOGGER.warning("Warning: %s is not a file, skip", entry.path)
+
+
+def load_from_paths(paths, prefetch=0):
+    """
+    load the documents of a list of files
+
+    params:
+        paths (iterable): the file paths
+        prefetch (int): number of threads reading the next files while the
+        current document is processed, at most 2 files per thread are read
+        ahead. No threads with 0.
 
     output:
         xml string: a iterator object to generate xml string
     """
+    if prefetch <= 0:
+        for path in paths:
+            yield read_file(path)
+        return
 
-    for filename in sorted(files):
-        filepath = join(input_dir, filename)
-        if not isfile(filepath):
-            LOGGER.warning("Warning: %s is not a file, skip", filepath)
-        else:
-            with open(filepath, 'rt', encoding='utf-8') as file:
-                try:
-                    content = file.read()
-                    yield content
-                except UnicodeDecodeError:
-                    LOGGER.info("can not decode %s", filename)
-                    continue
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        for _, future in bounded_submit(executor, read_file, paths,
+                                        2 * prefetch):
+            yield future.result()
 
 
-def load_from_string(xml_string, header_line):
+def load_from_positioned_paths(positioned_paths, prefetch=0):
     """
-    load document string, the string might contain multiple xml files
+    load_from_paths, keeping the position of each file
 
     params:
-        xml_string (string): input xml strings
+        positioned_paths (iterable): (position, file path) pairs
+        prefetch (int): number of threads reading files ahead, see
+        load_from_paths
+
+    output:
+        (position, xml bytes) per file
+    """
+    # the positions of the files read ahead
+    positions = deque()
+
+    def paths():
+        for position, path in positioned_paths:
+            positions.append(position)
+            yield path
+
+    for doc in load_from_paths(paths(), prefetch):
+        yield positions.popleft(), doc
+
+
+def split_documents(lines, header_line):
+    """
+    split the lines of a multi-document file into xml documents
+
+    a new document starts at each line beginning with the header line, xml
+    declaration lines are dropped, except the one right before a header line
+    which stays at the top of its document, to keep the encoding. Only the
+    lines of the current document are kept in memory.
+
+    params:
+        lines (iterable): lines without the trailing newline, str or bytes
+        header_line (string): the beginning of the top level tag, same type
+        as the lines
 
     output:
         xml string: a iterator object to generate xml string
     """
+    positioned_lines = zip(repeat(None), lines)
+    for _, xml in split_positioned_documents(positioned_lines, header_line):
+        yield xml
+
+
+def split_positioned_documents(lines, header_line, offset=None):
+    """
+    split_documents with the byte offset where each document ends, which is
+    the start of the next document
+
+    params:
+        lines (iterable): (offset after the line, line without the trailing
+        newline) pairs
+        header_line (string): the beginning of the top level tag, same type
+        as the lines
+        offset (int): the offset of the first line
+
+    output:
+        (end offset, xml string) per document
+    """
+    if isinstance(header_line, bytes):
+        declaration_start, newline = b'<?xml', b'\n'
+    else:
+        declaration_start, newline = '<?xml', '\n'
+
     xml_lines = []
-    for line in xml_string.splitlines():
+    declaration = None
+    declaration_offset = None
+    line_start = offset
+    for line_end, line in lines:
         if line.startswith(header_line):
             if xml_lines:
-                xml = "\n".join(xml_lines)
-                yield xml
-            xml_lines = [line]
-        elif line.startswith('<?xml'):
-            pass
+                xml = newline.join(xml_lines)
+                yield line_start if declaration is None \
+                    else declaration_offset, xml
+            xml_lines = [line] if declaration is None \
+                else [declaration, line]
+            declaration = None
+        elif line.startswith(declaration_start):
+            declaration = line
+            declaration_offset = line_start
         else:
             xml_lines.append(line)
-    xml = "\n".join(xml_lines)
-    yield xml
+            declaration = None
+        line_start = line_end
+    xml = newline.join(xml_lines)
+    yield line_start, xml
+
+
+def load_from_string(xml_string, header_line):
+    """
+    load document string, the string might contain multiple xml files
+
+    params:
+        xml_string (string): input xml strings
+
+    output:
+        xml string: a iterator object to generate xml string
+    """
+    yield from split_documents(xml_string.splitlines(), header_line)
+
+
+def load_from_stream(stream, header_line):
+    """
+    load documents from an opened multi-document file, line by line
+
+    params:
+        stream (file object): opened text or binary stream of the
+        mxml/mtrxml file
+        header_line (string): the beginning of the top level tag, bytes for
+        a binary stream
+
+    output:
+        xml string: a iterator object to generate xml string
+    """
+    newline = b'\n' if isinstance(header_line, bytes) else '\n'
+    lines = (line.rstrip(newline) for line in stream)
+    yield from split_documents(lines, header_line)
+
+
+def load_from_multi_doc_file(input_file, header_line, compression=None):
+    """
+    stream documents from a mxml/mtrxml file, the memory usage is bounded by
+    the largest document instead of the file size
+
+    params:
+        input_file (string): the mxml/mtrxml file
+        header_line (string): the beginning of the top level tag
+        compression (string): the compression of the file, decompressed
+        while reading, see compression.py
+
+    output:
+        xml string: a iterator object to generate xml string
+    """
+    if compression is None:
+        file = open(input_file, 'rb')
+    else:
+        file = open_compressed(input_file, compression)
+    with file:
+        yield from load_from_stream(file, header_line.encode('utf-8'))
+
+
+def load_positioned_from_multi_doc_file(input_file, header_line, start=0):
+    """
+    stream documents from an uncompressed mxml/mtrxml file, with the byte
+    offset where each document ends
+
+    params:
+        input_file (string): the mxml/mtrxml file
+        header_line (string): the beginning of the top level tag
+        start (int): the byte offset of the first document to load
+
+    output:
+        (end offset, xml bytes) per document
+    """
+    with open(input_file, 'rb') as file:
+        if start and start >= fstat(file.fileno()).st_size:
+            return
+        file.seek(start)
+        yield from split_positioned_documents(_offset_lines(file, start),
+                                              header_line.encode('utf-8'),
+                                              start)
+
+
+def _offset_lines(stream, offset):
+    '''(offset after the line, line without the newline) per line'''
+    for line in stream:
+        offset += len(line)
+        yield offset, line.rstrip(b'\n')
+
+
+def load_from_archive(input_file, archive, compression=None):
+    """
+    stream documents from a zip or tar archive, one document per file, like
+    the files of a directory
+
+    params:
+        input_file (string): the archive
+        archive (string): 'zip' or 'tar', see compression.py
+        compression (string): the compression of a tar archive
+
+    output:
+        xml string: a iterator object to generate xml string
+    """
+    for name, content in iter_archive_members(input_file, archive,
+                                              compression):
+        LOGGER.debug("reading %s from %s", name, input_file)
+        yield content
 
 
 class DataLoader:
@@ -61,64 +281,189 @@ class DataLoader:
     DataLoader:
     - load data from different resources
     - generate xml input for downstream tasks
+    - generate the documents with their position in the resource, to resume
+      the loading after a given document
     """
 
     XML_HEADER = '<begin '
     TRXML_HEADER = '<TextractorResult '
 
-    def __init__(self, data_generator=None):
+    def __init__(self, data_generator=None, positioned_generator=None,
+                 position_type=POSITION_TYPE['DOC_COUNT'], manifest=None,
+                 total_docs=None, total_bytes=None):
+        '''
+        params:
+            data_generator: generate the documents
+            positioned_generator: generate (position, document) pairs, the
+            position is where to resume the loading after the document
+            position_type: the kind of positions, see POSITION_TYPE
+            manifest: the IncrementalManifest giving the documents, the
+            select_doc results are stored to it, see incremental.py
+            total_docs: number of documents to load, None if unknown
+            total_bytes: number of bytes to read, None if unknown
+        '''
+        if positioned_generator is None and data_generator is not None:
+            positioned_generator = zip(count(1), data_generator)
+        elif data_generator is None and positioned_generator is not None:
+            data_generator = (doc for _, doc in positioned_generator)
         self.data_generator = data_generator
+        self.positioned_generator = positioned_generator
+        self.position_type = position_type
+        self.manifest = manifest
+        self.total_docs = total_docs
+        self.total_bytes = total_bytes
+
+    def filtered(self, doc_filter: DocFilter = None):
+        """
+        the loader of the documents kept by the filter, read from their raw
+        content before parsing, see doc_filter.py
+
+        params:
+            doc_filter (DocFilter): the filter, None to keep all documents
+
+        output:
+            DataLoader object, self if all documents are kept
+        """
+        if doc_filter is None or doc_filter.selects_all:
+            return self
+        return type(self)(
+            positioned_generator=doc_filter.positioned_docs(
+                self.positioned_generator),
+            position_type=self.position_type,
+            manifest=self.manifest,
+            total_docs=doc_filter.num_documents(self.total_docs))
 
     @classmethod
-    def load_from_dir(cls, input_dir):
+    def _counted(cls, docs, start=None):
+        '''the loader of documents positioned by their count'''
+        start = start or 0
+        return cls(positioned_generator=zip(count(start + 1),
+                                            islice(docs, start, None)),
+                   position_type=POSITION_TYPE['DOC_COUNT'])
+
+    @classmethod
+    def load_from_dir(cls, input_dir, recursive=False, sort=True,
+                      prefetch=0, start=None, manifest=None,
+                      doc_filter=None):
         """
         create the document loader object from dir
 
         params:
             input_dir (string): director contains xml files
+            recursive (bool): also load the files of the sub directories
+            sort (bool): load the files sorted by name
+            prefetch (int): number of threads reading files ahead
+            start (int): number of files to skip, the position of the last
+            loaded file
+            manifest (IncrementalManifest): only read the files changed
+            since the last run, the others give their cached result
+            doc_filter (DocFilter): only read the files whose path is kept
+            by the filter
 
         output:
             DataLoader object: a iterator object to generate xml string
         """
-        files = listdir(input_dir)
-        if not files:
-            raise RuntimeError('''no file found here, please check the
-                               dir contains XML''')
-        return cls(data_generator=load_from_file(input_dir, files))
+        with scandir(input_dir) as dir_entries:
+            if next(dir_entries, None) is None:
+                raise RuntimeError('''no file found here, please check the
+                                   dir contains XML''')
+        start = start or 0
+        paths = islice(iter_dir_files(input_dir, recursive, sort),
+                       start, None)
+        positioned_paths = zip(count(start + 1), paths)
+        all_paths = doc_filter is None or doc_filter.selects_all
+        if not all_paths:
+            positioned_paths = doc_filter.positioned_paths(positioned_paths)
+        if manifest is not None:
+            docs = manifest.positioned_docs(
+                positioned_paths, complete_run=start == 0 and all_paths,
+                prefetch=prefetch)
+            return cls(positioned_generator=docs,
+                       position_type=POSITION_TYPE['FILE_INDEX'],
+                       manifest=manifest)
+        docs = load_from_positioned_paths(positioned_paths, prefetch)
+        return cls(positioned_generator=docs,
+                   position_type=POSITION_TYPE['FILE_INDEX'])
 
     @classmethod
-    def load_from_mxml(cls, input_mxml):
+    def load_from_mxml(cls, input_mxml, use_index=False, start=None,
+                       doc_filter=None):
         """
         create the document loader object from mxml
 
         params:
-            mxml (string): a mxml files
+            mxml (string): a mxml file, possibly compressed (gzip, bzip2,
+            xz or zstd), or a zip/tar archive of xml files
+            use_index (bool): serve the documents from the persisted byte
+            offset index of an uncompressed file, see mxml_index.py
+            start (int): the position of the last loaded document, a byte
+            offset, or a document count for compressed files and archives
+            doc_filter (DocFilter): only parse the documents kept by the
+            filter
 
         output:
             DataLoader object: a iterator object to generate xml string
         """
-        with open(input_mxml, 'rt', encoding='utf-8') as file:
-            xml_string = file.read()
-        return cls(data_generator=load_from_string(xml_string, cls.XML_HEADER))
+        return cls._load_from_multi_doc_file(input_mxml, cls.XML_HEADER,
+                                             use_index, start) \
+            .filtered(doc_filter)
 
     @classmethod
-    def load_from_mtrxml(cls, input_mxml):
+    def load_from_mtrxml(cls, input_mxml, use_index=False, start=None,
+                         doc_filter=None):
         """
         create the document loader object from mxml
 
         params:
-            mxml (string): a mxml files
+            mxml (string): a mtrxml file, possibly compressed (gzip, bzip2,
+            xz or zstd), or a zip/tar archive of trxml files
+            use_index (bool): serve the documents from the persisted byte
+            offset index of an uncompressed file, see mxml_index.py
+            start (int): the position of the last loaded document, a byte
+            offset, or a document count for compressed files and archives
+            doc_filter (DocFilter): only parse the documents kept by the
+            filter
 
         output:
             DataLoader object: a iterator object to generate xml string
         """
-        with open(input_mxml, 'rt', encoding='utf-8') as file:
-            xml_string = file.read()
-        return cls(data_generator=load_from_string(xml_string,
-                                                   cls.TRXML_HEADER))
+        return cls._load_from_multi_doc_file(input_mxml, cls.TRXML_HEADER,
+                                             use_index, start) \
+            .filtered(doc_filter)
+
+    @classmethod
+    def _load_from_multi_doc_file(cls, input_file, header_line, use_index,
+                                  start=None):
+        compression = detect_compression(input_file)
+        archive = detect_archive(input_file, compression)
+        if archive is not None:
+            LOGGER.info("reading documents from %s archive %s",
+                        archive, input_file)
+            return cls._counted(load_from_archive(input_file, archive,
+                                                  compression), start)
+        if compression is not None:
+            if use_index:
+                LOGGER.warning("can not index %s compressed file %s, "
+                               "read it as a stream", compression, input_file)
+            return cls._counted(load_from_multi_doc_file(
+                input_file, header_line, compression), start)
+        total_docs = None
+        if use_index:
+            index = MXMLIndex.load_or_build(input_file, header_line)
+            docs = index.iter_positioned_documents(start or 0)
+            total_docs = index.num_documents_from(start or 0)
+        else:
+            docs = load_positioned_from_multi_doc_file(input_file,
+                                                       header_line,
+                                                       start or 0)
+        return cls(positioned_generator=docs,
+                   position_type=POSITION_TYPE['BYTE_OFFSET'],
+                   total_docs=total_docs,
+                   total_bytes=max(getsize(input_file) - (start or 0), 0))
 
     @classmethod
-    def load_from_as(cls, host, port, query, as_user='', as_pass=''):
+    def load_from_as(cls, host, port, query, as_user='', as_pass='',
+                     workers=1, start=None, doc_filter=None):
         """
         create the document loader object from AnnotationServer
 
@@ -128,9 +473,22 @@ class DataLoader:
             query (string): query to select documents
             as_user: AnnotationServer username
             as_pass: AnnotationServer password
+            workers: number of documents fetched at the same time
+            start: the id of the last loaded document
+            doc_filter: only parse the documents kept by the DocFilter, the
+            sample and limit are applied to the ids before fetching the
+            documents, see DocFilter.split_ids
 
         output:
             DataLoader object: a iterator object to generate xml string
         """
-        as_client = ASClient(host, port, as_user, as_pass)
-        return cls(data_generator=as_client.get_docs(query))
+        if workers > 1:
+            as_client = ASClientPool(host, port, as_user, as_pass, workers)
+        else:
+            as_client = ASClient(host, port, as_user, as_pass)
+        ids_filter, docs_filter = (None, None) if doc_filter is None \
+            else doc_filter.split_ids()
+        positioned_docs = as_client.get_positioned_docs(query, start,
+                                                        ids_filter)
+        return cls(positioned_generator=positioned_docs,
+                   position_type=POSITION_TYPE['DOC_ID']).filtered(docs_filter)
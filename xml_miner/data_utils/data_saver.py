@@ -1,19 +1,55 @@
 '''A Module to output the selected values to the chosen format'''
 
+import io
 import os
 import sys
 import csv
 import json
+from .compression import COMPRESSION_SUFFIXES, open_compressed_writer
+
+try:
+    import pyarrow as PA
+    import pyarrow.parquet as PQ
+except ImportError:
+    PA = None
+    PQ = None
+
+COLUMNAR_FORMATS = ('.parquet', '.arrow')
 
 
 class DataSaver:
     """
     DataLoader:
-    - open/create targed output file
+    - open/create targed output file, compressed when the filename ends with
+      a compression extension (.gz, .bz2, .xz, .zst), e.g. 'out.csv.gz'
     - save the selected values to file with corresponding format
+    - columnar formats (.parquet, .arrow) need pyarrow: the first row is the
+      header and gives the column names, the rows are buffered and written
+      by record batches of row_group_size rows
+    - uncompressed row formats are resumable: the output written up to a
+      flushed offset is kept, and new rows are appended after it
     """
 
-    def __init__(self, output_file):
+    WRITE_BUFFER_SIZE = 1024 * 1024
+    ROW_GROUP_SIZE = 64 * 1024
+
+    def __init__(self, output_file, buffer_size=WRITE_BUFFER_SIZE,
+                 row_group_size=ROW_GROUP_SIZE, resume_offset=None):
+        '''
+        params:
+            output_file (string): the output filename, or 'STDOUT'
+            buffer_size (int): size in bytes of the write buffer
+            row_group_size (int): rows per record batch of columnar formats
+            resume_offset (int): keep the existing output file up to this
+            offset, see flush, and append the new rows
+        '''
+        self.output_file = output_file
+        self.row_group_size = row_group_size
+        self.compression = None
+        self.csv_writer = None
+        self.table_writer = None
+        self.schema = None
+        self.columns = None
         if output_file == 'STDOUT':
             self.format = output_file
             self.ostream = sys.stdout
@@ -22,10 +58,21 @@ class DataSaver:
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
 
-            self.format = os.path.splitext(output_file)[1]
-            self.ostream = open(output_file, 'w', encoding='utf-8')
+            name, extension = os.path.splitext(output_file)
+            self.compression = COMPRESSION_SUFFIXES.get(extension)
+            if self.compression is not None:
+                extension = os.path.splitext(name)[1]
+            self.format = extension
+            if self.format in COLUMNAR_FORMATS:
+                self._check_columnar_format()
+                self.ostream = None
+            elif resume_offset is not None:
+                self._truncate(resume_offset)
+                self.ostream = self._open_stream(output_file, buffer_size,
+                                                 'a')
+            else:
+                self.ostream = self._open_stream(output_file, buffer_size)
 
-            self.csv_writer = None
             if self.format == '.csv' or self.format == '.tsv':
                 self.csv_writer = csv.writer(
                     self.ostream,
@@ -33,27 +80,147 @@ class DataSaver:
                     quotechar="'",
                     quoting=csv.QUOTE_MINIMAL)
 
-    def store(self, row):
-        """Store one row at a time"""
-        if self.format == '.csv' or self.format == '.tsv':
-            self._store_csv_row(row)
+        # the row format is resolved once, not per row
+        if self.format in COLUMNAR_FORMATS:
+            self._store_row = self._store_columnar_row
+            self._store_rows = self._store_columnar_rows
+        elif self.csv_writer is not None:
+            self._store_row = self._store_csv_row
+            self._store_rows = self._store_csv_rows
         elif self.format == '.jsonl':
-            self._store_jsonl_row(row)
+            self._store_row = self._store_jsonl_row
+            self._store_rows = self._store_jsonl_rows
         else:
-            self._store_txt_row(row)
+            self._store_row = self._store_txt_row
+            self._store_rows = self._store_txt_rows
+
+    @property
+    def resumable(self):
+        '''whether the output can be resumed from a flushed offset'''
+        return self.format != 'STDOUT' and self.compression is None \
+            and self.format not in COLUMNAR_FORMATS
+
+    def _truncate(self, offset):
+        '''drop the output written after the offset'''
+        if not self.resumable:
+            raise ValueError(
+                f"can not resume the output file {self.output_file}")
+        with open(self.output_file, 'r+b') as file:
+            if os.fstat(file.fileno()).st_size < offset:
+                raise ValueError(f"output file {self.output_file} is "
+                                 f"shorter than the resume offset {offset}")
+            file.truncate(offset)
+
+    def _open_stream(self, output_file, buffer_size, mode='w'):
+        '''the text stream to the output file, compressed if needed'''
+        if self.compression is None:
+            return open(output_file, mode, encoding='utf-8',
+                        buffering=buffer_size)
+        binary_stream = io.BufferedWriter(
+            open_compressed_writer(output_file, self.compression),
+            buffer_size)
+        return io.TextIOWrapper(binary_stream, encoding='utf-8')
+
+    def store(self, row):
+        """Store one row at a time"""
+        self._store_row(row)
+
+    def store_many(self, rows):
+        """Store a list of rows at once, e.g. all rows of a document"""
+        self._store_rows(rows)
+
+    def flush(self):
+        """
+        write the buffered rows of a row format to the file
+
+        output:
+            the size in bytes of the output file, the offset to resume from
+        """
+        self.ostream.flush()
+        return self.ostream.buffer.tell()
 
     def close_stream(self):
         """close the file"""
-        self.ostream.close()
+        if self.format in COLUMNAR_FORMATS:
+            self._close_columnar()
+        else:
+            self.ostream.close()
+
+    def _check_columnar_format(self):
+        '''columnar formats need pyarrow and have their own compression'''
+        if PA is None:
+            raise ImportError(
+                f"output format '{self.format}' needs the pyarrow package")
+        if self.compression is not None:
+            raise ValueError(
+                f"output format '{self.format}' can not be compressed by "
+                "the file extension")
 
     def _store_csv_row(self, row):
         """Store the row under csv format"""
         self.csv_writer.writerow(row)
 
+    def _store_csv_rows(self, rows):
+        """Store the rows under csv format"""
+        self.csv_writer.writerows(rows)
+
     def _store_txt_row(self, row):
         """Store the row under text format"""
         self.ostream.write("\t".join(str(x) for x in row) + '\n')
 
+    def _store_txt_rows(self, rows):
+        """Store the rows under text format"""
+        self.ostream.write(''.join("\t".join(str(x) for x in row) + '\n'
+                                   for row in rows))
+
     def _store_jsonl_row(self, row):
         """Store the row under json-lines format"""
         self.ostream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def _store_jsonl_rows(self, rows):
+        """Store the rows under json-lines format"""
+        self.ostream.write(''.join(json.dumps(row, ensure_ascii=False) + '\n'
+                                   for row in rows))
+
+    def _store_columnar_row(self, row):
+        """Store the row under columnar format, the first row is the header"""
+        if self.schema is None:
+            self.schema = PA.schema([(str(name), PA.string())
+                                     for name in row])
+            self.columns = [[] for _ in row]
+            return
+        for column, value in zip(self.columns, row):
+            column.append(value if value is None or isinstance(value, str)
+                          else str(value))
+        if len(self.columns[0]) >= self.row_group_size:
+            self._flush_columns()
+
+    def _store_columnar_rows(self, rows):
+        """Store the rows under columnar format"""
+        for row in rows:
+            self._store_columnar_row(row)
+
+    def _flush_columns(self):
+        """write the buffered rows as one record batch"""
+        if self.table_writer is None:
+            if self.format == '.parquet':
+                self.table_writer = PQ.ParquetWriter(self.output_file,
+                                                     self.schema)
+            else:
+                self.ostream = PA.OSFile(self.output_file, 'wb')
+                self.table_writer = PA.ipc.new_file(self.ostream,
+                                                    self.schema)
+        if self.columns[0]:
+            self.table_writer.write_batch(
+                PA.record_batch(self.columns, schema=self.schema))
+            self.columns = [[] for _ in self.columns]
+
+    def _close_columnar(self):
+        """write the remaining rows and close the columnar file"""
+        if self.schema is None:
+            self.schema = PA.schema([])
+            self.columns = [[]]
+        self._flush_columns()
+        self.table_writer.close()
+        if self.ostream is not None:
+            self.ostream.close()
@@ -0,0 +1,223 @@
+"""A module to filter and sample the documents before parsing them"""
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from itertools import islice
+from operator import itemgetter
+from xml.sax.saxutils import unescape
+import hashlib
+import random
+import re
+
+# the filename attribute of the top level tag of a xml document, or of the
+# Document tag of a trxml document
+FILENAME_PATTERN = re.compile(rb'''\sfilename\s*=\s*(["'])(.*?)\1''', re.S)
+# the encoding of the xml declaration
+ENCODING_PATTERN = re.compile(
+    rb'''<\?xml[^>]*\sencoding\s*=\s*["']([\w.-]+)''')
+# the filename of the documents without filename attribute, as the parsers
+DEFAULT_FILENAME = '__UNKNOWN__'
+# number of bytes at the top of a document searched for its filename
+HEAD_SIZE = 64 * 1024
+
+
+def find_filename(buf, start: int = 0, end: int = None,
+                  declared: bool = True) -> Optional[str]:
+    """
+    the filename of the raw document buf[start:end], read from the
+    attributes at its top without parsing it, shared by the DocFilter and
+    the MXMLIndex
+
+    params:
+        buf (bytes, mmap): the buffer of the document
+        start, end (int): the document in the buffer, by default all of it
+        declared (bool): decode the filename with the encoding of the xml
+        declaration, otherwise with utf-8
+
+    output:
+        the filename, None if the document has no filename
+    """
+    end = len(buf) if end is None else end
+    end = min(end, start + HEAD_SIZE)
+    match = FILENAME_PATTERN.search(buf, start, end)
+    if match is None:
+        return None
+    declaration = ENCODING_PATTERN.match(buf, start, end) if declared \
+        else None
+    encoding = 'utf-8' if declaration is None \
+        else declaration.group(1).decode('ascii')
+    try:
+        filename = match.group(2).decode(encoding, errors='replace')
+    except LookupError:
+        filename = match.group(2).decode('utf-8', errors='replace')
+    return unescape(filename, {'&quot;': '"', '&apos;': "'"})
+
+
+def doc_filename(doc) -> str:
+    """
+    the filename of a raw document, see find_filename
+
+    params:
+        doc (bytes or str): the xml or trxml document
+
+    output:
+        the filename, '__UNKNOWN__' if the document has no filename
+    """
+    if isinstance(doc, str):
+        filename = find_filename(doc[:HEAD_SIZE].encode('utf-8'),
+                                 declared=False)
+    else:
+        filename = find_filename(doc)
+    return DEFAULT_FILENAME if filename is None else filename
+
+
+def position_draws(seed: int) -> Callable[[object], int]:
+    """
+    the function drawing a random number in [0, 2**64[ for the document at a
+    position: the hash of the position keyed by the seed
+
+    the draw only depends on the seed and the position of the document, so a
+    resumed run draws the same numbers for the remaining documents, and the
+    draws do not depend on the documents kept before
+    """
+    keyed = hashlib.blake2b(key=str(seed).encode('ascii'), digest_size=8)
+
+    def draw(position) -> int:
+        digest = keyed.copy()
+        digest.update(str(position).encode('utf-8'))
+        return int.from_bytes(digest.digest(), 'big')
+    return draw
+
+
+class DocFilter:
+    '''
+    DocFilter:
+    - keep the documents whose filename matches a regular expression, a
+      random sample of them, and at most a number of them
+    - applied by the DataLoader before parsing: on the paths of the files of
+      a dir, before reading them, and on the filename attribute of the other
+      documents
+    - the sample is either a rate of the documents, or a reservoir sample of
+      a number of documents from a stream of unknown size; the sampled
+      documents keep their order and their position in the source
+    - the rate sample draws each document from the seed and its position,
+      see position_draws, so a resumed run with the same seed keeps the
+      same sample
+    '''
+
+    def __init__(self, filename_pattern: str = None,
+                 sample_rate: float = None, sample_size: int = None,
+                 seed: int = None, limit: int = None):
+        '''
+        params:
+            filename_pattern (str): regular expression searched in the
+            filenames, or in the file paths of a dir
+            sample_rate (float): share of the documents kept, between 0
+            and 1
+            sample_size (int): number of documents of the reservoir sample
+            seed (int): seed of the random sample, None for a random seed
+            limit (int): maximum number of documents kept
+        '''
+        if sample_rate is not None and not 0 < sample_rate <= 1:
+            raise ValueError(f"sample rate {sample_rate} not in ]0, 1]")
+        if sample_rate is not None and sample_size is not None:
+            raise ValueError("sample either a rate or a number of documents")
+        if sample_size is not None and sample_size < 0:
+            raise ValueError(f"negative sample size {sample_size}")
+        if limit is not None and limit < 0:
+            raise ValueError(f"negative limit {limit}")
+        self.filename_pattern = None if filename_pattern is None \
+            else re.compile(filename_pattern)
+        self.sample_rate = sample_rate
+        self.sample_size = sample_size
+        self.seed = seed
+        self.limit = limit
+
+    @property
+    def selects_all(self) -> bool:
+        '''True if all documents are kept'''
+        return self.filename_pattern is None and self.sample_rate is None \
+            and self.sample_size is None and self.limit is None
+
+    def num_documents(self, total_docs: Optional[int]) -> Optional[int]:
+        '''the number of documents kept out of total_docs, None if unknown'''
+        if total_docs is None or self.filename_pattern is not None \
+                or self.sample_rate is not None:
+            return None
+        for maximum in (self.sample_size, self.limit):
+            if maximum is not None:
+                total_docs = min(total_docs, maximum)
+        return total_docs
+
+    def positioned_paths(self, positioned_paths: Iterable[Tuple[object, str]]
+                         ) -> Iterator[Tuple[object, str]]:
+        '''the kept (position, file path) pairs'''
+        return self._positioned(positioned_paths, str)
+
+    def positioned_docs(self, positioned_docs: Iterable[Tuple[object, object]]
+                        ) -> Iterator[Tuple[object, object]]:
+        '''the kept (position, document) pairs'''
+        return self._positioned(positioned_docs, doc_filename)
+
+    def kept_ids(self, ids: Iterable[str]) -> List[str]:
+        '''
+        the kept ids of the documents positioned by their id, before fetching
+        them: the filename of a document is not known from its id
+        '''
+        if self.filename_pattern is not None:
+            raise ValueError("the documents can not be filtered by filename "
+                             "before fetching them")
+        return [doc_id for doc_id, _ in
+                self._positioned(((doc_id, None) for doc_id in ids), None)]
+
+    def split_ids(self) -> Tuple['DocFilter', 'DocFilter']:
+        '''
+        split the filter for a source fetching the documents by id: the
+        filter of the ids, applied before fetching the documents, and the
+        filter of the fetched documents
+
+        without filename pattern, the documents are all filtered by id. With
+        it, only the rate sample is drawn on the ids, it does not depend on
+        the documents kept by the filename, see position_draws
+        '''
+        if self.filename_pattern is None:
+            return self, DocFilter()
+        return (DocFilter(sample_rate=self.sample_rate, seed=self.seed),
+                DocFilter(self.filename_pattern.pattern,
+                          sample_size=self.sample_size, seed=self.seed,
+                          limit=self.limit))
+
+    def _positioned(self, positioned: Iterable[Tuple[object, object]],
+                    filename: Callable) -> Iterator[Tuple[object, object]]:
+        if self.filename_pattern is not None:
+            search = self.filename_pattern.search
+            positioned = (pair for pair in positioned
+                          if search(filename(pair[1])))
+        if self.sample_rate is not None:
+            threshold = int(self.sample_rate * 2 ** 64)
+            draw = position_draws(random.getrandbits(64) if self.seed is None
+                                  else self.seed)
+            positioned = (pair for pair in positioned
+                          if draw(pair[0]) < threshold)
+        elif self.sample_size is not None:
+            positioned = self._reservoir(positioned)
+        if self.limit is not None:
+            positioned = islice(positioned, self.limit)
+        return positioned
+
+    def _reservoir(self, positioned: Iterable) -> Iterator:
+        '''
+        reservoir sample of sample_size pairs, only the sampled pairs are
+        kept in memory, generated in the input order once the input is over
+        '''
+        randrange = random.Random(self.seed).randrange
+        size = self.sample_size
+        reservoir = []
+        for number, pair in enumerate(positioned):
+            if number < size:
+                reservoir.append((number, pair))
+                continue
+            kept = randrange(number + 1)
+            if kept < size:
+                reservoir[kept] = (number, pair)
+        reservoir.sort(key=itemgetter(0))
+        for _, pair in reservoir:
+            yield pair
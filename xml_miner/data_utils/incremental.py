@@ -0,0 +1,169 @@
+"""A module to skip the files of a dir unchanged since the last mining run"""
+from typing import Iterable, Iterator, Optional, Tuple
+from collections import deque
+import hashlib
+import json
+import os
+import sqlite3
+from .data_loader import load_from_paths
+from .. import LOGGER
+
+
+class CachedSelection:
+    '''
+    the select_doc result of a document from a previous run, as dumped by
+    MinedDoc.dump
+    '''
+    __slots__ = ('selected',)
+
+    def __init__(self, selected: Optional[list]):
+        self.selected = selected
+
+
+class IncrementalManifest:
+    '''
+    IncrementalManifest:
+    - sqlite file of the mined files of a dir, per selector fingerprint: path,
+      size, modification time, content hash, and the select_doc result
+    - files with the same size and modification time are not read again,
+      files with the same content hash are not parsed again
+    - the files not seen by a complete run are removed from the manifest
+    '''
+
+    COMMIT_INTERVAL = 1000
+
+    def __init__(self, manifest_file: str, fingerprint: str):
+        '''
+        params:
+            manifest_file (str): the sqlite file, created if needed
+            fingerprint (str): the selectors of the run, see fingerprint
+        '''
+        self.manifest_file = manifest_file
+        self.fingerprint = fingerprint
+        self.connection = sqlite3.connect(manifest_file)
+        self.connection.execute(
+            '''CREATE TABLE IF NOT EXISTS documents (
+                   fingerprint TEXT NOT NULL,
+                   path TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   mtime_ns INTEGER NOT NULL,
+                   digest TEXT NOT NULL,
+                   run INTEGER NOT NULL,
+                   selected TEXT,
+                   PRIMARY KEY (fingerprint, path))''')
+        self.run = self.connection.execute(
+            'SELECT COALESCE(MAX(run), 0) + 1 FROM documents '
+            'WHERE fingerprint = ?', (fingerprint,)).fetchone()[0]
+        self.complete_run = True
+        self.num_unchanged = 0
+        self.num_changed = 0
+        self._changed = {}
+        self._num_writes = 0
+
+    @staticmethod
+    def make_fingerprint(miner_name: str, selector_string: str,
+                         parsing: str = '') -> str:
+        '''
+        the fingerprint of the selectors of a miner, and of the parsing
+        options changing the selected values
+        '''
+        return hashlib.sha1(f'{miner_name}\n{selector_string}\n{parsing}'
+                            .encode('utf-8')).hexdigest()
+
+    def positioned_docs(self,
+                        positioned_paths: Iterable[Tuple[int, str]],
+                        complete_run: bool = True,
+                        prefetch: int = 0
+                        ) -> Iterator[Tuple[int, object]]:
+        """
+        the documents of the files, the cached result of unchanged files
+
+        params:
+            positioned_paths (iterable): (file index, file path) pairs
+            complete_run (bool): all the files of the dir are given, the
+            files not given are removed from the manifest by finish
+            prefetch (int): number of threads reading the changed files
+            ahead, see load_from_paths
+
+        output:
+            (file index, xml bytes or CachedSelection) per file
+        """
+        self.complete_run = complete_run
+        # the checked files, the changed ones wait for their content
+        checked = deque()
+
+        def changed_paths():
+            for position, path in positioned_paths:
+                key = os.path.abspath(path)
+                stat = os.stat(path)
+                row = self.connection.execute(
+                    'SELECT size, mtime_ns, digest, selected FROM documents '
+                    'WHERE fingerprint = ? AND path = ?',
+                    (self.fingerprint, key)).fetchone()
+                if row is not None and row[:2] == (stat.st_size,
+                                                   stat.st_mtime_ns):
+                    self._write('UPDATE documents SET run = ? '
+                                'WHERE fingerprint = ? AND path = ?',
+                                (self.run, self.fingerprint, key))
+                    self.num_unchanged += 1
+                    checked.append((position, CachedSelection(
+                        self._loads(row[3]))))
+                    continue
+                checked.append((position, (key, stat, row)))
+                yield path
+
+        for content in load_from_paths(changed_paths(), prefetch):
+            while isinstance(checked[0][1], CachedSelection):
+                yield checked.popleft()
+            position, (key, stat, row) = checked.popleft()
+            digest = hashlib.sha1(content).hexdigest()
+            if row is not None and row[2] == digest:
+                self._store(key, stat, digest, row[3])
+                self.num_unchanged += 1
+                yield position, CachedSelection(self._loads(row[3]))
+                continue
+
+            self._changed[position] = (key, stat, digest)
+            self.num_changed += 1
+            yield position, content
+        yield from checked
+
+    def store(self, position: int, selected: Optional[list]):
+        '''save the dumped select_doc result of a new or changed file'''
+        changed = self._changed.pop(position, None)
+        if changed is not None:
+            key, stat, digest = changed
+            self._store(key, stat, digest,
+                        None if selected is None else json.dumps(selected))
+
+    def _store(self, key, stat, digest, selected):
+        self._write('INSERT OR REPLACE INTO documents '
+                    '(fingerprint, path, size, mtime_ns, digest, run, '
+                    'selected) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (self.fingerprint, key, stat.st_size, stat.st_mtime_ns,
+                     digest, self.run, selected))
+
+    def _write(self, statement, parameters):
+        self.connection.execute(statement, parameters)
+        self._num_writes += 1
+        if self._num_writes % self.COMMIT_INTERVAL == 0:
+            self.connection.commit()
+
+    @staticmethod
+    def _loads(selected: Optional[str]) -> Optional[list]:
+        return None if selected is None else json.loads(selected)
+
+    def finish(self):
+        '''the run is over: forget the files removed from the dir'''
+        if self.complete_run:
+            self.connection.execute(
+                'DELETE FROM documents WHERE fingerprint = ? AND run < ?',
+                (self.fingerprint, self.run))
+        self.connection.commit()
+        LOGGER.info("incremental: %d unchanged, %d new or changed files",
+                    self.num_unchanged, self.num_changed)
+
+    def close(self):
+        '''save the stored results and close the manifest'''
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,326 @@
+"""A module to index the documents of a mxml/mtrxml file by byte offsets"""
+from typing import Iterator, List, Optional, Tuple
+from bisect import bisect_left
+import json
+import mmap
+import os
+from .doc_filter import find_filename
+from .. import LOGGER
+
+XML_DECLARATION = b'<?xml'
+
+
+def _line_starts(buffer, prefix: bytes, end: int) -> List[int]:
+    '''offsets of all lines in buffer[:end] starting with the prefix'''
+    positions = []
+    if buffer[:len(prefix)] == prefix:
+        positions.append(0)
+    needle = b'\n' + prefix
+    position = buffer.find(needle, 0, end)
+    while position != -1:
+        positions.append(position + 1)
+        position = buffer.find(needle, position + 1, end)
+    return positions
+
+
+def _line_end(buffer, start: int, end: int) -> int:
+    '''offset of the end of the line starting at start, newline excluded'''
+    position = buffer.find(b'\n', start, end)
+    return end if position == -1 else position
+
+
+class MXMLIndex:
+    '''
+    MXMLIndex:
+    - byte offsets of each document in a mxml/mtrxml file, by position and
+      by filename
+    - persisted next to the input file, rebuilt once the file changed
+    - serve documents as slices of a memory map of the input file
+
+    The documents are identical to the ones generated by
+    data_loader.load_from_stream: a document starts at a line beginning with
+    the header line, and xml declaration lines are dropped, except the one
+    right before the header line.
+    '''
+
+    VERSION = 3
+    INDEX_SUFFIX = '.idx'
+    ENCODING = 'utf-8'
+
+    def __init__(self, input_file: str, header_line: str,
+                 documents: List[list], file_size: int, file_mtime: int):
+        '''
+        params:
+            input_file (str): the mxml/mtrxml file
+            header_line (str): the beginning of the top level tag
+            documents (list): [start, end, irregular, filename] per document,
+            irregular documents contain xml declaration lines to drop, start
+            includes the xml declaration before the header line
+            file_size (int), file_mtime (int): to detect outdated index
+        '''
+        self.input_file = input_file
+        self.header_line = header_line
+        self.documents = documents
+        self.file_size = file_size
+        self.file_mtime = file_mtime
+        self.positions = {}
+        for position, document in enumerate(documents):
+            if document[3] is not None:
+                self.positions.setdefault(document[3], position)
+        self._file = None
+        self._mmap = None
+
+    @classmethod
+    def index_file(cls, input_file: str) -> str:
+        '''the index filename of an input file'''
+        return input_file + cls.INDEX_SUFFIX
+
+    @classmethod
+    def build(cls, input_file: str, header_line: str):
+        """
+        scan the input file once and index the offsets of all documents
+
+        params:
+            input_file (str): the mxml/mtrxml file
+            header_line (str): the beginning of the top level tag
+
+        output:
+            MXMLIndex object
+        """
+        stat = os.stat(input_file)
+        header = header_line.encode(cls.ENCODING)
+        if stat.st_size == 0:
+            return cls(input_file, header_line, [[0, 0, False, None]],
+                       stat.st_size, stat.st_mtime_ns)
+
+        with open(input_file, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            size = len(buf)
+            headers = _line_starts(buf, header, size)
+            header_set = set(headers)
+            declarations = _line_starts(buf, XML_DECLARATION, size)
+            documents = []
+
+            regions = []
+            first = headers[0] if headers else size
+            if not headers or first > 0:
+                regions.append((0, first, not headers))
+            regions.extend(
+                (start, end, True)
+                for start, end in zip(headers, headers[1:] + [size]))
+
+            decl_index = 0
+            for start, end, always in regions:
+                if end == size and buf[size - 1:size] != b'\n':
+                    content_end = end
+                else:
+                    content_end = end - 1
+                region_decls = []
+                while decl_index < len(declarations) \
+                        and declarations[decl_index] < end:
+                    if declarations[decl_index] >= start:
+                        region_decls.append(declarations[decl_index])
+                    decl_index += 1
+                document = cls._region_document(buf, start, content_end,
+                                                region_decls)
+                if document is None:
+                    if not always:
+                        continue
+                    document = [start, start, False, None]
+                elif start in header_set:
+                    document[0] = cls._declaration_start(buf, start)
+                document.append(find_filename(buf, document[0],
+                                              document[1]))
+                documents.append(document)
+        return cls(input_file, header_line, documents,
+                   stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def _region_document(buf, start: int, end: int,
+                         declarations: List[int]) -> Optional[list]:
+        '''
+        drop the trailing xml declaration lines of a region, a document with
+        other declaration lines is marked as irregular
+
+        output:
+            [start, end, irregular] or None if there is nothing but
+            declarations in the region
+        '''
+        end_of_content = end
+        for declaration in reversed(declarations):
+            if _line_end(buf, declaration, end) != end_of_content:
+                return [start, end, True]
+            if declaration == start:
+                return None
+            end_of_content = declaration - 1
+        return [start, end_of_content, False]
+
+    @staticmethod
+    def _declaration_start(buf, header: int) -> int:
+        '''the start of the xml declaration line right before the header'''
+        if header == 0:
+            return header
+        line_start = buf.rfind(b'\n', 0, header - 1) + 1
+        if buf[line_start:line_start + len(XML_DECLARATION)] \
+                == XML_DECLARATION:
+            return line_start
+        return header
+
+    @classmethod
+    def load(cls, input_file: str, header_line: str):
+        """
+        load the persisted index of the input file
+
+        output:
+            MXMLIndex object, or None if there is no index or the index is
+            outdated
+        """
+        try:
+            with open(cls.index_file(input_file), 'rt',
+                      encoding='utf-8') as file:
+                index = json.load(file)
+        except (IOError, ValueError):
+            return None
+
+        stat = os.stat(input_file)
+        if index.get('version') != cls.VERSION \
+                or index.get('header') != header_line \
+                or index.get('size') != stat.st_size \
+                or index.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+        return cls(input_file, header_line, index['documents'],
+                   index['size'], index['mtime_ns'])
+
+    @classmethod
+    def load_or_build(cls, input_file: str, header_line: str):
+        """
+        load the persisted index, or build and persist a new one
+
+        params:
+            input_file (str): the mxml/mtrxml file
+            header_line (str): the beginning of the top level tag
+
+        output:
+            MXMLIndex object
+        """
+        index = cls.load(input_file, header_line)
+        if index is None:
+            LOGGER.info("building document index of %s", input_file)
+            index = cls.build(input_file, header_line)
+            try:
+                index.save()
+            except IOError as error:
+                LOGGER.warning("can not save the document index: %s", error)
+        return index
+
+    def save(self):
+        '''persist the index next to the input file'''
+        index_file = self.index_file(self.input_file)
+        tmp_file = index_file + '.tmp'
+        with open(tmp_file, 'wt', encoding='utf-8') as file:
+            json.dump({'version': self.VERSION,
+                       'header': self.header_line,
+                       'size': self.file_size,
+                       'mtime_ns': self.file_mtime,
+                       'documents': self.documents}, file)
+        os.replace(tmp_file, index_file)
+
+    def open(self):
+        '''memory map the input file'''
+        if self._mmap is None:
+            self._file = open(self.input_file, 'rb')
+            if self.file_size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            else:
+                self._mmap = b''
+        return self
+
+    def close(self):
+        '''
+        release the memory map, it stays mapped until the last memoryview
+        of iter_positioned_documents is released
+        '''
+        if self._mmap is not None:
+            if self.file_size:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    pass
+            self._file.close()
+            self._mmap = None
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def get_bytes(self, position: int) -> memoryview:
+        '''the raw bytes of a document, without copying'''
+        start, end, irregular = self.documents[position][:3]
+        self.open()
+        view = memoryview(self._mmap)[start:end]
+        if irregular:
+            header = self.header_line.encode(self.ENCODING)
+            lines = view.tobytes().split(b'\n')
+            view = memoryview(b'\n'.join(
+                line for line, next_line in zip(lines, lines[1:] + [b''])
+                if not line.startswith(XML_DECLARATION)
+                or next_line.startswith(header)))
+        return view
+
+    def get(self, position: int) -> bytes:
+        '''
+        the document at the given position, as bytes which the parsers
+        decode with the declared encoding of the document
+        '''
+        view = self.get_bytes(position)
+        try:
+            return view.tobytes()
+        finally:
+            view.release()
+
+    def get_by_filename(self, filename: str) -> bytes:
+        '''the first document with the given filename attribute'''
+        return self.get(self.positions[filename])
+
+    def iter_documents(self) -> Iterator[memoryview]:
+        '''generate the raw bytes of all documents in file order'''
+        for _, document in self.iter_positioned_documents():
+            yield document
+
+    def _first_from(self, start: int) -> int:
+        '''the position of the first document from a byte offset'''
+        return bisect_left([document[0] for document in self.documents],
+                           start)
+
+    def num_documents_from(self, start: int = 0) -> int:
+        '''the number of documents from a byte offset'''
+        return len(self.documents) - self._first_from(start)
+
+    def iter_positioned_documents(self,
+                                  start: int = 0
+                                  ) -> Iterator[Tuple[int, memoryview]]:
+        """
+        generate the documents from a byte offset, with the byte offset of
+        the next document, the same positions as
+        data_loader.load_positioned_from_multi_doc_file
+
+        params:
+            start (int): the byte offset of the first document
+
+        output:
+            (end offset, xml memoryview) per document, a slice of the memory
+            map without copy, which the parsers read like bytes
+        """
+        first = self._first_from(start)
+        with self:
+            for position in range(first, len(self.documents)):
+                end = self.documents[position + 1][0] \
+                    if position + 1 < len(self.documents) else self.file_size
+                yield end, self.get_bytes(position)
@@ -0,0 +1,54 @@
+"""run tasks in an executor with a bounded number of tasks in flight"""
+from typing import Callable, Iterable, Iterator, Tuple
+from collections import deque
+from concurrent.futures import Executor, Future, wait, FIRST_COMPLETED
+
+
+def bounded_submit(executor: Executor,
+                   function: Callable,
+                   items: Iterable,
+                   max_in_flight: int,
+                   ordered: bool = True) -> Iterator[Tuple[object, Future]]:
+    """
+    submit function(item) to the executor for each item, with at most
+    max_in_flight items submitted and not consumed yet, so the memory usage
+    does not depend on the number of items
+
+    params:
+        - executor: the thread or process pool
+        - function: the task, called with one item
+        - items: iterable of the items, read as the tasks are consumed
+        - max_in_flight: maximum number of submitted tasks not consumed yet
+        - ordered: yield the tasks in the order of the items, otherwise as
+          soon as they are done
+
+    output:
+        - (item, future) per item, the future is done; the pending tasks
+          are cancelled when the generator is closed
+    """
+    pending = deque()
+    try:
+        for item in items:
+            if len(pending) >= max_in_flight:
+                yield _next_done(pending, ordered)
+            pending.append((item, executor.submit(function, item)))
+        while pending:
+            yield _next_done(pending, ordered)
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _next_done(pending: deque, ordered: bool) -> Tuple[object, Future]:
+    '''wait for the next finished task and remove it from pending'''
+    if ordered:
+        item, future = pending.popleft()
+        wait([future])
+        return item, future
+    done, _ = wait([future for _, future in pending],
+                   return_when=FIRST_COMPLETED)
+    for task in pending:
+        if task[1] in done:
+            pending.remove(task)
+            return task
+    raise RuntimeError("no finished task")
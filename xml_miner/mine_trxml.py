@@ -2,6 +2,7 @@
 
 from argparse import ArgumentParser
 from .miner import TRXMLMiner
+from .miner_args import add_mining_args, mining_options
 from . import LOGGER
 
 
@@ -11,7 +12,9 @@ def get_args():
                             values from trxml files.''')
 
     parser.add_argument('--source', help='''source of the trxml files, it is
-                        1) a dir contains trxml files or 2) a mtrxml file''',
+                        1) a dir contains trxml files or 2) a mtrxml file,
+                        possibly compressed (gz, bz2, xz, zst), or a zip/tar
+                        archive of trxml files''',
                         type=str, required=True)
 
     parser.add_argument('--output_file', help='outputfile of selected values',
@@ -31,13 +34,16 @@ def get_args():
     parser.add_argument('--fields', help='fields, comma separated',
                         type=str, default=None)
 
+    add_mining_args(parser, 'trxml')
+
     return parser.parse_args()
 
 
 def main():
     '''apply selectors to trxml files'''
     args = get_args()
-    trxml_miner = TRXMLMiner(args.selector, args.itemgroup, args.fields)
+    trxml_miner = TRXMLMiner(args.selector, args.itemgroup, args.fields,
+                             **mining_options(args))
     LOGGER.info(
         "select '%s' and write results to '%s'",
         trxml_miner.selectors.selector_string,
@@ -2,6 +2,7 @@
 
 from argparse import ArgumentParser
 from .miner import XMLMiner
+from .miner_args import add_mining_args, mining_options
 from . import LOGGER
 
 
@@ -13,7 +14,8 @@ def get_args():
     parser.add_argument('--source', help='''source of the xml files,
                         it could be:
                         1. a dir contains xml files
-                        2. a mxml file or xml file
+                        2. a mxml file or xml file, possibly compressed
+                        (gz, bz2, xz, zst), or a zip/tar archive of xml files
                         3. the host:port of a running annotation server''',
                         type=str, required=True)
 
@@ -32,17 +34,24 @@ def get_args():
                          type=str, default='')
     as_args.add_argument('--as_pass', help='password to the annoationserver',
                          type=str, default='')
+    as_args.add_argument('--as_workers',
+                         help='number of documents fetched at the same time',
+                         type=int, default=1)
     parser.add_argument('--with_field_name',
                         help='add a column to show the field',
                         action='store_true')
 
+    add_mining_args(parser, 'xml')
+
     return parser.parse_args()
 
 
 def main():
     '''apply selectors to xml files'''
     args = get_args()
-    xml_miner = XMLMiner(args.selectors, args.with_field_name)
+    xml_miner = XMLMiner(args.selectors, args.with_field_name,
+                         as_workers=args.as_workers,
+                         **mining_options(args))
     LOGGER.info(
         "select '%s' and write results to '%s'",
         xml_miner.selectors.selector_string,
@@ -1,12 +1,49 @@
 """apply selector on input data, and output it to a csv file"""
 from typing import List
+from collections import Counter, deque
+from itertools import chain, compress
 from os.path import isfile, isdir
-import xml.etree.ElementTree as ET
-from .data_utils import DataLoader, DataSaver
+import asyncio
+from .data_utils import DataLoader, DataSaver, DocFilter, \
+    IncrementalManifest
+from .data_utils.incremental import CachedSelection
+from .data_utils.async_asclient import AsyncASClient
 from .xml import TKXML, TKTRXML
+from .xml.backend import PARSE_ERRORS, XML_BACKEND, resolve_backend
 from .selectors import TRXML_SELECTOR_TYPE, TRXMLSelectors, XMLSelectors
+from .parallel import parallel_select
+from .checkpoint import Checkpoint
+from .result_cache import ResultCache
+from .stats import STAGE, MiningStats
+from .profiling import PROFILER, Profiler
+from .record import MinedDoc, MinedItems
 from . import LOGGER
 
+MINING_ENGINE = {'TREE': 'tree', 'ITERPARSE': 'iterparse'}
+
+# the events of a run where callbacks can be attached, see add_hook
+HOOK = {
+    'DOC_PARSED': 'on_doc_parsed',
+    'DOC_SELECTED': 'on_doc_selected',
+    'ROW_WRITTEN': 'on_row_written',
+}
+
+
+class _NotTimed:
+    '''the timing context of the stages when the stats are not collected'''
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOT_TIMED = _NotTimed()
+
+# joins the values of a batch to normalize them at once, it is not allowed
+# in xml documents
+_VALUE_SEPARATOR = '\x00'
+
 
 class CommonMiner:
     '''
@@ -14,7 +51,23 @@ class CommonMiner:
 
     shared class for both xml and trxml
     '''
-    def __init__(self, selectors):
+
+    # number of documents normalized and written at once by mine_and_save
+    ROW_BATCH_SIZE = 256
+
+    def __init__(self, selectors, use_index=False, workers=1, batch_size=64,
+                 ordered=True, engine=MINING_ENGINE['TREE'],
+                 backend=XML_BACKEND['AUTO'], recover=False,
+                 recursive=False, sort_files=True, prefetch=0,
+                 output_buffer_size=DataSaver.WRITE_BUFFER_SIZE,
+                 row_group_size=DataSaver.ROW_GROUP_SIZE,
+                 checkpoint_interval=Checkpoint.INTERVAL, resume=False,
+                 manifest=None, cache=None, cache_size=ResultCache.MAX_SIZE,
+                 collect_stats=False,
+                 progress_interval=MiningStats.PROGRESS_INTERVAL,
+                 profile=None, profile_file=None, profile_top=Profiler.TOP,
+                 filter_filename=None, sample=None, sample_size=None,
+                 seed=None, limit=None):
         '''
         params:
             data (xml document_loader): a data generator loop through all xmls
@@ -22,10 +75,98 @@ class CommonMiner:
             output_file (string): the output filename
             with_field_name: add a column to show the field_name of extracted
             value
+            use_index: read mxml/mtrxml files through the persisted document
+            index, see data_utils/mxml_index.py
+            workers: number of processes to parse and select documents
+            batch_size: number of documents sent to a worker process at once
+            ordered: with workers, keep the output in the input order
+            engine: 'tree' to parse the whole document before selecting,
+            'iterparse' to select while parsing, without building the tree
+            backend: xml parser of the tree engine, 'lxml', 'etree', or
+            'auto' to use etree, or lxml with recover
+            recover: with lxml, parse as much as possible of broken
+            documents, the lxml package and the tree engine are required
+            recursive: also read the files in the sub directories of a dir
+            sort_files: read the files of a dir sorted by name
+            prefetch: number of threads reading the files of a dir ahead
+            output_buffer_size: size in bytes of the output write buffer
+            row_group_size: rows per record batch of .parquet/.arrow output
+            checkpoint_interval: seconds between two checkpoints of
+            mine_and_save, 0 to disable them, see checkpoint.py
+            resume: continue the interrupted mine_and_save run from its
+            checkpoint, appending to its output file
+            manifest: sqlite file of the incremental mode: only the files of
+            a dir changed since the last run are parsed, the results of the
+            other files come from the manifest, see data_utils/incremental.py;
+            the other sources raise ValueError
+            cache: sqlite file caching the select_doc results by document
+            content and selectors, shared by the runs, see result_cache.py
+            cache_size: maximum size in bytes of the cached results
+            collect_stats: time the stages of the runs, log the progress and
+            the time of each stage in the summary, see stats.py
+            progress_interval: with collect_stats, seconds between two
+            progress lines, 0 to not log the progress
+            profile: profile mine_and_save with 'cprofile' or 'tracemalloc',
+            see profiling.py
+            profile_file: the file of the profile, by default the output
+            file with a .prof or .tracemalloc suffix
+            profile_top: number of functions or lines of the profile report
+            filter_filename: regular expression, only the documents whose
+            filename (the file path for a dir) matches it are parsed
+            sample: only parse a random share of the documents, between 0
+            and 1
+            sample_size: only parse a reservoir sample of this number of
+            documents
+            seed: seed of the random sample, needed to resume a sampled run
+            limit: only parse the first documents, up to this number
+            the documents are filtered before parsing, see
+            data_utils/doc_filter.py
         output:
             None
         '''
+        if engine not in MINING_ENGINE.values():
+            raise ValueError(f"mining engine '{engine}' unknown")
+        if recover and engine == MINING_ENGINE['ITERPARSE']:
+            raise ValueError("the recover mode needs the tree engine")
+        if profile is not None and profile not in PROFILER.values():
+            raise ValueError(f"profiler '{profile}' unknown")
+        if resume and (sample_size is not None or limit is not None):
+            raise ValueError("a run limited to a number of documents can "
+                             "not be resumed")
+        if resume and sample is not None and seed is None:
+            raise ValueError("a sampled run needs a seed to be resumed")
+        if (manifest is not None or cache is not None) \
+                and workers > 1 and not ordered:
+            raise ValueError("the incremental mode and the result cache "
+                             "need ordered workers")
         self.selectors = selectors
+        self.use_index = use_index
+        self.workers = workers
+        self.batch_size = batch_size
+        self.ordered = ordered
+        self.engine = engine
+        self.backend = resolve_backend(backend, recover)
+        self.recover = recover
+        self.recursive = recursive
+        self.sort_files = sort_files
+        self.prefetch = prefetch
+        self.output_buffer_size = output_buffer_size
+        self.row_group_size = row_group_size
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.manifest = manifest
+        self.cache = cache
+        self.cache_size = cache_size
+        self.collect_stats = collect_stats
+        self.progress_interval = progress_interval
+        # the MiningStats of the last run, with collect_stats
+        self.stats = None
+        self.profile = profile
+        self.profile_file = profile_file
+        self.profile_top = profile_top
+        self.doc_filter = DocFilter(filter_filename, sample, sample_size,
+                                    seed, limit)
+        self.hooks = {hook: [] for hook in HOOK.values()}
         self.selector_string = self.selectors.selector_string
         self._init_counter()
 
@@ -33,6 +174,8 @@ class CommonMiner:
         self.num_docs = 0
         self.num_values = 0
         self.value_counter = {selector.text: 0 for selector in self.selectors}
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def _print_summary(self):
         LOGGER.info("found total %s values from %s docss",
@@ -40,6 +183,343 @@ class CommonMiner:
         if len(self.value_counter) > 1:
             for field in self.value_counter:
                 LOGGER.info("- found %d %s", self.value_counter[field], field)
+        if self.cache is not None:
+            LOGGER.info("result cache: %d hits, %d misses",
+                        self.cache_hits, self.cache_misses)
+        if self.stats is not None:
+            self.stats.log_summary()
+
+    def add_hook(self, hook: str, callback):
+        """
+        call a function at each event of the runs:
+
+        - on_doc_parsed(doc, tree): a document is parsed by the tree engine,
+          in the worker processes with workers, the callback is then pickled
+          with the miner
+        - on_doc_selected(position, selected): the select_doc result of a
+          document, None if it is skipped
+        - on_row_written(row): an output row of mine_and_save is stored
+
+        params:
+            - hook: the event, see HOOK
+            - callback: the function called with the arguments of the event
+        """
+        if hook not in self.hooks:
+            raise ValueError(f"hook '{hook}' unknown")
+        self.hooks[hook].append(callback)
+
+    def __getstate__(self):
+        '''
+        the miner copied to the worker processes, only with the hooks called
+        in the workers
+        '''
+        state = dict(self.__dict__)
+        state['hooks'] = {hook: [] for hook in HOOK.values()}
+        state['hooks'][HOOK['DOC_PARSED']] = self.hooks[HOOK['DOC_PARSED']]
+        return state
+
+    def _call_hooks(self, hook: str, *args):
+        for callback in self.hooks[hook]:
+            callback(*args)
+
+    def _timed(self, stage: str):
+        '''the context timing a stage of the run, with collect_stats'''
+        if self.stats is None:
+            return _NOT_TIMED
+        return self.stats.timed(stage)
+
+    def _fingerprint(self) -> str:
+        '''
+        the fingerprint of the miner type, its selectors and the parsing
+        options, the selected values are keyed by the selector texts, so
+        they are kept as is. The engine, backend and recover mode decide
+        which documents can be parsed and what text is selected.
+        '''
+        parsing = f'{self.engine} {self.backend} recover={self.recover}'
+        return IncrementalManifest.make_fingerprint(type(self).__name__,
+                                                    self.selector_string,
+                                                    parsing)
+
+    def select_doc(self, doc):
+        """
+        parse one document and apply the selectors on it
+
+        params:
+            - doc: xml string or the raw xml bytes
+
+        output:
+            - MinedDoc of the filename and selected values, None if the
+              document is skipped
+        """
+        raise NotImplementedError
+
+    def _record_class(self):
+        '''the class of the select_doc results, see record.py'''
+        return MinedDoc
+
+    def _record(self, filename: str, values: list) -> MinedDoc:
+        '''the select_doc result of the values of a document'''
+        return self._record_class()(filename, values, self.selectors.fields)
+
+    def _cached_record(self, cached: CachedSelection):
+        '''the select_doc result kept by the manifest or the cache'''
+        if cached.selected is None:
+            return None
+        return self._record_class().load(cached.selected,
+                                         self.selectors.fields)
+
+    @staticmethod
+    def _doc_text(doc) -> str:
+        '''the document as text, to log the skipped documents'''
+        if isinstance(doc, (bytes, bytearray, memoryview)):
+            return str(doc, 'utf-8', errors='replace')
+        return doc
+
+    def _select_positioned(self, positioned_docs):
+        """
+        apply select_doc on all documents, in worker processes if needed
+
+        params:
+            - positioned_docs: (position, document) pairs
+
+        output:
+            - (position, select_doc result) per document, the position is
+              None when the workers do not keep the input order
+        """
+        if self.workers <= 1:
+            for position, doc in positioned_docs:
+                if isinstance(doc, CachedSelection):
+                    yield position, self._cached_record(doc)
+                else:
+                    yield position, self.select_doc(doc)
+            return
+
+        # the cached results wait in the queue for the documents before them
+        positions = deque()
+
+        def docs():
+            for position, doc in positioned_docs:
+                if isinstance(doc, CachedSelection):
+                    positions.append((position, doc))
+                else:
+                    positions.append((position, None))
+                    yield doc
+
+        selected_batches = parallel_select(self, docs(), self.workers,
+                                           self.batch_size, self.ordered)
+        if self.stats is not None:
+            selected_batches = self.stats.timed_iter(selected_batches,
+                                                     STAGE['SELECT'])
+        for selected in selected_batches:
+            while positions[0][1] is not None:
+                position, cached = positions.popleft()
+                yield position, self._cached_record(cached)
+            position, _ = positions.popleft()
+            yield (position if self.ordered else None), selected
+        for position, cached in positions:
+            yield position, self._cached_record(cached)
+
+    def _select_loaded(self, data):
+        """
+        apply select_doc on all documents of the DataLoader object, unless
+        their result is in the cache, and store the results in its
+        incremental manifest and in the cache
+
+        output:
+            - (position, select_doc result) per document
+        """
+        positioned_docs = data.positioned_generator
+        if self.collect_stats:
+            self.stats = MiningStats(data.total_docs, data.total_bytes,
+                                     self.progress_interval)
+            positioned_docs = self.stats.loaded_docs(positioned_docs)
+        cache = None
+        if self.cache is not None:
+            cache = ResultCache(self.cache, self._fingerprint(),
+                                self.cache_size)
+            positioned_docs = cache.positioned_docs(positioned_docs)
+        selected_docs = self._select_positioned(positioned_docs)
+        if self.hooks[HOOK['DOC_SELECTED']]:
+            selected_docs = self._selected_hooks(selected_docs)
+        if data.manifest is None and cache is None:
+            yield from selected_docs
+            return
+        try:
+            for position, selected in selected_docs:
+                dumped = None if selected is None else selected.dump()
+                if data.manifest is not None:
+                    data.manifest.store(position, dumped)
+                if cache is not None:
+                    cache.store(position, dumped)
+                yield position, selected
+            if data.manifest is not None:
+                data.manifest.finish()
+        finally:
+            if data.manifest is not None:
+                data.manifest.close()
+            if cache is not None:
+                cache.close()
+                self.cache_hits += cache.hits
+                self.cache_misses += cache.misses
+
+    def _selected_hooks(self, selected_docs):
+        for position, selected in selected_docs:
+            self._call_hooks(HOOK['DOC_SELECTED'], position, selected)
+            yield position, selected
+
+    def _mine_loaded(self, data):
+        """
+        apply select_doc on all documents of the DataLoader object, and
+        count the mined documents
+        """
+        for _, selected in self._select_loaded(data):
+            if selected is not None:
+                self.num_docs += 1
+                if self.stats is not None:
+                    self.stats.docs_mined += 1
+                yield selected
+            if self.stats is not None:
+                self.stats.log_progress()
+        if self.stats is not None:
+            self.stats.finish()
+
+    def _check_manifest_source(self, source: str):
+        '''the incremental manifest keeps the results of the files of a dir'''
+        if self.manifest is not None and not isdir(source):
+            raise ValueError("the incremental manifest needs a dir source, "
+                             f"not {source}")
+
+    def _open_manifest(self):
+        '''the manifest of the incremental mode, None if not enabled'''
+        if self.manifest is None:
+            return None
+        return IncrementalManifest(self.manifest, self._fingerprint())
+
+    def _counters(self) -> dict:
+        return {'num_docs': self.num_docs,
+                'num_values': self.num_values,
+                'value_counter': dict(self.value_counter)}
+
+    def _save_mined(self, source, output_file, load_data):
+        """
+        mine all documents and save the rows of each document, with
+        checkpoints to resume an interrupted run, and profile the run if
+        needed
+
+        params:
+            - source: data source
+            - output_file (string): the output filename
+            - load_data: function of the position to resume from (None to
+              start from the beginning), returning the DataLoader object
+        """
+        if self.profile is None:
+            self._save_rows(source, output_file, load_data)
+            return
+        profile_file = self.profile_file or \
+            Profiler.profile_filename(self.profile, output_file)
+        with Profiler(self.profile, profile_file, self.profile_top):
+            self._save_rows(source, output_file, load_data)
+
+    def _save_rows(self, source, output_file, load_data):
+        '''the mine_and_save run, see _save_mined'''
+        self._init_counter()
+        state = None
+        if self.resume:
+            state = Checkpoint.load(output_file, source, self.selector_string)
+            if state is None:
+                LOGGER.warning("no checkpoint of %s, mine from the beginning",
+                               output_file)
+
+        if state is None:
+            writer = DataSaver(output_file, self.output_buffer_size,
+                               self.row_group_size)
+            self._print_header(writer)
+            data = load_data(None)
+        else:
+            LOGGER.info("resume after %s %s", state['position_type'],
+                        state['position'])
+            if not self.sort_files and isdir(source):
+                LOGGER.warning("the files of %s are not sorted, the resumed "
+                               "run may skip or repeat files", source)
+            data = load_data(state['position'])
+            if data.position_type != state['position_type']:
+                raise ValueError(f"the checkpoint of {output_file} does not "
+                                 f"match the source {source}")
+            writer = DataSaver(output_file, self.output_buffer_size,
+                               self.row_group_size, state['output_offset'])
+            self.num_docs = state['num_docs']
+            self.num_values = state['num_values']
+            self.value_counter.update(state['value_counter'])
+
+        checkpoint = None
+        if self.checkpoint_interval > 0 and writer.resumable:
+            if self.workers > 1 and not self.ordered:
+                LOGGER.warning("no checkpoints with unordered workers")
+            else:
+                checkpoint = Checkpoint(output_file, source,
+                                        self.selector_string,
+                                        data.position_type,
+                                        self.checkpoint_interval)
+
+        batch = []
+        for position, selected in self._select_loaded(data):
+            if selected is not None:
+                self.num_docs += 1
+                batch.append(selected)
+            due = checkpoint is not None and checkpoint.due()
+            if len(batch) >= self.ROW_BATCH_SIZE or due:
+                self._write_batch(writer, batch)
+                batch = []
+            if due:
+                checkpoint.save(position, writer.flush(), self._counters())
+            if self.stats is not None:
+                self.stats.log_progress()
+        self._write_batch(writer, batch)
+
+        with self._timed(STAGE['WRITE']):
+            writer.close_stream()
+        if self.stats is not None:
+            self.stats.finish()
+        self._print_summary()
+        if checkpoint is not None:
+            checkpoint.remove()
+
+    def _write_batch(self, writer, batch: List[MinedDoc]):
+        '''normalize the values of a batch of documents and store the rows'''
+        if not batch:
+            return
+        with self._timed(STAGE['NORMALIZE']):
+            rows = self._batch_records(batch)
+        with self._timed(STAGE['WRITE']):
+            writer.store_many(rows)
+        if self.hooks[HOOK['ROW_WRITTEN']]:
+            for row in rows:
+                self._call_hooks(HOOK['ROW_WRITTEN'], row)
+        if self.stats is not None:
+            self.stats.docs_mined += len(batch)
+            self.stats.rows_written += len(rows)
+
+    def _batch_records(self, batch: List[MinedDoc]) -> List[List[str]]:
+        '''the output rows of the normalized values of the documents'''
+        raise NotImplementedError
+
+    @classmethod
+    def normalize_strings(cls, values: List[str]) -> List[str]:
+        '''
+        normalize_string of a list of values at once: the values are joined,
+        normalized and split again, without a loop over the values. None
+        values stay None.
+        '''
+        if None in values:
+            norm_values = cls.normalize_strings(
+                [value or '' for value in values])
+            return [None if value is None else norm_value
+                    for value, norm_value in zip(values, norm_values)]
+        joined = _VALUE_SEPARATOR.join(values)
+        if joined.count(_VALUE_SEPARATOR) != len(values) - 1:
+            return [cls.normalize_string(value) for value in values]
+        return joined.replace('\n', "__NEWLINE__").replace('\t', "    ") \
+            .split(_VALUE_SEPARATOR)
 
     @staticmethod
     def normalize_string(line: str) -> str:
@@ -60,16 +540,21 @@ class XMLMiner(CommonMiner):
     - iterate over the xml files and select values
     - output selected values to a file, and print summary
     '''
-    def __init__(self, selectors, with_field_name=False):
+    def __init__(self, selectors, with_field_name=False, as_workers=1,
+                 **kwargs):
         '''
         params:
             selectors (XMLSelectors): see xml_selector.py
             with_field_name: add a column to show the field_name of
             extracted value
+            as_workers: number of documents fetched at the same time from
+            the annotation server
+            kwargs: mining options, see CommonMiner
         '''
         selector_obj = self.read_selectors(selectors)
-        super().__init__(selector_obj)
+        super().__init__(selector_obj, **kwargs)
         self.with_field_name = with_field_name
+        self.as_workers = as_workers
 
     def _print_header(self, writer) -> List[str]:
         csv_header = ["filename", "value"]
@@ -78,44 +563,62 @@ class XMLMiner(CommonMiner):
         writer.store(csv_header)
         return
 
-    def _print_record(
-                      self,
-                      writer: DataSaver,
-                      filename: str,
-                      value: str,
-                      field: str) -> List[str]:
-        norm_value = self.normalize_string(value)
-        if norm_value:
-            csv_row = [filename, norm_value]
-            if self.with_field_name:
-                csv_row.append(field)
-            writer.store(csv_row)
-
-            self.num_values += 1
-            self.value_counter[field] += 1
+    def _batch_records(self, batch: List[MinedDoc]) -> List[List[str]]:
+        '''
+        the output rows of the normalized values of the documents, one per
+        value, the counters are updated once per batch
+        '''
+        files = []
+        fields = []
+        values = []
+        for selected in batch:
+            for field, field_values in zip(selected.fields, selected.values):
+                values.extend(field_values)
+                fields.extend([field] * len(field_values))
+                files.extend([selected.file] * len(field_values))
+        norm_values = self.normalize_strings(values)
+
+        if self.with_field_name:
+            csv_rows = [[file, norm_value, field] for file, norm_value, field
+                        in zip(files, norm_values, fields) if norm_value]
+        else:
+            csv_rows = [[file, norm_value]
+                        for file, norm_value in zip(files, norm_values)
+                        if norm_value]
+        self.num_values += len(csv_rows)
+        for field, count in Counter(compress(fields, norm_values)).items():
+            self.value_counter[field] += count
+        return csv_rows
 
     def load_data(self,
                   source: str,
                   query: str = None,
                   as_user: str = None,
-                  as_pass: str = None):
+                  as_pass: str = None,
+                  start=None):
         """
         load the data into a data generator
 
         params:
             - source: data source
             - annotation server parameters: query, as_user, as_pass
+            - start: the position of the last loaded document, see
+              DataLoader
 
         output:
             - yeild xml
         """
-
+        self._check_manifest_source(source)
         if isdir(source):
             LOGGER.info("reading xml documents in dir %s", source)
-            data = DataLoader.load_from_dir(source)
+            data = DataLoader.load_from_dir(source, self.recursive,
+                                            self.sort_files, self.prefetch,
+                                            start, self._open_manifest(),
+                                            self.doc_filter)
         elif isfile(source):
             LOGGER.info("reading mxml document %s", source)
-            data = DataLoader.load_from_mxml(source)
+            data = DataLoader.load_from_mxml(source, self.use_index, start,
+                                             self.doc_filter)
         elif ":" in source:
             host, port = source.split(':')
             LOGGER.info("connecting annotation server: host %s and port %s",
@@ -125,7 +628,10 @@ class XMLMiner(CommonMiner):
                 port,
                 query,
                 as_user,
-                as_pass
+                as_pass,
+                self.as_workers,
+                start,
+                self.doc_filter
                 )
         else:
             raise TypeError("could not determine source type, please check")
@@ -162,19 +668,110 @@ class XMLMiner(CommonMiner):
         """
 
         data = self.load_data(source, query, as_user, as_pass)
-        for doc in data.data_generator:
-            try:
-                xml_obj = TKXML.from_string(doc)
-                selected = self.selectors.select_xml_fields(xml_obj)
-            except ET.ParseError:
-                LOGGER.warning("Can not parse, skip file:\n%s", doc)
-                continue
-            except AttributeError:
-                LOGGER.warning("Failed to select, skip file:\n%s", doc)
-                continue
-
-            self.num_docs += 1
-            yield {'file': xml_obj.filename, 'values': selected}
+        yield from self._mine_loaded(data)
+
+    def select_doc(self, doc):
+        """
+        parse one xml and apply the selectors on it
+
+        params:
+            - doc: xml string or bytes
+
+        output:
+            - MinedDoc of the filename and selected values, None if the
+              document is skipped
+        """
+        try:
+            if self.engine == MINING_ENGINE['ITERPARSE']:
+                with self._timed(STAGE['SELECT']):
+                    filename, selected = \
+                        self.selectors.iterselect_xml_values(doc)
+            else:
+                with self._timed(STAGE['PARSE']):
+                    xml_obj = TKXML.from_string(doc, self.backend,
+                                                self.recover)
+                self._call_hooks(HOOK['DOC_PARSED'], doc, xml_obj)
+                with self._timed(STAGE['SELECT']):
+                    filename = xml_obj.filename
+                    selected = self.selectors.select_xml_values(xml_obj)
+        except PARSE_ERRORS:
+            LOGGER.warning("Can not parse, skip file:\n%s",
+                           self._doc_text(doc))
+            return None
+        except AttributeError:
+            LOGGER.warning("Failed to select, skip file:\n%s",
+                           self._doc_text(doc))
+            return None
+        return self._record(filename, selected)
+
+    async def amine(self,
+                    source: str,
+                    query: str = '',
+                    as_user: str = '',
+                    as_pass: str = '',
+                    concurrency: int = 4):
+        """
+        asynchronous version of mine: the documents of the annotation server
+        are fetched with asyncio streams, and parsed in the default executor
+        of the event loop, so fetching and parsing overlap without blocking
+        the loop
+
+        params:
+            - source: data source
+            - annotation server parameters: query, as_user, as_pass
+            - concurrency: maximum number of connections to the annotation
+              server
+
+        output:
+            - async generator of the selected fields per doc
+
+        the incremental manifest and the result cache are not supported:
+        their sqlite connection can not be used from the executor threads
+        reading the documents. On the annotation server, the sample and the
+        limit are applied to the ids before fetching the documents, the
+        filename filter is not supported
+        """
+        if self.manifest is not None:
+            raise ValueError("amine does not support the incremental "
+                             "manifest, use mine or mine_and_save")
+        if self.cache is not None:
+            raise ValueError("amine does not support the result cache, use "
+                             "mine or mine_and_save")
+        loop = asyncio.get_event_loop()
+        if not isdir(source) and not isfile(source) and ":" in source:
+            host, port = source.split(':')
+            LOGGER.info("connecting annotation server: host %s and port %s",
+                        host, port)
+            ids_filter, docs_filter = self.doc_filter.split_ids()
+            if not docs_filter.selects_all:
+                raise ValueError("amine does not filter the documents of the "
+                                 "annotation server by filename, use mine or "
+                                 "mine_and_save")
+            client = AsyncASClient(host, port, as_user, as_pass, concurrency)
+            docs = client.get_docs(query, ids_filter)
+        else:
+            data = self.load_data(source)
+            docs = self._aiter_data(loop, data.data_generator)
+
+        try:
+            async for doc in docs:
+                selected = await loop.run_in_executor(None, self.select_doc,
+                                                      doc)
+                if selected is not None:
+                    self.num_docs += 1
+                    yield selected
+        finally:
+            await docs.aclose()
+
+    @staticmethod
+    async def _aiter_data(loop, data_generator):
+        """read the documents of a local source in the default executor"""
+        end = object()
+        while True:
+            doc = await loop.run_in_executor(None, next, data_generator, end)
+            if doc is end:
+                break
+            yield doc
 
     def mine_and_save(self,
                       source: str,
@@ -195,19 +792,9 @@ class XMLMiner(CommonMiner):
             - no field name: filename value
             - with field name: filename, value, field_name
         """
-        writer = DataSaver(output_file)
-        self._init_counter()
-        self._print_header(writer)
-        for selected in self.mine(source, query, as_user, as_pass):
-            for field, values in selected['values'].items():
-                for value in values:
-                    self._print_record(writer,
-                                       selected['file'],
-                                       value,
-                                       field)
-
-        self._print_summary()
-        writer.close_stream()
+        self._save_mined(source, output_file,
+                         lambda start: self.load_data(source, query, as_user,
+                                                      as_pass, start))
 
 
 class TRXMLMiner(CommonMiner):
@@ -217,15 +804,16 @@ class TRXMLMiner(CommonMiner):
     - output selected values to a file, and print summary
     '''
 
-    def __init__(self, selectors, itemgroup=None, fields=None):
+    def __init__(self, selectors, itemgroup=None, fields=None, **kwargs):
         '''
         params:
             selectors (string): input selectors
             itemgroup (string): input ItemGroup
             fields (string): input fields
+            kwargs: mining options, see CommonMiner
         '''
         selector_obj = self.read_selectors(selectors, itemgroup, fields)
-        super().__init__(selector_obj)
+        super().__init__(selector_obj, **kwargs)
 
     def _print_header(self, writer) -> List[str]:
         if self.selectors.trxml_selector_type == \
@@ -238,32 +826,62 @@ class TRXMLMiner(CommonMiner):
             header = ["filename"] + field_names
         writer.store(header)
 
-    def _normalize_record_values(self, values) -> List[str]:
-        norm_values = []
-        for field_name in values:
-            norm_value = self.normalize_string(values[field_name])
-            norm_values.append(norm_value)
-            if norm_value:
-                self.num_values += 1
-                self.value_counter[field_name] += 1
-        return norm_values
+    def _record_class(self):
+        if self.selectors.trxml_selector_type == \
+                TRXML_SELECTOR_TYPE['MULTIPLE']:
+            return MinedItems
+        return MinedDoc
 
-    def load_data(self, source):
+    def _batch_records(self, batch: List[MinedDoc]) -> List[List[str]]:
+        '''
+        the output rows of the documents, one per document, or one per item
+        of the itemgroup with multiple selectors. The values of all rows are
+        normalized at once, and the counters are updated once per batch.
+        '''
+        if self.selectors.trxml_selector_type \
+                == TRXML_SELECTOR_TYPE['MULTIPLE']:
+            prefixes = [[selected.file, item_index] for selected in batch
+                        for item_index, _ in selected.values]
+            values = [item_values for selected in batch
+                      for _, item_values in selected.values]
+        else:
+            prefixes = [[selected.file] for selected in batch]
+            values = [selected.values for selected in batch]
+        norm_values = self.normalize_strings(list(chain.from_iterable(values)))
+
+        num_fields = len(self.selectors.fields)
+        for position, field in enumerate(self.selectors.fields):
+            count = sum(map(bool, norm_values[position::num_fields]))
+            self.num_values += count
+            self.value_counter[field] += count
+        return [prefix + norm_values[start:start + num_fields]
+                for prefix, start in zip(prefixes,
+                                         range(0, len(norm_values),
+                                               num_fields))]
+
+    def load_data(self, source, start=None):
         """
         load the data into a data generator
 
         params:
             - source: data source
+            - start: the position of the last loaded document, see
+              DataLoader
 
         output:
             - yeild trxml
         """
+        self._check_manifest_source(source)
         if isdir(source):
             LOGGER.info("reading trxml documents from dir %s", source)
-            data = DataLoader.load_from_dir(source)
+            data = DataLoader.load_from_dir(source, self.recursive,
+                                            self.sort_files, self.prefetch,
+                                            start, self._open_manifest(),
+                                            self.doc_filter)
         elif isfile(source):
             LOGGER.info("reading mtrxml document %s", source)
-            data = DataLoader.load_from_mtrxml(source)
+            data = DataLoader.load_from_mtrxml(source, self.use_index, start,
+                                               self.doc_filter)
         else:
             raise TypeError("could not determine source type, please check")
         return data
@@ -307,19 +925,41 @@ class TRXMLMiner(CommonMiner):
         """
 
         data = self.load_data(source)
-        for doc in data.data_generator:
-            try:
-                trxml_obj = TKTRXML.from_string(doc)
-                selected = self.selectors.select_trxml_fields(trxml_obj)
-            except ET.ParseError:
-                LOGGER.warning("Can not parse trxml, skip file:\n%s", doc)
-                continue
-            except AttributeError:
-                LOGGER.warning("Failed to select, skip file:\n%s", doc)
-                continue
-
-            self.num_docs += 1
-            yield {'file': trxml_obj.filename, 'values': selected}
+        yield from self._mine_loaded(data)
+
+    def select_doc(self, doc):
+        """
+        parse one trxml and apply the selectors on it
+
+        params:
+            - doc: trxml string or bytes
+
+        output:
+            - MinedDoc of the filename and selected values, None if the
+              document is skipped
+        """
+        try:
+            if self.engine == MINING_ENGINE['ITERPARSE']:
+                with self._timed(STAGE['SELECT']):
+                    filename, selected = \
+                        self.selectors.iterselect_trxml_values(doc)
+            else:
+                with self._timed(STAGE['PARSE']):
+                    trxml_obj = TKTRXML.from_string(doc, self.backend,
+                                                    self.recover)
+                self._call_hooks(HOOK['DOC_PARSED'], doc, trxml_obj)
+                with self._timed(STAGE['SELECT']):
+                    filename = trxml_obj.filename
+                    selected = self.selectors.select_trxml_values(trxml_obj)
+        except PARSE_ERRORS:
+            LOGGER.warning("Can not parse trxml, skip file:\n%s",
+                           self._doc_text(doc))
+            return None
+        except AttributeError:
+            LOGGER.warning("Failed to select, skip file:\n%s",
+                           self._doc_text(doc))
+            return None
+        return self._record(filename, selected)
 
     def mine_and_save(self, source: str, output_file: str):
         """
@@ -330,25 +970,5 @@ class TRXMLMiner(CommonMiner):
             source (string): data source
             output_file (string): the output filename
         """
-        self._init_counter()
-        writer = DataSaver(output_file)
-        self._print_header(writer)
-
-        for selected_values in self.mine(source):
-
-            if self.selectors.trxml_selector_type \
-                    == TRXML_SELECTOR_TYPE['MULTIPLE']:
-                for item_index in selected_values['values']:
-                    norm_values = self._normalize_record_values(
-                        selected_values['values'][item_index])
-                    writer.store(
-                                 [selected_values['file'], item_index]
-                                 + norm_values
-                                )
-            else:
-                norm_values = self._normalize_record_values(
-                        selected_values['values'])
-                writer.store([selected_values['file']] + norm_values)
-
-        self._print_summary()
-        writer.close_stream()
+        self._save_mined(source, output_file,
+                         lambda start: self.load_data(source, start))
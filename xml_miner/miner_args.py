@@ -0,0 +1,214 @@
+'''mining arguments shared by the mine-xml and mine-trxml scripts'''
+from .miner import MINING_ENGINE
+from .data_utils import DataSaver
+from .checkpoint import Checkpoint
+from .result_cache import ResultCache
+from .stats import MiningStats
+from .profiling import PROFILER, Profiler
+from .xml.backend import XML_BACKEND
+
+
+def add_mining_args(parser, doc_type: str):
+    '''
+    add the mining options of CommonMiner to the argument parser
+
+    params:
+        - parser: ArgumentParser object
+        - doc_type: 'xml' or 'trxml', used in the help messages
+    '''
+    mining_args = parser.add_argument_group('mining_args',
+                                            'arguments to tune the mining')
+
+    mining_args.add_argument('--use_index',
+                             help=f'''read the m{doc_type} file through a
+                             byte offset index, persisted next to the file for
+                             the next runs''',
+                             action='store_true')
+
+    mining_args.add_argument('--workers',
+                             help=f'''number of processes to parse the
+                             {doc_type} documents and select values''',
+                             type=int, default=1)
+
+    mining_args.add_argument('--batch_size',
+                             help='''number of documents sent to a worker
+                             process at once''',
+                             type=int, default=64)
+
+    mining_args.add_argument('--unordered',
+                             help='''with workers, output the documents as
+                             soon as they are mined instead of in the input
+                             order''',
+                             action='store_true')
+
+    mining_args.add_argument('--engine',
+                             help='''tree: parse the whole document before
+                             selecting values, iterparse: select values while
+                             parsing, without keeping the whole tree''',
+                             choices=list(MINING_ENGINE.values()),
+                             default=MINING_ENGINE['TREE'])
+
+    mining_args.add_argument('--backend',
+                             help='''xml parser of the tree engine, auto
+                             uses etree, or lxml with --recover''',
+                             choices=list(XML_BACKEND.values()),
+                             default=XML_BACKEND['AUTO'])
+
+    mining_args.add_argument('--recover',
+                             help='''with lxml, parse as much as possible of
+                             broken documents instead of skipping them, needs
+                             the lxml package and the tree engine''',
+                             action='store_true')
+
+    mining_args.add_argument('--recursive',
+                             help=f'''also read the {doc_type} files in the
+                             sub directories of the source dir''',
+                             action='store_true')
+
+    mining_args.add_argument('--unsorted',
+                             help='''read the files of the source dir in the
+                             order of the file system instead of sorted by
+                             name''',
+                             action='store_true')
+
+    mining_args.add_argument('--prefetch',
+                             help='''number of threads reading the files of
+                             the source dir ahead''',
+                             type=int, default=0)
+
+    mining_args.add_argument('--output_buffer_size',
+                             help='''size in bytes of the write buffer of the
+                             output file, the output is compressed when its
+                             name ends with .gz, .bz2, .xz or .zst''',
+                             type=int, default=DataSaver.WRITE_BUFFER_SIZE)
+
+    mining_args.add_argument('--row_group_size',
+                             help='''number of rows per record batch of a
+                             .parquet or .arrow output file, the rows of a
+                             batch are kept in memory until it is written''',
+                             type=int, default=DataSaver.ROW_GROUP_SIZE)
+
+    mining_args.add_argument('--checkpoint_interval',
+                             help='''seconds between two checkpoints of the
+                             mining progress, saved next to the output file,
+                             0 to disable the checkpoints''',
+                             type=float, default=Checkpoint.INTERVAL)
+
+    mining_args.add_argument('--resume',
+                             help='''continue an interrupted run from its
+                             checkpoint: skip the mined documents and append
+                             to the output file''',
+                             action='store_true')
+
+    mining_args.add_argument('--manifest',
+                             help=f'''incremental mode: sqlite file keeping
+                             the results of the {doc_type} files of the source
+                             dir, only the new and changed files are parsed by
+                             the next runs''',
+                             type=str, default=None)
+
+    mining_args.add_argument('--cache',
+                             help=f'''sqlite file caching the selected values
+                             of each {doc_type} document, by document content
+                             and selectors, shared by all runs''',
+                             type=str, default=None)
+
+    mining_args.add_argument('--cache_size',
+                             help='''maximum size in MB of the cached values,
+                             the least recently used values are removed
+                             first''',
+                             type=int,
+                             default=ResultCache.MAX_SIZE // (1024 * 1024))
+
+    mining_args.add_argument('--stats',
+                             help='''time the load, parse, select, normalize
+                             and write stages, log the progress of the run and
+                             the time of each stage in the summary''',
+                             action='store_true')
+
+    mining_args.add_argument('--progress_interval',
+                             help='''with --stats, seconds between two
+                             progress lines, 0 to not log the progress''',
+                             type=float, default=MiningStats.PROGRESS_INTERVAL)
+
+    mining_args.add_argument('--profile',
+                             help='''profile the run with cProfile (time per
+                             function) or tracemalloc (memory allocated per
+                             line), save the profile and log the top
+                             entries''',
+                             choices=PROFILER.values(), default=None)
+
+    mining_args.add_argument('--profile_file',
+                             help='''file of the profile, by default the
+                             output file with a .prof or .tracemalloc
+                             suffix''',
+                             type=str, default=None)
+
+    mining_args.add_argument('--profile_top',
+                             help='''number of functions or lines in the
+                             profile report''',
+                             type=int, default=Profiler.TOP)
+
+    filter_args = parser.add_argument_group(
+        'filter_args', 'arguments to select the documents before parsing')
+
+    filter_args.add_argument('--filter_filename',
+                             help=f'''only parse the {doc_type} documents
+                             whose filename matches the regular expression,
+                             the file path for a dir''',
+                             type=str, default=None)
+
+    filter_args.add_argument('--sample',
+                             help='''only parse a random sample of the
+                             documents, e.g. 0.01 for 1%% of them''',
+                             type=float, default=None)
+
+    filter_args.add_argument('--sample_size',
+                             help='''only parse a random sample of this
+                             number of documents, chosen by reservoir sampling
+                             from a source of unknown size''',
+                             type=int, default=None)
+
+    filter_args.add_argument('--seed',
+                             help='''seed of the random sample, to sample the
+                             same documents again, needed to resume a sampled
+                             run''',
+                             type=int, default=None)
+
+    filter_args.add_argument('--limit',
+                             help='''only parse the first documents, up to
+                             this number''',
+                             type=int, default=None)
+
+
+def mining_options(args) -> dict:
+    '''the CommonMiner keyword arguments from the parsed arguments'''
+    return {
+        'use_index': args.use_index,
+        'workers': args.workers,
+        'batch_size': args.batch_size,
+        'ordered': not args.unordered,
+        'engine': args.engine,
+        'backend': args.backend,
+        'recover': args.recover,
+        'recursive': args.recursive,
+        'sort_files': not args.unsorted,
+        'prefetch': args.prefetch,
+        'output_buffer_size': args.output_buffer_size,
+        'row_group_size': args.row_group_size,
+        'checkpoint_interval': args.checkpoint_interval,
+        'resume': args.resume,
+        'manifest': args.manifest,
+        'cache': args.cache,
+        'cache_size': args.cache_size * 1024 * 1024,
+        'collect_stats': args.stats,
+        'progress_interval': args.progress_interval,
+        'profile': args.profile,
+        'profile_file': args.profile_file,
+        'profile_top': args.profile_top,
+        'filter_filename': args.filter_filename,
+        'sample': args.sample,
+        'sample_size': args.sample_size,
+        'seed': args.seed,
+        'limit': args.limit,
+    }
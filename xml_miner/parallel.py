@@ -0,0 +1,65 @@
+"""parse and select documents in a pool of worker processes"""
+from typing import Iterator, Iterable, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+import pickle
+from .executor_utils import bounded_submit
+
+# the miner of the worker process, unpickled from its first batch
+_WORKER_MINER = None
+
+
+def _select_batch(pickled_miner: bytes, docs: List[str]) -> List[dict]:
+    '''
+    parse and select a batch of documents in the worker process, the miner
+    is sent with each batch and only unpickled once per worker
+    '''
+    global _WORKER_MINER
+    if _WORKER_MINER is None:
+        _WORKER_MINER = pickle.loads(pickled_miner)
+    return [_WORKER_MINER.select_doc(doc) for doc in docs]
+
+
+def batches(docs: Iterable, batch_size: int) -> Iterator[list]:
+    '''
+    split the documents into lists of batch_size documents, the memoryviews
+    of the document index are copied to bytes to be sent to the workers
+    '''
+    docs = (bytes(doc) if isinstance(doc, memoryview) else doc
+            for doc in docs)
+    batch = list(islice(docs, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(docs, batch_size))
+
+
+def parallel_select(miner,
+                    docs: Iterable,
+                    workers: int,
+                    batch_size: int = 64,
+                    ordered: bool = True) -> Iterator[dict]:
+    """
+    apply miner.select_doc on all documents in a process pool
+
+    at most 2 batches per worker are in flight, so the memory usage does not
+    depend on the number of documents
+
+    params:
+        - miner: the CommonMiner object, copied to each worker
+        - docs: iterable of xml strings
+        - workers: number of worker processes
+        - batch_size: number of documents sent to a worker at once
+        - ordered: keep the input order, otherwise yield the batches as soon
+          as they are done
+
+    output:
+        - the select_doc result per document, None for skipped documents
+    """
+    # pickled once, the pool initializer needs python 3.7
+    select_batch = partial(_select_batch, pickle.dumps(miner))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _, future in bounded_submit(executor, select_batch,
+                                        batches(docs, batch_size),
+                                        2 * workers, ordered):
+            yield from future.result()
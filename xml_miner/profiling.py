@@ -0,0 +1,87 @@
+"""profile a mining run with cProfile or tracemalloc"""
+import cProfile
+import io
+import pstats
+import tracemalloc
+from . import LOGGER
+
+PROFILER = {'CPROFILE': 'cprofile', 'TRACEMALLOC': 'tracemalloc'}
+PROFILE_SUFFIX = {'cprofile': '.prof', 'tracemalloc': '.tracemalloc'}
+
+
+class Profiler:
+    '''
+    Profiler:
+    - profile the code run between start and stop, with cProfile for the
+      time of each function, or tracemalloc for the memory allocated by each
+      line
+    - save the profile to a file, readable with pstats or
+      tracemalloc.Snapshot.load, and log the top entries
+
+    only the main process is profiled, not the worker processes
+    '''
+
+    TOP = 20
+    # frames kept per tracemalloc allocation
+    TRACEMALLOC_FRAMES = 10
+
+    def __init__(self, kind: str, profile_file: str, top: int = TOP):
+        '''
+        params:
+            kind (str): 'cprofile' or 'tracemalloc', see PROFILER
+            profile_file (str): the file to save the profile to
+            top (int): number of functions or lines of the report
+        '''
+        if kind not in PROFILER.values():
+            raise ValueError(f"profiler '{kind}' unknown")
+        self.kind = kind
+        self.profile_file = profile_file
+        self.top = top
+        self._profile = None
+
+    @staticmethod
+    def profile_filename(kind: str, output_file: str) -> str:
+        '''the default profile filename of an output file'''
+        if output_file == 'STDOUT':
+            output_file = 'xml_miner'
+        return output_file + PROFILE_SUFFIX[kind]
+
+    def start(self):
+        '''start profiling'''
+        if self.kind == PROFILER['CPROFILE']:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start(self.TRACEMALLOC_FRAMES)
+
+    def stop(self):
+        '''stop profiling, save the profile and log the report'''
+        if self.kind == PROFILER['CPROFILE']:
+            self._profile.disable()
+            self._profile.dump_stats(self.profile_file)
+            report = io.StringIO()
+            pstats.Stats(self._profile, stream=report) \
+                .sort_stats('tottime').print_stats(self.top)
+            LOGGER.info("top %d functions by own time, profile saved to "
+                        "%s:\n%s", self.top, self.profile_file,
+                        report.getvalue())
+            self._profile = None
+            return
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot.dump(self.profile_file)
+        lines = [str(stat)
+                 for stat in snapshot.statistics('lineno')[:self.top]]
+        LOGGER.info("traced memory: %.1f MB at the end, %.1f MB at the peak",
+                    current / 2 ** 20, peak / 2 ** 20)
+        LOGGER.info("top %d lines by allocated memory, snapshot saved to "
+                    "%s:\n%s", self.top, self.profile_file, "\n".join(lines))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
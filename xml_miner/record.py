@@ -0,0 +1,84 @@
+"""the values selected from one document"""
+from typing import List
+
+
+class MinedDoc:
+    '''
+    MinedDoc:
+    - the filename and the selected values of one document, the values are
+      in the order of the fields of the selectors, see
+      XMLSelectors.select_xml_values and TRXMLSelectors.select_trxml_values
+    - the fields list is shared by all documents of a miner
+    - compatible with the former dict result: selected['file'],
+      selected['values'], and as_dict
+    '''
+    __slots__ = ('file', 'values', 'fields')
+
+    def __init__(self, file: str, values: list, fields: List[str]):
+        '''
+        params:
+            file (str): the filename of the document
+            values (list): the selected values, one entry per field
+            fields (list): the field names
+        '''
+        self.file = file
+        self.values = values
+        self.fields = fields
+
+    def values_dict(self) -> dict:
+        '''the selected values as a dict by field'''
+        return dict(zip(self.fields, self.values))
+
+    def as_dict(self) -> dict:
+        '''the former dict result: {'file': ..., 'values': {field: ...}}'''
+        return {'file': self.file, 'values': self.values_dict()}
+
+    def dump(self) -> list:
+        '''the json serializable content, without the fields'''
+        return [self.file, self.values]
+
+    @classmethod
+    def load(cls, dumped: list, fields: List[str]):
+        '''the record of a dump'''
+        return cls(dumped[0], dumped[1], fields)
+
+    def __getitem__(self, key: str):
+        if key == 'file':
+            return self.file
+        if key == 'values':
+            return self.values_dict()
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        if isinstance(other, MinedDoc):
+            return type(self) is type(other) and self.file == other.file \
+                and self.values == other.values \
+                and self.fields == other.fields
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.file!r}, {self.values!r})"
+
+
+class MinedItems(MinedDoc):
+    '''
+    MinedItems:
+    - MinedDoc of multiple item selectors: the values are (item index,
+      values of the fields) per item
+    '''
+    __slots__ = ()
+
+    def values_dict(self) -> dict:
+        '''the selected values as a dict of the fields by item index'''
+        return {index: dict(zip(self.fields, values))
+                for index, values in self.values}
+
+    @classmethod
+    def load(cls, dumped: list, fields: List[str]):
+        '''the record of a dump, json turns the items into lists'''
+        return cls(dumped[0], [(index, values) for index, values in dumped[1]],
+                   fields)
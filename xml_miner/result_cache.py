@@ -0,0 +1,168 @@
+"""cache the select_doc results of documents on disk, across runs"""
+from typing import Iterable, Iterator, Optional, Tuple
+import hashlib
+import json
+import sqlite3
+import time
+from .data_utils.incremental import CachedSelection
+from . import LOGGER
+
+
+class ResultCache:
+    '''
+    ResultCache:
+    - sqlite file of select_doc results, keyed by the hash of the document
+      content and the selector fingerprint, shared by all selector sets
+    - bounded by the size of the stored results: the least recently used
+      results are evicted first
+    - counts the hits and misses of a run
+    - shared by the concurrent runs over the same corpus: the sqlite file is
+      in WAL mode, the writes are committed every COMMIT_INTERVAL seconds to
+      not hold the write lock, and a locked cache counts as a miss
+    '''
+
+    MAX_SIZE = 1024 * 1024 * 1024
+    # seconds between two commits of the stored results
+    COMMIT_INTERVAL = 1.0
+    # share of max_size kept after an eviction, to not evict at each insert
+    EVICTION_RATIO = 0.9
+
+    def __init__(self, cache_file: str, fingerprint: str,
+                 max_size: int = MAX_SIZE):
+        '''
+        params:
+            cache_file (str): the sqlite file, created if needed
+            fingerprint (str): the selectors of the run
+            max_size (int): maximum size in bytes of the stored results
+        '''
+        self.cache_file = cache_file
+        self.fingerprint = fingerprint
+        self.max_size = max_size
+        self.connection = sqlite3.connect(cache_file)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            '''CREATE TABLE IF NOT EXISTS results (
+                   digest TEXT NOT NULL,
+                   fingerprint TEXT NOT NULL,
+                   selected TEXT,
+                   size INTEGER NOT NULL,
+                   used REAL NOT NULL,
+                   PRIMARY KEY (digest, fingerprint))''')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        self.total_size = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+        self._last_commit = time.monotonic()
+
+    @staticmethod
+    def digest(doc) -> str:
+        '''the hash of the document content'''
+        if isinstance(doc, str):
+            doc = doc.encode('utf-8')
+        return hashlib.sha1(doc).hexdigest()
+
+    def positioned_docs(self, positioned_docs: Iterable[Tuple[object, object]]
+                        ) -> Iterator[Tuple[object, object]]:
+        """
+        replace the documents found in the cache by their result
+
+        params:
+            positioned_docs: (position, document) pairs
+
+        output:
+            (position, document or CachedSelection) pairs
+        """
+        for position, doc in positioned_docs:
+            if isinstance(doc, CachedSelection):
+                yield position, doc
+                continue
+            digest = self.digest(doc)
+            try:
+                row = self.connection.execute(
+                    'SELECT selected FROM results '
+                    'WHERE digest = ? AND fingerprint = ?',
+                    (digest, self.fingerprint)).fetchone()
+            except sqlite3.OperationalError as error:
+                LOGGER.debug("cache lookup failed: %s", error)
+                row = None
+            if row is None:
+                self.misses += 1
+                self._pending[position] = digest
+                yield position, doc
+                continue
+            self.hits += 1
+            self._write('UPDATE results SET used = ? '
+                        'WHERE digest = ? AND fingerprint = ?',
+                        (time.time(), digest, self.fingerprint))
+            yield position, CachedSelection(
+                None if row[0] is None else json.loads(row[0]))
+
+    def store(self, position, selected: Optional[list]):
+        '''
+        save the dumped select_doc result of a document missing in the cache
+        '''
+        digest = self._pending.pop(position, None)
+        if digest is None:
+            return
+        selected = None if selected is None else json.dumps(selected)
+        size = len(digest) + (len(selected) if selected is not None else 0)
+        # the same document may be missing twice before it is stored
+        cursor = self._write('INSERT OR IGNORE INTO results '
+                             '(digest, fingerprint, selected, size, used) '
+                             'VALUES (?, ?, ?, ?, ?)',
+                             (digest, self.fingerprint, selected, size,
+                              time.time()))
+        if cursor is not None and cursor.rowcount > 0:
+            self.total_size += size
+        if self.total_size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        '''remove the least recently used results'''
+        target = self.max_size * self.EVICTION_RATIO
+        try:
+            rows = self.connection.execute(
+                'SELECT rowid, size FROM results ORDER BY used').fetchall()
+            evicted = []
+            total_size = self.total_size
+            for rowid, size in rows:
+                if total_size <= target:
+                    break
+                evicted.append((rowid,))
+                total_size -= size
+            self.connection.executemany(
+                'DELETE FROM results WHERE rowid = ?', evicted)
+            self._commit()
+        except sqlite3.OperationalError as error:
+            LOGGER.debug("cache eviction failed: %s", error)
+            return
+        self.total_size = total_size
+
+    def _write(self, statement, parameters) -> Optional[sqlite3.Cursor]:
+        '''
+        execute a write, committed once COMMIT_INTERVAL seconds passed since
+        the last commit; None if the cache is locked by another run
+        '''
+        try:
+            cursor = self.connection.execute(statement, parameters)
+            if time.monotonic() - self._last_commit >= self.COMMIT_INTERVAL:
+                self._commit()
+        except sqlite3.OperationalError as error:
+            LOGGER.debug("cache write failed: %s", error)
+            return None
+        return cursor
+
+    def _commit(self):
+        self.connection.commit()
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        '''save the stored results and close the cache'''
+        try:
+            self.connection.commit()
+        except sqlite3.OperationalError as error:
+            LOGGER.warning("failed to save the cached results: %s", error)
+        self.connection.close()
@@ -88,6 +88,15 @@ class TRXMLSelector(XMLSelector):
             value = ''
         return value
 
+    def select_value_from_index(self, trxml) -> str:
+        '''
+        get the value of the field where the selector matches, from the
+        field index of the trxml document
+        '''
+        value = trxml.field_values.get(
+            (self.itemgroup_name, self.item_index, self.field_name))
+        return value or ''
+
     def field_value_from_item(self, item) -> str:
         '''
         given an item and a field_name, get the value of that field
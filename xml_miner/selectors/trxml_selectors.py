@@ -1,5 +1,6 @@
 """TRXML Selectors class"""
 from typing import List
+from ..xml.base_xml import iterparse_string
 from .selector_utils import valid_field_name, selector_attribute
 from .selector_utils import SELECTOR_TYPE, TRXML_SELECTOR_TYPE
 from .trxml_selector import TRXMLSelector
@@ -21,6 +22,11 @@ class TRXMLSelectors():
             for selector_string in selectors
         ]
         self.multiple_selector = len(selectors) > 1
+        # the selector texts, in the order of the selected values
+        self.fields = [selector.text for selector in self.selectors]
+        self._field_names = [selector.field_name
+                             for selector in self.selectors]
+        self._missing_values = [''] * len(self.selectors)
 
         self.selector_type = selector_attribute(
             self.selectors,
@@ -79,16 +85,28 @@ class TRXMLSelectors():
         )
 
     def select_trxml_fields(self, trxml):
-        '''select values from all fields matching selectors'''
+        '''select values from all fields matching selectors, as dicts'''
+        return self.values_dict(self.select_trxml_values(trxml))
+
+    def select_trxml_values(self, trxml):
+        """
+        select values from all fields matching selectors, in the order of
+        fields
+
+        output:
+            - singleton selectors: the value of each selector
+            - multiple item selectors: (item index, value of each selector)
+              per item
+        """
         if self.trxml_selector_type == TRXML_SELECTOR_TYPE['SINGLETON']:
             selected = self._select_singletons(trxml)
         else:
             selected = self._select_multiple_items(trxml)
         return selected
 
-    def _select_multiple_items(self, trxml):
-        '''
-        select values from multiple items:
+    def values_dict(self, values) -> dict:
+        """
+        the values of select_trxml_values as dicts:
 
         e.g. selectors are "skill.skill,skill.type", the output is a dictionary
         xx = {
@@ -96,51 +114,175 @@ class TRXMLSelectors():
             1:{skill:'leadership',type:'softskill'}
             2:.....
         }
+
+        e.g. selectors are "firstname.0.firstname,lastname.0.lastname",
+        the output is a dictionary
+        xx = {
+            firstname:'Chao',
+            lastname:'Li'}
+        }
+        """
+        if self.trxml_selector_type == TRXML_SELECTOR_TYPE['SINGLETON']:
+            return dict(zip(self.fields, values))
+        return {index: dict(zip(self.fields, item_values))
+                for index, item_values in values}
+
+    def _select_multiple_items(self, trxml):
+        '''
+        select values from multiple items: (item index, value of each
+        selector) per item of the shared itemgroup
         '''
         if self.trxml_selector_type != TRXML_SELECTOR_TYPE['MULTIPLE']:
             raise ValueError("selector for _select_multiple_items should \
             be multiple value selectors")
 
-        # get the itemgroup
-        itemgroup = trxml.working_entity.find(
-            f"ItemGroup[@key='{self.shared_itemgroup_name}']")
+        items = trxml.itemgroup_items.get(self.shared_itemgroup_name, [])
 
-        try:
-            items = itemgroup.findall("Item")
-        except AttributeError:
-            items = []
+        return self._item_values(items)
 
-        multiple_item_values = {}
-        # for each item, get field value and save to item[index][field]:value
-        for item in items:
-            index = item.get('index')
+    def _select_singletons(self, trxml):
+        '''select the value of each single item selector'''
+        if self.trxml_selector_type != TRXML_SELECTOR_TYPE['SINGLETON']:
+            raise ValueError("selectors for select singletons should be \
+            single value selectors")
+        return [selector.select_value_from_index(trxml)
+                for selector in self.selectors]
 
-            multiple_item_values[index] = {}
-            for selector in self.selectors:
-                field_value = selector.field_value_from_item(item)
-                multiple_item_values[index][selector.text] = field_value
+    def iterselect_trxml_fields(self, trxml_string):
+        '''
+        iterselect_trxml_values, with the values as dicts
 
-        return multiple_item_values
+        output:
+            filename, and the same dict as select_trxml_fields
+        '''
+        filename, values = self.iterselect_trxml_values(trxml_string)
+        return filename, self.values_dict(values)
 
-    def _select_singletons(self, trxml):
+    def iterselect_trxml_values(self, trxml_string):
         '''
-        select values from single item:
+        select values from all fields matching selectors while parsing the
+        trxml string, without building the whole tree.
 
-        e.g. selectors are "firstname.0.firstname,lastname.0.lastname",
-        the output is a dictionary
-        xx = {
-            firstname:'Chao',
-            lastname:'Li'}
-        }
+        The ItemGroup, Item and Field keys of the DocumentStructure are
+        tracked during the parsing, and all elements are released as soon as
+        they are parsed. Singleton selectors stop the parsing as soon as the
+        filename and the value of every selector are found, the rest of the
+        document is not read.
 
+        output:
+            filename, and the same values as select_trxml_values
         '''
-        if self.trxml_selector_type != TRXML_SELECTOR_TYPE['SINGLETON']:
-            raise ValueError("selectors for select singletons should be \
-            single value selectors")
-        return {
-            selector.text: selector.select_value_with_xpath(trxml)
-            for selector in self.selectors
-        }
+        if self.trxml_selector_type == TRXML_SELECTOR_TYPE['SINGLETON']:
+            found = {}
+            # number of values to find before stopping the parsing
+            num_fields = len(set(self.fields))
+            targets = {}
+            for selector in self.selectors:
+                targets.setdefault((selector.itemgroup_name,
+                                    selector.item_index,
+                                    selector.field_name), []).append(selector)
+        else:
+            found = []
+            num_fields = None
+            targets = {selector.field_name for selector in self.selectors}
+
+        filename = None
+        structure = None
+        itemgroup = None
+        item_fields = None
+        # the open elements, from the top level element downwards
+        parents = []
+        for event, element in iterparse_string(trxml_string):
+            depth = len(parents)
+            if event == 'start':
+                parents.append(element)
+                if depth == 1:
+                    if element.tag == 'Document' and filename is None:
+                        filename = element.get('filename', '__UNKNOWN__')
+                        if len(found) == num_fields:
+                            break
+                    elif element.tag == 'DocumentStructure' \
+                            and structure is None:
+                        structure = element
+                elif depth == 3 and parents[1] is structure \
+                        and element.tag == 'Item' \
+                        and parents[2].tag == 'ItemGroup':
+                    itemgroup = parents[2].get('key')
+                    item_fields = {}
+                continue
+
+            parents.pop()
+            depth -= 1
+            if depth == 5 and element.tag == 'Value' \
+                    and item_fields is not None \
+                    and parents[4].tag == 'Field':
+                item_fields.setdefault(parents[4].get('key'), element.text)
+            elif depth == 3 and item_fields is not None:
+                self._collect_item(found, targets, itemgroup,
+                                   element.get('index'), item_fields)
+                item_fields = None
+                if len(found) == num_fields and filename is not None:
+                    break
+            elif depth == 2 and parents[1] is structure \
+                    and self._is_shared_itemgroup(element):
+                # only the first itemgroup is selected for multiple items
+                targets = set()
+            if parents:
+                element.clear()
+                parents[-1].remove(element)
+
+        if structure is None:
+            raise AttributeError("no DocumentStructure found")
+        if filename is None:
+            filename = '__UNKNOWN__'
+        return filename, self._iterselected(found)
+
+    def _is_shared_itemgroup(self, element) -> bool:
+        '''check if the element is the itemgroup of multiple item selectors'''
+        return self.trxml_selector_type == TRXML_SELECTOR_TYPE['MULTIPLE'] \
+            and element.tag == 'ItemGroup' \
+            and element.get('key') == self.shared_itemgroup_name
+
+    def _collect_item(self, found, targets, itemgroup, index, item_fields):
+        '''keep the values of a parsed item which match the selectors'''
+        if self.trxml_selector_type == TRXML_SELECTOR_TYPE['SINGLETON']:
+            for field_name, value in item_fields.items():
+                for selector in targets.get((itemgroup, index, field_name),
+                                            []):
+                    found.setdefault(selector.text, value)
+        elif targets and itemgroup == self.shared_itemgroup_name:
+            found.append((index, item_fields))
+
+    def _iterselected(self, found):
+        '''convert the collected values to the output of select_trxml_values'''
+        if self.trxml_selector_type == TRXML_SELECTOR_TYPE['SINGLETON']:
+            return [found.get(selector.text) or ''
+                    for selector in self.selectors]
+
+        return self._item_values(found)
+
+    def _item_values(self, items):
+        '''
+        the values of the selected fields of each (item index, fields dict)
+        item, in document order. An item index repeated in the itemgroup
+        keeps its first position and its last values, as the former dict by
+        item index.
+        '''
+        field_names = self._field_names
+        missing_values = self._missing_values
+        items = [(index, list(map(fields.get, field_names, missing_values)))
+                 for index, fields in items]
+        if len({index for index, _ in items}) == len(items):
+            return items
+        positions = {}
+        unique = []
+        for index, values in items:
+            if index in positions:
+                unique[positions[index]] = (index, values)
+            else:
+                positions[index] = len(unique)
+                unique.append((index, values))
+        return unique
 
     def __iter__(self):
         for selector in self.selectors:
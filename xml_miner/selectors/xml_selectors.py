@@ -1,5 +1,6 @@
 """XML Selectors class"""
 from typing import List
+from ..xml.base_xml import iterparse_string
 from .selector_utils import selector_attribute, SELECTOR_TYPE
 from .xml_selector import XMLSelector
 
@@ -11,6 +12,9 @@ class XMLSelectors():
     - method to select values from xml object
     '''
 
+    # from this number of distinct tags, all selectors share one tree walk
+    SINGLE_WALK_MIN_TAGS = 4
+
     def __init__(self, selectors: List[str]):
         self.selector_string = ",".join(selectors)
         self.selectors = [
@@ -18,6 +22,11 @@ class XMLSelectors():
             for selector_string in selectors
         ]
         self.multiple_selector = len(selectors) > 1
+        # the distinct selector texts, in the order of the selected values
+        self.fields = list(dict.fromkeys(
+            selector.text for selector in self.selectors))
+        self._field_selectors = list(
+            {selector.text: selector for selector in self.selectors}.values())
 
         self.selector_type = selector_attribute(self.selectors,
                                                 'selector_type')
@@ -32,11 +41,78 @@ class XMLSelectors():
         return cls(selectors)
 
     def select_xml_fields(self, xml_tree):
-        '''select all values matches the selector'''
-        return {
-            selector.text: selector.select_all_values(xml_tree)
-            for selector in self.selectors
-        }
+        '''select all values matches the selector, as a dict by field'''
+        return self.values_dict(self.select_xml_values(xml_tree))
+
+    def select_xml_values(self, xml_tree) -> List[List[str]]:
+        '''
+        select all values matches the selector, as a list of values per
+        field, in the order of fields
+
+        with few selectors, each selector iterates over its own tag, which is
+        done by the parser library. With more selectors, the tree is walked
+        once and each element is dispatched to the results of its tag.
+        '''
+        if len(self.fields) < self.SINGLE_WALK_MIN_TAGS:
+            return [selector.select_all_values(xml_tree)
+                    for selector in self._field_selectors]
+
+        selected = {field: [] for field in self.fields}
+        for element in xml_tree.working_entity.iter():
+            values = selected.get(element.tag)
+            if values is not None:
+                values.append("".join(element.itertext()))
+        return list(selected.values())
+
+    def values_dict(self, values: List[List[str]]) -> dict:
+        '''the values per field of select_xml_values, as a dict by field'''
+        return dict(zip(self.fields, values))
+
+    def iterselect_xml_fields(self, xml_string):
+        '''
+        iterselect_xml_values, with the values as a dict by field
+
+        output:
+            filename, and the same dict as select_xml_fields
+        '''
+        filename, values = self.iterselect_xml_values(xml_string)
+        return filename, self.values_dict(values)
+
+    def iterselect_xml_values(self, xml_string):
+        '''
+        select all values matches the selector while parsing the xml string,
+        without building the whole tree:
+
+        - only the elements matching a selector are kept until their end tag
+        - all other elements are released as soon as they are parsed
+
+        output:
+            filename, and the same values as select_xml_values
+        '''
+        selected = {field: [] for field in self.fields}
+        filename = None
+        # the open elements, and the result slots of the open matches
+        parents = []
+        open_matches = []
+        for event, element in iterparse_string(xml_string):
+            if event == 'start':
+                if not parents:
+                    filename = element.attrib.get('filename', "__UNKNOWN__")
+                parents.append(element)
+                values = selected.get(element.tag)
+                if values is not None:
+                    open_matches.append((values, len(values)))
+                    values.append(None)
+                continue
+
+            parents.pop()
+            if element.tag in selected:
+                values, slot = open_matches.pop()
+                values[slot] = "".join(element.itertext())
+            if not open_matches and parents:
+                element.clear()
+                parents[-1].remove(element)
+        return filename, list(selected.values())
 
     def __iter__(self):
         for selector in self.selectors:
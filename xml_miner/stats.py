@@ -0,0 +1,197 @@
+"""time the stages of a mining run, log its progress and its summary"""
+from typing import Iterable, Iterator, Optional
+from contextlib import contextmanager
+import time
+from . import LOGGER
+
+STAGE = {
+    'LOAD': 'load',
+    'PARSE': 'parse',
+    'SELECT': 'select',
+    'NORMALIZE': 'normalize',
+    'WRITE': 'write',
+}
+
+_END = object()
+
+
+class MiningStats:
+    '''
+    MiningStats:
+    - wall and CPU time of each stage of a run, see STAGE. The time of a
+      stage running inside another one only counts for the inner stage,
+      e.g. loading the next document while waiting for the workers.
+    - number of documents and bytes read, of documents mined and rows
+      written
+    - progress lines at most once per interval, with the ETA when the total
+      number of documents or bytes of the source is known
+
+    with workers, parse and select run in the worker processes: their time
+    is the time waiting for the workers, counted as select, and the CPU time
+    is the one of the main process only
+    '''
+
+    PROGRESS_INTERVAL = 30
+
+    def __init__(self, total_docs: Optional[int] = None,
+                 total_bytes: Optional[int] = None,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        '''
+        params:
+            total_docs (int): number of documents of the source, if known
+            total_bytes (int): number of bytes of the source, if known
+            progress_interval (float): seconds between two progress lines,
+            0 to not log the progress
+        '''
+        self.total_docs = total_docs
+        self.total_bytes = total_bytes
+        self.progress_interval = progress_interval
+        self.wall_time = {stage: 0.0 for stage in STAGE.values()}
+        self.cpu_time = {stage: 0.0 for stage in STAGE.values()}
+        self.docs_read = 0
+        self.bytes_read = 0
+        self.docs_mined = 0
+        self.rows_written = 0
+        self.started_at = time.perf_counter()
+        self.cpu_started_at = time.process_time()
+        self.finished_at = None
+        self.cpu_finished_at = None
+        self._running = []
+        self._progress_at = self.started_at
+
+    def start(self, stage: str):
+        '''start timing a stage'''
+        self._running.append([stage, time.perf_counter(),
+                              time.process_time(), 0.0, 0.0])
+
+    def stop(self):
+        '''stop timing the last started stage'''
+        stage, wall_start, cpu_start, inner_wall, inner_cpu = \
+            self._running.pop()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        self.wall_time[stage] += wall - inner_wall
+        self.cpu_time[stage] += cpu - inner_cpu
+        if self._running:
+            self._running[-1][3] += wall
+            self._running[-1][4] += cpu
+
+    @contextmanager
+    def timed(self, stage: str):
+        '''time the block as the given stage'''
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def timed_iter(self, items: Iterable, stage: str) -> Iterator:
+        '''time getting each item of the iterable as the given stage'''
+        items = iter(items)
+        while True:
+            self.start(stage)
+            try:
+                item = next(items, _END)
+            finally:
+                self.stop()
+            if item is _END:
+                return
+            yield item
+
+    def loaded_docs(self, positioned_docs: Iterable) -> Iterator:
+        '''
+        time the loading of (position, document) pairs, and count the
+        documents and bytes read
+        '''
+        for position, doc in self.timed_iter(positioned_docs, STAGE['LOAD']):
+            self.docs_read += 1
+            if isinstance(doc, (bytes, bytearray, memoryview, str)):
+                self.bytes_read += len(doc)
+            yield position, doc
+
+    @property
+    def elapsed(self) -> float:
+        '''wall time of the run so far'''
+        end = self.finished_at or time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def cpu_time_total(self) -> float:
+        '''CPU time of the main process during the run so far'''
+        end = self.cpu_finished_at or time.process_time()
+        return end - self.cpu_started_at
+
+    def finish(self):
+        '''the run is over, stop the clock'''
+        self.finished_at = time.perf_counter()
+        self.cpu_finished_at = time.process_time()
+
+    def eta(self) -> Optional[float]:
+        '''estimated seconds until the end, None if the total is unknown'''
+        if self.total_docs:
+            done, total = self.docs_read, self.total_docs
+        elif self.total_bytes:
+            done, total = self.bytes_read, self.total_bytes
+        else:
+            return None
+        if not done:
+            return None
+        return max(total - done, 0) * self.elapsed / done
+
+    def log_progress(self):
+        '''log a progress line, if the interval since the last one is over'''
+        if not self.progress_interval:
+            return
+        now = time.perf_counter()
+        if now - self._progress_at < self.progress_interval:
+            return
+        self._progress_at = now
+        elapsed = now - self.started_at
+        total = f"/{self.total_docs}" if self.total_docs else ""
+        eta = self.eta()
+        LOGGER.info("progress: %d%s docs, %.1f docs/s, %.2f MB/s%s",
+                    self.docs_read, total, self.docs_read / elapsed,
+                    self.bytes_read / elapsed / 2 ** 20,
+                    "" if eta is None else f", ETA {_duration(eta)}")
+
+    def as_dict(self) -> dict:
+        '''the stats of the run, to report them programmatically'''
+        elapsed = self.elapsed
+        return {
+            'elapsed': elapsed,
+            'cpu_time': self.cpu_time_total,
+            'docs_read': self.docs_read,
+            'bytes_read': self.bytes_read,
+            'docs_mined': self.docs_mined,
+            'rows_written': self.rows_written,
+            'docs_per_sec': self.docs_read / elapsed if elapsed else None,
+            'rows_per_sec': self.rows_written / elapsed if elapsed else None,
+            'mb_per_sec':
+                self.bytes_read / elapsed / 2 ** 20 if elapsed else None,
+            'stages': {stage: {'wall_time': self.wall_time[stage],
+                               'cpu_time': self.cpu_time[stage]}
+                       for stage in STAGE.values()},
+        }
+
+    def log_summary(self):
+        '''log the throughput and the time of each stage'''
+        stats = self.as_dict()
+        elapsed = stats['elapsed']
+        LOGGER.info("%d docs (%.2f MB) read in %s (%.1fs cpu): %.1f docs/s, "
+                    "%.1f rows/s, %.2f MB/s", stats['docs_read'],
+                    stats['bytes_read'] / 2 ** 20, _duration(elapsed),
+                    stats['cpu_time'],
+                    stats['docs_per_sec'] or 0, stats['rows_per_sec'] or 0,
+                    stats['mb_per_sec'] or 0)
+        for stage, times in stats['stages'].items():
+            LOGGER.info("- %-9s %9.3fs wall %5.1f%%, %9.3fs cpu", stage,
+                        times['wall_time'],
+                        100 * times['wall_time'] / elapsed if elapsed else 0,
+                        times['cpu_time'])
+
+
+def _duration(seconds: float) -> str:
+    '''seconds as h:mm:ss'''
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
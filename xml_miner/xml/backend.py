@@ -0,0 +1,124 @@
+"""
+XML parser backends: lxml when it is installed, otherwise xml.etree
+"""
+import re
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as LXML_ETREE
+except ImportError:
+    LXML_ETREE = None
+
+XML_BACKEND = {'AUTO': 'auto', 'LXML': 'lxml', 'ETREE': 'etree'}
+
+# the errors raised on malformed xml, by any backend
+if LXML_ETREE is None:
+    PARSE_ERRORS = (ET.ParseError,)
+else:
+    PARSE_ERRORS = (ET.ParseError, LXML_ETREE.XMLSyntaxError)
+
+# lxml refuses unicode strings with an encoding declaration
+RE_XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def resolve_backend(backend: str = XML_BACKEND['AUTO'],
+                    recover: bool = False) -> str:
+    '''
+    the name of the backend to use: 'lxml' or 'etree'
+
+    params:
+        backend: 'auto' takes etree, or lxml in recover mode: the selection
+        walks the tree in Python, which is faster on etree elements than on
+        lxml element proxies
+        recover: the documents are parsed in recover mode, only lxml can
+    '''
+    if backend not in XML_BACKEND.values():
+        raise ValueError(f"xml backend '{backend}' unknown")
+    if backend == XML_BACKEND['AUTO']:
+        backend = XML_BACKEND['LXML'] if recover else XML_BACKEND['ETREE']
+    if backend == XML_BACKEND['LXML'] and LXML_ETREE is None:
+        raise ImportError("xml backend 'lxml' needs the lxml package")
+    if recover and backend != XML_BACKEND['LXML']:
+        raise ValueError("the recover mode needs the xml backend 'lxml'")
+    return backend
+
+
+def _lxml_parser(recover: bool):
+    '''
+    lxml parser giving the same text as xml.etree: comments and processing
+    instructions are dropped and internal entities are resolved
+    '''
+    return LXML_ETREE.XMLParser(recover=recover,
+                                remove_comments=True,
+                                remove_pis=True,
+                                resolve_entities='internal',
+                                no_network=True,
+                                huge_tree=True)
+
+
+def _check_no_recover(recover: bool):
+    '''xml.etree can not recover, the broken documents would be skipped'''
+    if recover:
+        raise ValueError("the recover mode needs the xml backend 'lxml'")
+
+
+def _checked_root(root):
+    '''in recover mode, lxml returns None when nothing could be parsed'''
+    if root is None:
+        raise ET.ParseError("no element found")
+    return root
+
+
+def parse_string(xml_string,
+                 backend: str = XML_BACKEND['ETREE'],
+                 recover: bool = False):
+    """
+    parse the xml string with the chosen backend
+
+    params:
+        xml_string (string): xml string
+        backend (string): 'lxml' or 'etree', see resolve_backend
+        recover (bool): lxml only, parse as much as possible of broken xml
+
+    output:
+        the top level element
+    """
+    if backend != XML_BACKEND['LXML']:
+        _check_no_recover(recover)
+        return ET.fromstring(xml_string)
+    if isinstance(xml_string, str):
+        xml_string = RE_XML_DECLARATION.sub('', xml_string, count=1)
+    return _checked_root(LXML_ETREE.fromstring(xml_string,
+                                               _lxml_parser(recover)))
+
+
+def parse_file(xml_file: str,
+               backend: str = XML_BACKEND['ETREE'],
+               recover: bool = False):
+    """
+    parse the xml file with the chosen backend
+
+    output:
+        the top level element
+    """
+    if backend != XML_BACKEND['LXML']:
+        _check_no_recover(recover)
+        return ET.parse(xml_file).getroot()
+    return _checked_root(
+        LXML_ETREE.parse(xml_file, _lxml_parser(recover)).getroot())
+
+
+def is_lxml_element(element) -> bool:
+    '''check if the element comes from the lxml backend'''
+    return LXML_ETREE is not None and LXML_ETREE.iselement(element)
+
+
+def tostring(element) -> str:
+    '''serialize the element of any backend'''
+    if is_lxml_element(element):
+        xml_bytes = LXML_ETREE.tostring(element, encoding="UTF-8",
+                                        xml_declaration=False)
+    else:
+        xml_bytes = ET.tostring(element, encoding="UTF-8",
+                                short_empty_elements=False)
+    return xml_bytes.decode().strip()
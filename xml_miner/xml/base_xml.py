@@ -1,5 +1,33 @@
 """XML class: render xml file or xml strings to xml tree object"""
 import xml.etree.ElementTree as ET
+from .backend import XML_BACKEND, parse_file, parse_string, tostring
+
+# size of the pieces fed to the pull parser by iterparse_string
+CHUNK_SIZE = 64 * 1024
+
+
+def iterparse_string(xml_string, events=('start', 'end'),
+                     chunk_size: int = CHUNK_SIZE):
+    """
+    parse the xml string piece by piece, and generate the parsing events
+
+    the elements are built but never released by the parser, the consumer
+    should clear the elements which are not needed any more
+
+    params:
+        xml_string (string): xml string
+        events (tuple): the events to report, see ET.XMLPullParser
+        chunk_size (int): the size of the pieces fed to the parser
+
+    output:
+        (event, element) tuples
+    """
+    parser = ET.XMLPullParser(events)
+    for offset in range(0, len(xml_string), chunk_size):
+        parser.feed(xml_string[offset:offset + chunk_size])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
 
 
 class XML:
@@ -15,33 +43,40 @@ class XML:
         self.top_level_tag = self.top_level_obj.tag
 
     @classmethod
-    def from_file(cls, xml_file: str):
+    def from_file(cls, xml_file: str,
+                  backend: str = XML_BACKEND['ETREE'],
+                  recover: bool = False):
         """
         create xml object from filename
 
         params:
             xml_file (string): xml file
+            backend (string): parser backend, 'etree' or 'lxml'
+            recover (bool): lxml only, parse as much as possible of broken
+            xml
 
         output:
             xml object: ElementTree object
         """
-        tree = ET.parse(xml_file)
-        return cls(top_level_obj=tree.getroot())
+        return cls(top_level_obj=parse_file(xml_file, backend, recover))
 
     @classmethod
-    def from_string(cls, xml_string: str):
+    def from_string(cls, xml_string: str,
+                    backend: str = XML_BACKEND['ETREE'],
+                    recover: bool = False):
         """
         create xml object from xml_string
 
         params:
             xml_string (string): xml string
+            backend (string): parser backend, 'etree' or 'lxml'
+            recover (bool): lxml only, parse as much as possible of broken
+            xml
 
         output:
             xml object: ElementTree object
         """
-
-        tree = ET.ElementTree(ET.fromstring(xml_string))
-        return cls(top_level_obj=tree.getroot())
+        return cls(top_level_obj=parse_string(xml_string, backend, recover))
 
     @staticmethod
     def text_from_element(element):
@@ -53,5 +88,4 @@ class XML:
         return value
 
     def __str__(self):
-        return ET.tostring(self.top_level_obj, encoding="UTF-8",
-                           short_empty_elements=False).decode().strip()
+        return tostring(self.top_level_obj)
@@ -14,6 +14,8 @@ class TKTRXML(XML):
     def __init__(self, top_level_obj=None):
         super().__init__(top_level_obj)
         self.working_entity_tag = 'DocumentStructure'
+        self._field_values = None
+        self._itemgroup_items = None
 
     @property
     def working_entity(self):
@@ -38,3 +40,55 @@ class TKTRXML(XML):
         except AttributeError:
             filename = default_filename
         return filename
+
+    @property
+    def field_values(self):
+        '''
+        the value of each field, indexed by (itemgroup_key, item_index,
+        field_key), built once per document on first use
+
+        the value is the first one in document order, the same as the xpath
+        ItemGroup[@key=..]/Item[@index=..]/Field[@key=..]/Value
+        '''
+        if self._field_values is None:
+            self._build_structure_index()
+        return self._field_values
+
+    @property
+    def itemgroup_items(self):
+        '''
+        the items of each itemgroup as a list of (item_index, {field_key:
+        value}), built once per document on first use
+
+        only the first itemgroup with a given key is kept
+        '''
+        if self._itemgroup_items is None:
+            self._build_structure_index()
+        return self._itemgroup_items
+
+    def _build_structure_index(self):
+        '''index all field values of the DocumentStructure in one pass'''
+        structure = self.working_entity
+        if structure is None:
+            raise AttributeError("no DocumentStructure found")
+
+        field_values = {}
+        itemgroup_items = {}
+        for itemgroup in structure.iterfind('ItemGroup'):
+            itemgroup_key = itemgroup.get('key')
+            items = []
+            for item in itemgroup.iterfind('Item'):
+                item_index = item.get('index')
+                fields = {}
+                for field in item.iterfind('Field'):
+                    value = field.find('Value')
+                    if value is not None:
+                        fields.setdefault(field.get('key'), value.text)
+                items.append((item_index, fields))
+                for field_key, value in fields.items():
+                    field_values.setdefault(
+                        (itemgroup_key, item_index, field_key), value)
+            itemgroup_items.setdefault(itemgroup_key, items)
+
+        self._field_values = field_values
+        self._itemgroup_items = itemgroup_items